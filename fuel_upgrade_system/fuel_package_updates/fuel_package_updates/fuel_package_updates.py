@@ -16,17 +16,23 @@
 from __future__ import print_function
 from __future__ import absolute_import
 
+import collections
 from collections import namedtuple
 from copy import deepcopy
 from distutils.version import StrictVersion
+import fnmatch
 import functools
+import hashlib
+import itertools
 import json
 import logging
 import os
+import Queue
 import re
 import string
 import subprocess
 import sys
+import threading
 import traceback
 import urllib2
 import yaml
@@ -44,7 +50,11 @@ from keystoneclient.v2_0 import Client as keystoneclient
 from optparse import OptionParser
 from urllib2 import urlopen
 from urlparse import urlparse
-from xml.dom.minidom import parseString
+
+try:
+    from xml.etree import cElementTree as ElementTree
+except ImportError:
+    from xml.etree import ElementTree
 
 from fuel_package_updates import utils
 
@@ -72,6 +82,14 @@ FUEL_VER = "8.0"
 UBUNTU_CODENAME = 'trusty'
 CENTOS_VERSION = 'centos6'
 
+# size of chunks in which repository files are downloaded
+CHUNK_SIZE = 64 * 1024
+
+# distros which repositories are mirrored by their metadata, others
+# are mirrored by recursive download
+NATIVE_MIRROR_DISTROS = (DISTROS.ubuntu, DISTROS.centos,
+                         DISTROS.centos_security)
+
 
 class Settings(object):
     supported_distros = DISTROS
@@ -97,6 +115,9 @@ class Settings(object):
     exclude_dirs = ('repodata/', 'mos?.?/')
     httproot = "/var/www/nailgun"
     port = 8080
+    mirror_workers = 8
+    # timeout of connection to remote repository in seconds
+    mirror_timeout = 60
 
 
 class HTTPClient(object):
@@ -378,28 +399,595 @@ def get_available_releases(ip):
     return fwc.get_available_releases()
 
 
-def get_repository_packages(remote_repo_url, distro):
-    repo_url = urlparse(remote_repo_url)
-    packages = []
+class GzipStreamReader(object):
+    """File-like object which decompresses gzip stream on the fly
+
+    Unlike gzip.GzipFile it doesn't require the stream to be seekable,
+    so HTTP responses can be decompressed while they are downloaded.
+    """
+
+    def __init__(self, fileobj, chunk_size=CHUNK_SIZE):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+        self.buffer = ''
+        # position of unread data in buffer, data before it is dropped
+        # only when a new chunk is appended, so lines aren't copied twice
+        self.offset = 0
+        self.eof = False
+
+    def _fill(self):
+        """Appends next decompressed chunk to buffer, False on EOF."""
+        if self.eof:
+            return False
+        chunk = self.fileobj.read(self.chunk_size)
+        if chunk:
+            data = self.decompressor.decompress(chunk)
+        else:
+            data = self.decompressor.flush()
+            self.eof = True
+        self.buffer = self.buffer[self.offset:] + data
+        self.offset = 0
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) - self.offset < size:
+            if not self._fill():
+                break
+
+        if size < 0:
+            end = len(self.buffer)
+        else:
+            end = min(self.offset + size, len(self.buffer))
+        data = self.buffer[self.offset:end]
+        self.offset = end
+        return data
+
+    def readline(self):
+        end = self.buffer.find('\n', self.offset)
+        while end < 0:
+            # data before the end of buffer was already searched
+            searched = len(self.buffer) - self.offset
+            if not self._fill():
+                break
+            end = self.buffer.find('\n', searched)
+
+        end = end + 1 if end >= 0 else len(self.buffer)
+        line = self.buffer[self.offset:end]
+        self.offset = end
+        return line
+
+    def __iter__(self):
+        return iter(self.readline, '')
+
+
+class PackagesCache(object):
+    """Lists of repository packages cached on disk
+
+    Every list is saved with the key of repository metadata it was
+    built from, e.g. checksum of primary.xml. Callers compare the key
+    with actual one to decide whether the list is still valid.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _get_path(self, url):
+        return os.path.join(
+            self.path, '{0}.json'.format(hashlib.sha1(url).hexdigest()))
+
+    def load(self, url):
+        """Returns cached key and packages of url or (None, None)."""
+        try:
+            with open(self._get_path(url)) as f:
+                data = json.load(f)
+            return data['key'], data['packages']
+        except (IOError, ValueError, KeyError):
+            return None, None
+
+    def save(self, url, key, packages):
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+        path = self._get_path(url)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'url': url, 'key': key, 'packages': packages}, f)
+        os.rename(path + '.tmp', path)
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_deb_packages(stream):
+    """Yields names of packages from stream of Debian Packages file."""
+    for line in stream:
+        match = re.search(r'^Package: (\S+)\s*$', line)
+        if match:
+            yield match.group(1)
+
+
+def _iter_rpm_package_elements(stream):
+    """Yields package elements from stream of primary.xml
+
+    Elements of already parsed packages are dropped, so memory usage
+    doesn't depend on size of the repository.
+    """
+    root = None
+    for event, elem in ElementTree.iterparse(stream, events=('start', 'end')):
+        if root is None:
+            root = elem
+        if event == 'end' and _local_name(elem.tag) == 'package':
+            yield elem
+            root.clear()
+
+
+def iter_rpm_packages(stream):
+    """Yields names of packages from stream of primary.xml."""
+    for elem in _iter_rpm_package_elements(stream):
+        for child in elem:
+            if _local_name(child.tag) == 'name':
+                yield child.text
+                break
+
+
+def iter_rpm_mirror_files(stream):
+    """Yields files of packages from stream of primary.xml."""
+    for elem in _iter_rpm_package_elements(stream):
+        location = checksum = size = None
+        for child in elem:
+            tag = _local_name(child.tag)
+            if tag == 'location':
+                location = child.get('href')
+            elif tag == 'checksum':
+                checksum = (child.get('type'), child.text)
+            elif tag == 'size':
+                size = child.get('package')
+        if location:
+            yield _make_mirror_file(location, size, *(checksum or (None,)))
+
+
+def iter_deb_mirror_files(stream):
+    """Yields files of packages from stream of Debian Packages file."""
+    fields = {}
+    for line in itertools.chain(stream, ['']):
+        if line.strip():
+            # skip continuation lines of multiline fields
+            if line[0] not in ' \t':
+                key, _, value = line.partition(':')
+                fields[key] = value.strip()
+            continue
+        if 'Filename' in fields:
+            checksum_type, checksum = _pick_checksum(
+                (t, fields.get(f)) for f, t in DEB_CHECKSUM_FIELDS)
+            yield _make_mirror_file(
+                fields['Filename'], fields.get('Size'),
+                checksum_type, checksum)
+        fields = {}
+
+
+def parse_deb_release(content):
+    """Returns files listed in Debian Release file."""
+    checksums = collections.defaultdict(list)
+    checksum_type = None
+    for line in content.splitlines():
+        if not line.startswith(' '):
+            checksum_type = dict(DEB_CHECKSUM_FIELDS).get(
+                line.split(':', 1)[0])
+            continue
+        if checksum_type is not None:
+            checksum, size, path = line.split()
+            checksums[path].append((checksum_type, checksum, size))
+
+    files = []
+    for path, path_checksums in sorted(checksums.items()):
+        checksum_type, checksum = _pick_checksum(
+            (t, c) for t, c, _ in path_checksums)
+        files.append(_make_mirror_file(
+            path, path_checksums[0][2], checksum_type, checksum))
+    return files
+
+
+def parse_repomd(content):
+    """Returns files listed in repomd.xml of yum repository."""
+    files = []
+    for elem in ElementTree.fromstring(content):
+        if _local_name(elem.tag) != 'data':
+            continue
+        location = checksum = size = None
+        for child in elem:
+            tag = _local_name(child.tag)
+            if tag == 'location':
+                location = child.get('href')
+            elif tag == 'checksum':
+                checksum = (child.get('type'), child.text)
+            elif tag == 'size':
+                size = child.text
+        if location:
+            files.append(_make_mirror_file(
+                location, size, *(checksum or (None,))))
+    return files
+
+
+def get_repomd_primary(repo_url):
+    """Returns checksum and location of primary.xml of yum repository."""
+    repomd = urlopen('{0}/repodata/repomd.xml'.format(repo_url))
+    for _, elem in ElementTree.iterparse(repomd):
+        if _local_name(elem.tag) == 'data' and \
+                elem.get('type') == 'primary':
+            checksum = location = None
+            for child in elem:
+                if _local_name(child.tag) == 'checksum':
+                    checksum = child.text
+                elif _local_name(child.tag) == 'location':
+                    location = child.get('href')
+            return checksum, location
+    return None, None
+
+
+MirrorFile = namedtuple(
+    'MirrorFile', ('path', 'size', 'checksum_type', 'checksum'))
+
+# checksum fields of Debian metadata from the weakest to the strongest
+DEB_CHECKSUM_FIELDS = (('MD5sum', 'md5'), ('MD5Sum', 'md5'),
+                       ('SHA1', 'sha1'), ('SHA256', 'sha256'))
+
+
+def _make_mirror_file(path, size, checksum_type=None, checksum=None):
+    if checksum_type == 'sha':
+        # yum metadata uses 'sha' for sha1
+        checksum_type = 'sha1'
+    return MirrorFile(path.lstrip('/'), int(size) if size else None,
+                      checksum_type, checksum)
+
+
+def _pick_checksum(checksums):
+    """Returns the strongest of (checksum type, checksum) pairs."""
+    strength = ('md5', 'sha1', 'sha256')
+    checksums = [(t, c) for t, c in checksums if t in strength and c]
+    if not checksums:
+        return None, None
+    return max(checksums, key=lambda x: strength.index(x[0]))
+
+
+def get_file_checksum(path, checksum_type):
+    checksum = hashlib.new(checksum_type)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+class LocalChecksums(object):
+    """Checksums of files of local repository
+
+    Checksums are stored in the repository with size and modification
+    time of files, so a file is read again only if it is changed.
+    """
+
+    filename = '.checksums.json'
+
+    def __init__(self, root):
+        self.root = root
+        self.path = os.path.join(root, self.filename)
+        self.lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.checksums = json.load(f)
+        except (IOError, ValueError):
+            self.checksums = {}
+
+    def get(self, path, checksum_type):
+        """Returns checksum of local file or None if there is no file."""
+        full_path = os.path.join(self.root, path)
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None
+
+        key = '{0}:{1}'.format(path, checksum_type)
+        with self.lock:
+            cached = self.checksums.get(key)
+        if cached and cached[:2] == [stat.st_size, stat.st_mtime]:
+            return cached[2]
+
+        checksum = get_file_checksum(full_path, checksum_type)
+        self.set(path, checksum_type, checksum)
+        return checksum
+
+    def set(self, path, checksum_type, checksum):
+        stat = os.stat(os.path.join(self.root, path))
+        key = '{0}:{1}'.format(path, checksum_type)
+        with self.lock:
+            self.checksums[key] = [stat.st_size, stat.st_mtime, checksum]
+
+    def save(self):
+        with self.lock:
+            with open(self.path + '.tmp', 'w') as f:
+                json.dump(self.checksums, f)
+            os.rename(self.path + '.tmp', self.path)
+
+
+class RepositoryMirror(object):
+    """Mirrors remote repository by its metadata
+
+    Only files which are missing in local repository or have different
+    checksum are downloaded. Files are downloaded by a pool of threads
+    into '.part' files, which are resumed if mirroring is interrupted,
+    and are renamed when they are complete. Packages are downloaded
+    before metadata, and Release or repomd.xml files are the last ones,
+    so clients never see metadata which refers to missing packages.
+    Packages in excluded directories are skipped, metadata is always
+    mirrored since the repository is not usable without it.
+    """
+
+    def __init__(self, remote_repo_url, local_repo_path, workers,
+                 exclude_dirs=(), timeout=Settings.mirror_timeout):
+        self.url = remote_repo_url.rstrip('/')
+        self.path = local_repo_path
+        self.workers = workers
+        self.exclude_dirs = [d.strip('/') for d in exclude_dirs]
+        self.timeout = timeout
+        self.checksums = LocalChecksums(local_repo_path)
+
+    def _urlopen(self, url):
+        return urlopen(url, timeout=self.timeout)
+
+    def is_excluded(self, mirror_file):
+        """Checks if package is in one of excluded directories."""
+        dirs = mirror_file.path.split('/')[:-1]
+        return any(fnmatch.fnmatch(d, pattern)
+                   for d in dirs for pattern in self.exclude_dirs)
+
+    def _get_local_path(self, path):
+        return os.path.join(self.path, *path.split('/'))
+
+    def is_up_to_date(self, mirror_file):
+        if mirror_file.checksum is None:
+            return False
+        if mirror_file.size is not None:
+            try:
+                size = os.path.getsize(self._get_local_path(mirror_file.path))
+            except OSError:
+                return False
+            if size != mirror_file.size:
+                return False
+        return self.checksums.get(
+            mirror_file.path, mirror_file.checksum_type) == \
+            mirror_file.checksum
+
+    def download(self, mirror_file, optional=False):
+        """Downloads file into local repository
+
+        :param mirror_file: MirrorFile to download
+        :param optional: do not fail if there is no such remote file
+        """
+        path = self._get_local_path(mirror_file.path)
+        part_path = path + '.part'
+        if not os.path.isdir(os.path.dirname(path)):
+            try:
+                os.makedirs(os.path.dirname(path))
+            except OSError:
+                # created by other worker
+                pass
+
+        offset = 0
+        if mirror_file.checksum is not None and os.path.exists(part_path):
+            offset = os.path.getsize(part_path)
+
+        request = urllib2.Request('{0}/{1}'.format(self.url, mirror_file.path))
+        if offset:
+            request.add_header('Range', 'bytes={0}-'.format(offset))
+        try:
+            response = self._urlopen(request)
+        except urllib2.HTTPError as e:
+            if e.code == 416:
+                # downloaded part doesn't fit, start from scratch
+                os.remove(part_path)
+                return self.download(mirror_file, optional)
+            if e.code == 404 and optional:
+                logger.debug('Skip missing file %s', mirror_file.path)
+                return
+            raise
+
+        mode = 'ab' if offset and response.getcode() == 206 else 'wb'
+        with open(part_path, mode) as f:
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), ''):
+                f.write(chunk)
+
+        if mirror_file.checksum is not None:
+            checksum = get_file_checksum(
+                part_path, mirror_file.checksum_type)
+            if checksum != mirror_file.checksum:
+                os.remove(part_path)
+                raise UpdatePackagesException(
+                    'Checksum mismatch of downloaded file {0}'.format(
+                        mirror_file.path))
+        os.rename(part_path, path)
+        if mirror_file.checksum is not None:
+            self.checksums.set(mirror_file.path, mirror_file.checksum_type,
+                               mirror_file.checksum)
+        logger.debug('Downloaded %s', mirror_file.path)
+
+    def download_all(self, mirror_files, optional=False):
+        """Downloads files which are not up to date by pool of threads."""
+        queue = Queue.Queue()
+        for mirror_file in mirror_files:
+            queue.put(mirror_file)
+        errors = []
+
+        def worker():
+            while True:
+                try:
+                    mirror_file = queue.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    if not self.is_up_to_date(mirror_file):
+                        self.download(mirror_file, optional)
+                except Exception as e:
+                    logger.error('Failed to download %s: %s',
+                                 mirror_file.path, e)
+                    errors.append(mirror_file.path)
+
+        threads = [threading.Thread(target=worker)
+                   for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.checksums.save()
+        if errors:
+            raise UpdatePackagesException(
+                'Mirroring of remote packages repository failed, '
+                'cannot download: {0}'.format(', '.join(sorted(errors))))
+
+    def _open_index(self, mirror_file):
+        """Opens index file, local one if it's up to date."""
+        if self.is_up_to_date(mirror_file):
+            stream = open(self._get_local_path(mirror_file.path), 'rb')
+        else:
+            stream = self._urlopen(
+                '{0}/{1}'.format(self.url, mirror_file.path))
+        if mirror_file.path.endswith('.gz'):
+            stream = GzipStreamReader(stream)
+        return stream
+
+    def mirror_deb(self, suites):
+        releases = {}
+        indexes = []
+        packages = {}
+        for suite in suites:
+            for name in ('Release', 'Release.gpg', 'InRelease'):
+                releases['dists/{0}/{1}'.format(suite, name)] = None
+
+            release = self._urlopen('{0}/dists/{1}/Release'.format(
+                self.url, suite)).read()
+            suite_indexes = [
+                f._replace(path='dists/{0}/{1}'.format(suite, f.path))
+                for f in parse_deb_release(release)]
+            indexes.extend(suite_indexes)
+
+            for index in suite_indexes:
+                if not re.search(r'/binary-[^/]+/Packages\.gz$', index.path):
+                    continue
+                try:
+                    stream = self._open_index(index)
+                except urllib2.HTTPError as e:
+                    if e.code != 404:
+                        raise
+                    logger.debug('Skip missing index %s', index.path)
+                    continue
+                for mirror_file in iter_deb_mirror_files(stream):
+                    if not self.is_excluded(mirror_file):
+                        packages[mirror_file.path] = mirror_file
+
+        self.download_all(packages.values())
+        # Release lists indexes in all formats, some of them may be absent
+        self.download_all(indexes, optional=True)
+        self.download_all(
+            [MirrorFile(path, None, None, None) for path in releases],
+            optional=True)
+
+    def mirror_rpm(self):
+        repomd = self._urlopen(
+            '{0}/repodata/repomd.xml'.format(self.url)).read()
+        metadata = parse_repomd(repomd)
+
+        packages = {}
+        for mirror_file in metadata:
+            if re.search(r'primary\.xml(\.gz)?$', mirror_file.path):
+                for package in iter_rpm_mirror_files(
+                        self._open_index(mirror_file)):
+                    if not self.is_excluded(package):
+                        packages[package.path] = package
+
+        self.download_all(packages.values())
+        self.download_all(metadata)
+        self.download_all(
+            [MirrorFile('repodata/repomd.xml', None, None, None)])
+
+
+def _iter_cached(cache, url, key, packages):
+    """Yields packages and saves them into cache when all are yielded."""
+    names = []
+    for name in packages:
+        names.append(name)
+        yield name
+    if cache is not None and key:
+        cache.save(url, key, names)
+
+
+def _iter_deb_repository_packages(repo_url, cache):
+    packages_url = '{0}/Packages'.format(repo_url)
+    key, cached = cache.load(packages_url) if cache else (None, None)
+
+    # Packages file has no checksum of its own next to it, so its
+    # HTTP validators are used to check if it is changed
+    request = urllib2.Request(packages_url)
+    if cached is not None and key:
+        if key.get('etag'):
+            request.add_header('If-None-Match', key['etag'])
+        if key.get('last_modified'):
+            request.add_header('If-Modified-Since', key['last_modified'])
+    try:
+        response = urlopen(request)
+    except urllib2.HTTPError as e:
+        if e.code == 304 and cached is not None:
+            logger.debug('Packages of %s are not changed', repo_url)
+            return iter(cached)
+        raise
+
+    headers = response.info()
+    key = dict((k, v) for k, v in (
+        ('etag', headers.getheader('ETag')),
+        ('last_modified', headers.getheader('Last-Modified'))) if v)
+    return _iter_cached(cache, packages_url, key, iter_deb_packages(response))
+
+
+def _iter_rpm_repository_packages(repo_url, cache):
+    checksum, location = get_repomd_primary(repo_url)
+    primary_url = '{0}/{1}'.format(
+        repo_url, location or 'repodata/primary.xml.gz')
+
+    key, cached = cache.load(primary_url) if cache else (None, None)
+    if cached is not None and checksum and key == checksum:
+        logger.debug('Packages of %s are not changed', repo_url)
+        return iter(cached)
+
+    stream = urlopen(primary_url)
+    if primary_url.endswith('.gz'):
+        stream = GzipStreamReader(stream)
+    return _iter_cached(cache, primary_url, checksum,
+                        iter_rpm_packages(stream))
+
+
+def iter_repository_packages(remote_repo_url, distro, cache_dir=None):
+    """Yields names of packages of remote repository
+
+    Repository metadata is parsed while it's downloaded. If cache_dir
+    is given, lists of packages are saved there and reused while
+    metadata of repository is not changed.
+
+    :param remote_repo_url: URL of repository
+    :param distro: one of DISTROS
+    :param cache_dir: path to directory with cached lists of packages
+    """
+    repo_url = urlparse(remote_repo_url).geturl()
     if distro == DISTROS.ubuntu_baseos:
         raise UpdatePackagesException(
             "Use fuel-createmirror to mirror base Ubuntu OS.")
 
+    cache = PackagesCache(cache_dir) if cache_dir else None
     if distro == DISTROS.ubuntu:
-        packages_url = '{0}/Packages'.format(repo_url.geturl())
-        pkgs_raw = urlopen(packages_url).read()
-        for pkg in pkgs_raw.split('\n'):
-            match = re.search(r'^Package: (\S+)\s*$', pkg)
-            if match:
-                packages.append(match.group(1))
+        return _iter_deb_repository_packages(repo_url, cache)
     elif distro == DISTROS.centos:
-        packages_url = '{0}/repodata/primary.xml.gz'.format(repo_url.geturl())
-        pkgs_xml = parseString(zlib.decompressobj(zlib.MAX_WBITS | 32).
-                               decompress(urlopen(packages_url).read()))
-        for pkg in pkgs_xml.getElementsByTagName('package'):
-            packages.append(
-                pkg.getElementsByTagName('name')[0].firstChild.nodeValue)
-    return packages
+        return _iter_rpm_repository_packages(repo_url, cache)
+    return iter([])
+
+
+def get_repository_packages(remote_repo_url, distro, cache_dir=None):
+    return list(iter_repository_packages(remote_repo_url, distro, cache_dir))
 
 
 def get_ubuntu_baseos_repos(repopath, ip, httproot, port,
@@ -450,14 +1038,18 @@ def get_ubuntu_baseos_repos(repopath, ip, httproot, port,
     return repos
 
 
-def get_ubuntu_repos(repopath, ip, httproot, port, baseurl=None):
-    # TODO(mattymo): parse all repo metadata
-    repolist = [
+def get_ubuntu_suites():
+    return [
         'mos{0}-updates'.format(FUEL_VER),
         'mos{0}-holdback'.format(FUEL_VER),
         'mos{0}-security'.format(FUEL_VER),
     ]
 
+
+def get_ubuntu_repos(repopath, ip, httproot, port, baseurl=None):
+    # TODO(mattymo): parse all repo metadata
+    repolist = get_ubuntu_suites()
+
     repourl = baseurl or "http://{ip}:{port}{repopath}".format(
         ip=ip,
         port=port,
@@ -560,9 +1152,20 @@ def update_env_conf(ip, distro, release, repos, env_id=None,
 
 
 def mirror_remote_repository(remote_repo_url, local_repo_path, exclude_dirs,
-                             distro):
+                             distro, workers=None):
     repo_url = urlparse(remote_repo_url)
     cut_dirs = len(repo_url.path.strip('/').split('/'))
+    if repo_url.scheme in ('http', 'https') and \
+            distro in NATIVE_MIRROR_DISTROS:
+        mirror = RepositoryMirror(remote_repo_url, local_repo_path,
+                                  workers or Settings.mirror_workers,
+                                  exclude_dirs)
+        if distro == DISTROS.ubuntu:
+            mirror.mirror_deb(get_ubuntu_suites())
+        else:
+            mirror.mirror_rpm()
+        return
+
     if "rsync://" in remote_repo_url:
         excl_dirs = "ubuntu/dists/mos?.?/,repodata/"
         download_cmd = ('rsync --exclude="*.key","*.gpg",{excl_dirs} -vPr '
@@ -648,6 +1251,11 @@ def main(argv=None):
     parser.add_option("-p", "--password", dest="admin_pass", default=None,
                       help="Fuel Master admin password (defaults to admin)."
                       " Alternatively, use env var KEYSTONE_PASSWORD).")
+    parser.add_option("-w", "--workers", dest="workers", type="int",
+                      default=Settings.mirror_workers,
+                      help="Number of parallel downloads for http(s) "
+                      "repositories (defaults to {0})".format(
+                          Settings.mirror_workers))
 
     if argv is None:
         argv = sys.argv[1:]
@@ -710,7 +1318,8 @@ def main(argv=None):
     else:
         logger.info('Started mirroring remote repository...')
         mirror_remote_repository(options.url, updates_path,
-                                 settings.exclude_dirs, options.distro)
+                                 settings.exclude_dirs, options.distro,
+                                 options.workers)
         logger.info('Remote repository "{url}" for "{release}" ({distro}) was '
                     'successfuly mirrored to {path} folder.'.format(
                         url=options.url,
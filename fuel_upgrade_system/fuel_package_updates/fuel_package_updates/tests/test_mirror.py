@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+import hashlib
+import os
+import shutil
+import StringIO
+import tempfile
+
+import httpretty
+import unittest2
+
+from fuel_package_updates import fuel_package_updates as fpu
+from fuel_package_updates.tests.test_packages import gzipped
+
+REPO_URL = 'http://mirror.local/repo'
+
+RPM_CONTENT = 'rpm content'
+
+PRIMARY_XML = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<metadata xmlns="http://linux.duke.edu/metadata/common" packages="1">
+<package type="rpm">
+  <name>python-nova</name>
+  <checksum type="sha256" pkgid="YES">{checksum}</checksum>
+  <size package="{size}" installed="1" archive="1"/>
+  <location href="Packages/python-nova.rpm"/>
+</package>
+</metadata>
+""".format(checksum=hashlib.sha256(RPM_CONTENT).hexdigest(),
+           size=len(RPM_CONTENT))
+
+PRIMARY_XML_GZ = gzipped(PRIMARY_XML)
+
+REPOMD_XML = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<repomd xmlns="http://linux.duke.edu/metadata/repo">
+<data type="primary">
+  <checksum type="sha">{checksum}</checksum>
+  <location href="repodata/primary.xml.gz"/>
+  <size>{size}</size>
+</data>
+</repomd>
+""".format(checksum=hashlib.sha1(PRIMARY_XML_GZ).hexdigest(),
+           size=len(PRIMARY_XML_GZ))
+
+RELEASE = """\
+Origin: Mirantis
+MD5Sum:
+ aaa 10 main/binary-amd64/Packages
+ bbb 20 main/binary-amd64/Packages.gz
+SHA256:
+ ccc 10 main/binary-amd64/Packages
+ ddd 20 main/binary-amd64/Packages.gz
+"""
+
+DEB_PACKAGES = """\
+Package: python-nova
+Description: OpenStack Compute
+ multiline description
+Filename: pool/main/n/nova/python-nova_all.deb
+Size: 11
+MD5sum: aaa
+SHA256: bbb
+
+Package: nova-common
+Filename: pool/main/n/nova/nova-common_all.deb
+Size: 22
+MD5sum: ccc
+"""
+
+DEB_CONTENT = 'deb content'
+
+DEB_INDEX_GZ = gzipped("""\
+Package: python-nova
+Filename: pool/main/n/nova/python-nova_all.deb
+Size: {size}
+SHA256: {checksum}
+""".format(checksum=hashlib.sha256(DEB_CONTENT).hexdigest(),
+           size=len(DEB_CONTENT)))
+
+DEB_RELEASE = """\
+Origin: Mirantis
+SHA256:
+ {checksum} {size} main/binary-amd64/Packages.gz
+ {checksum} {size} main/binary-i386/Packages.gz
+""".format(checksum=hashlib.sha256(DEB_INDEX_GZ).hexdigest(),
+           size=len(DEB_INDEX_GZ))
+
+
+class TestRepositoryMirror(unittest2.TestCase):
+
+    def setUp(self):
+        self.local_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.local_path)
+        self.mirror = fpu.RepositoryMirror(REPO_URL, self.local_path, 2)
+
+    def register_centos_repo(self):
+        for path, body in (('repodata/repomd.xml', REPOMD_XML),
+                           ('repodata/primary.xml.gz', PRIMARY_XML_GZ),
+                           ('Packages/python-nova.rpm', RPM_CONTENT)):
+            httpretty.register_uri(
+                httpretty.GET, '{0}/{1}'.format(REPO_URL, path), body=body)
+
+    def register_ubuntu_repo(self):
+        dists = 'dists/mos8.0-updates'
+        for path, body in (
+                (dists + '/Release', DEB_RELEASE),
+                (dists + '/main/binary-amd64/Packages.gz', DEB_INDEX_GZ),
+                ('pool/main/n/nova/python-nova_all.deb', DEB_CONTENT)):
+            httpretty.register_uri(
+                httpretty.GET, '{0}/{1}'.format(REPO_URL, path), body=body)
+        for path in (dists + '/main/binary-i386/Packages.gz',
+                     dists + '/Release.gpg', dists + '/InRelease'):
+            httpretty.register_uri(
+                httpretty.GET, '{0}/{1}'.format(REPO_URL, path), status=404)
+
+    def read_local(self, path):
+        with open(os.path.join(self.local_path, path)) as f:
+            return f.read()
+
+    def get_requested_paths(self):
+        return [r.path for r in httpretty.HTTPretty.latest_requests]
+
+    def test_parse_deb_release(self):
+        self.assertEqual(
+            [fpu.MirrorFile('main/binary-amd64/Packages', 10, 'sha256', 'ccc'),
+             fpu.MirrorFile(
+                 'main/binary-amd64/Packages.gz', 20, 'sha256', 'ddd')],
+            fpu.parse_deb_release(RELEASE))
+
+    def test_iter_deb_mirror_files(self):
+        self.assertEqual(
+            [fpu.MirrorFile(
+                'pool/main/n/nova/python-nova_all.deb', 11, 'sha256', 'bbb'),
+             fpu.MirrorFile(
+                 'pool/main/n/nova/nova-common_all.deb', 22, 'md5', 'ccc')],
+            list(fpu.iter_deb_mirror_files(StringIO.StringIO(DEB_PACKAGES))))
+
+    def test_gzip_stream_reader_is_iterable(self):
+        reader = fpu.GzipStreamReader(
+            StringIO.StringIO(gzipped(DEB_PACKAGES)), chunk_size=10)
+
+        self.assertEqual(DEB_PACKAGES.splitlines(True), list(reader))
+
+    def test_gzip_stream_reader_read_after_readline(self):
+        reader = fpu.GzipStreamReader(
+            StringIO.StringIO(gzipped(DEB_PACKAGES)), chunk_size=10)
+        first_line = DEB_PACKAGES.splitlines(True)[0]
+
+        self.assertEqual(first_line, reader.readline())
+        self.assertEqual(DEB_PACKAGES[len(first_line):][:5], reader.read(5))
+        self.assertEqual(DEB_PACKAGES[len(first_line) + 5:], reader.read())
+        self.assertEqual('', reader.readline())
+
+    @httpretty.activate
+    def test_mirror_deb(self):
+        self.register_ubuntu_repo()
+
+        self.mirror.mirror_deb(['mos8.0-updates'])
+
+        self.assertEqual(
+            DEB_CONTENT,
+            self.read_local('pool/main/n/nova/python-nova_all.deb'))
+        self.assertEqual(
+            DEB_INDEX_GZ,
+            self.read_local(
+                'dists/mos8.0-updates/main/binary-amd64/Packages.gz'))
+        self.assertEqual(DEB_RELEASE,
+                         self.read_local('dists/mos8.0-updates/Release'))
+        # Release is updated only when all files it refers to are there
+        self.assertEqual(
+            ['/repo/dists/mos8.0-updates/Release',
+             '/repo/dists/mos8.0-updates/Release.gpg',
+             '/repo/dists/mos8.0-updates/InRelease'],
+            sorted(self.get_requested_paths()[-3:]))
+
+    @httpretty.activate
+    def test_mirror_skips_excluded_dirs(self):
+        self.register_ubuntu_repo()
+        mirror = fpu.RepositoryMirror(REPO_URL, self.local_path, 2,
+                                      exclude_dirs=('pool/',))
+
+        mirror.mirror_deb(['mos8.0-updates'])
+
+        self.assertNotIn('/repo/pool/main/n/nova/python-nova_all.deb',
+                         self.get_requested_paths())
+        self.assertTrue(os.path.exists(os.path.join(
+            self.local_path, 'dists/mos8.0-updates/Release')))
+
+    @httpretty.activate
+    def test_mirror_rpm(self):
+        self.register_centos_repo()
+
+        self.mirror.mirror_rpm()
+
+        self.assertEqual(RPM_CONTENT,
+                         self.read_local('Packages/python-nova.rpm'))
+        self.assertEqual(REPOMD_XML, self.read_local('repodata/repomd.xml'))
+        # repomd.xml is updated only when all files it refers to are there
+        self.assertEqual('/repo/repodata/repomd.xml',
+                         httpretty.last_request().path)
+
+    @httpretty.activate
+    def test_mirror_rpm_skips_up_to_date_files(self):
+        self.register_centos_repo()
+        self.mirror.mirror_rpm()
+        httpretty.HTTPretty.latest_requests = []
+
+        fpu.RepositoryMirror(REPO_URL, self.local_path, 2).mirror_rpm()
+
+        self.assertNotIn('/repo/Packages/python-nova.rpm',
+                         self.get_requested_paths())
+        self.assertTrue(os.path.exists(
+            os.path.join(self.local_path, fpu.LocalChecksums.filename)))
+
+    @httpretty.activate
+    def test_download_resumes_partial_file(self):
+        self.register_centos_repo()
+        httpretty.register_uri(
+            httpretty.GET, REPO_URL + '/Packages/python-nova.rpm',
+            body=RPM_CONTENT[4:], status=206)
+        os.makedirs(os.path.join(self.local_path, 'Packages'))
+        with open(os.path.join(
+                self.local_path, 'Packages/python-nova.rpm.part'), 'w') as f:
+            f.write(RPM_CONTENT[:4])
+
+        self.mirror.mirror_rpm()
+
+        self.assertEqual(RPM_CONTENT,
+                         self.read_local('Packages/python-nova.rpm'))
+        rpm_request = [r for r in httpretty.HTTPretty.latest_requests
+                       if r.path.endswith('.rpm')][0]
+        self.assertEqual('bytes=4-', rpm_request.headers['Range'])
+
+    @httpretty.activate
+    def test_download_fails_on_checksum_mismatch(self):
+        self.register_centos_repo()
+        httpretty.register_uri(
+            httpretty.GET, REPO_URL + '/Packages/python-nova.rpm',
+            body='broken rpm!')
+
+        self.assertRaises(fpu.UpdatePackagesException,
+                          self.mirror.mirror_rpm)
+        self.assertFalse(os.path.exists(
+            os.path.join(self.local_path, 'repodata/repomd.xml')))
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+import gzip
+import shutil
+import StringIO
+import tempfile
+
+import httpretty
+import unittest2
+
+from fuel_package_updates import fuel_package_updates as fpu
+
+REPO_URL = 'http://mirror.local/repo'
+
+PACKAGES = """\
+Package: nova-common
+Version: 1:2015.1.1-1
+Filename: pool/main/n/nova/nova-common_2015.1.1-1_all.deb
+
+Package: python-nova
+Version: 1:2015.1.1-1
+Depends: python-novaclient
+"""
+
+PRIMARY_XML = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<metadata xmlns="http://linux.duke.edu/metadata/common"
+          xmlns:rpm="http://linux.duke.edu/metadata/rpm" packages="2">
+<package type="rpm">
+  <name>openstack-nova</name>
+  <format><rpm:requires><rpm:entry name="python-nova"/></rpm:requires>
+  </format>
+</package>
+<package type="rpm">
+  <name>python-nova</name>
+</package>
+</metadata>
+"""
+
+REPOMD_XML = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<repomd xmlns="http://linux.duke.edu/metadata/repo">
+<data type="filelists">
+  <checksum type="sha256">bbb</checksum>
+  <location href="repodata/bbb-filelists.xml.gz"/>
+</data>
+<data type="primary">
+  <checksum type="sha256">{checksum}</checksum>
+  <location href="repodata/{checksum}-primary.xml.gz"/>
+</data>
+</repomd>
+"""
+
+
+def gzipped(content):
+    buf = StringIO.StringIO()
+    f = gzip.GzipFile(fileobj=buf, mode='wb')
+    f.write(content)
+    f.close()
+    return buf.getvalue()
+
+
+class TestRepositoryPackages(unittest2.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def register_centos_repo(self, checksum):
+        httpretty.register_uri(
+            httpretty.GET, REPO_URL + '/repodata/repomd.xml',
+            body=REPOMD_XML.format(checksum=checksum))
+        httpretty.register_uri(
+            httpretty.GET,
+            '{0}/repodata/{1}-primary.xml.gz'.format(REPO_URL, checksum),
+            body=gzipped(PRIMARY_XML))
+
+    def test_gzip_stream_reader(self):
+        content = PRIMARY_XML * 100
+        reader = fpu.GzipStreamReader(
+            StringIO.StringIO(gzipped(content)), chunk_size=10)
+
+        self.assertEqual(content[:7], reader.read(7))
+        self.assertEqual(content[7:], reader.read())
+        self.assertEqual('', reader.read(7))
+
+    def test_iter_deb_packages(self):
+        self.assertEqual(
+            ['nova-common', 'python-nova'],
+            list(fpu.iter_deb_packages(StringIO.StringIO(PACKAGES))))
+
+    def test_iter_rpm_packages(self):
+        self.assertEqual(
+            ['openstack-nova', 'python-nova'],
+            list(fpu.iter_rpm_packages(StringIO.StringIO(PRIMARY_XML))))
+
+    @httpretty.activate
+    def test_get_centos_repository_packages(self):
+        self.register_centos_repo('aaa')
+
+        packages = fpu.get_repository_packages(REPO_URL, fpu.DISTROS.centos)
+
+        self.assertEqual(['openstack-nova', 'python-nova'], packages)
+
+    @httpretty.activate
+    def test_centos_packages_are_cached_by_checksum(self):
+        self.register_centos_repo('aaa')
+        fpu.get_repository_packages(
+            REPO_URL, fpu.DISTROS.centos, self.cache_dir)
+
+        httpretty.reset()
+        httpretty.register_uri(
+            httpretty.GET, REPO_URL + '/repodata/repomd.xml',
+            body=REPOMD_XML.format(checksum='aaa'))
+        packages = fpu.get_repository_packages(
+            REPO_URL, fpu.DISTROS.centos, self.cache_dir)
+
+        self.assertEqual(['openstack-nova', 'python-nova'], packages)
+        self.assertEqual('/repo/repodata/repomd.xml',
+                         httpretty.last_request().path)
+
+    @httpretty.activate
+    def test_centos_packages_are_fetched_if_checksum_changed(self):
+        self.register_centos_repo('aaa')
+        fpu.get_repository_packages(
+            REPO_URL, fpu.DISTROS.centos, self.cache_dir)
+
+        self.register_centos_repo('ccc')
+        fpu.get_repository_packages(
+            REPO_URL, fpu.DISTROS.centos, self.cache_dir)
+
+        self.assertEqual('/repo/repodata/ccc-primary.xml.gz',
+                         httpretty.last_request().path)
+
+    @httpretty.activate
+    def test_ubuntu_packages_are_cached_by_etag(self):
+        httpretty.register_uri(
+            httpretty.GET, REPO_URL + '/Packages',
+            responses=[
+                httpretty.Response(body=PACKAGES,
+                                   adding_headers={'ETag': '"v1"'}),
+                httpretty.Response(body='', status=304),
+            ])
+
+        for _ in range(2):
+            packages = fpu.get_repository_packages(
+                REPO_URL, fpu.DISTROS.ubuntu, self.cache_dir)
+            self.assertEqual(['nova-common', 'python-nova'], packages)
+
+        self.assertEqual('"v1"',
+                         httpretty.last_request().headers['If-None-Match'])
+
+    def test_ubuntu_baseos_is_not_supported(self):
+        self.assertRaises(
+            fpu.UpdatePackagesException,
+            fpu.get_repository_packages, REPO_URL, fpu.DISTROS.ubuntu_baseos)
@@ -39,7 +39,7 @@ class NodeAssignmentHandler(BaseHandler):
                * 400 (invalid nodes data specified)
                * 404 (cluster/node not found in db)
         """
-        self.get_object_or_404(
+        cluster = self.get_object_or_404(
             objects.Cluster,
             cluster_id
         )
@@ -52,10 +52,7 @@ class NodeAssignmentHandler(BaseHandler):
             data.keys()
         )
 
-        for node in nodes:
-            objects.Node.update(node, {"cluster_id": cluster_id,
-                                       "pending_roles": data[node.id],
-                                       "pending_addition": True})
+        objects.NodeCollection.assign_to_cluster(nodes, cluster, data)
 
 
 class NodeUnassignmentHandler(BaseHandler):
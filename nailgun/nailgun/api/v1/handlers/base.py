@@ -15,6 +15,7 @@
 #    under the License.
 
 from datetime import datetime
+import hashlib
 import six
 import traceback
 
@@ -28,6 +29,8 @@ from nailgun.api.v1.validators.base import BasicValidator
 from nailgun.api.v1.validators.graph import GraphTasksValidator
 from nailgun import consts
 from nailgun.db import db
+from nailgun.db import read_only
+from nailgun.db.sqlalchemy.models import Revision
 from nailgun.errors import errors
 from nailgun.logger import logger
 from nailgun import objects
@@ -91,6 +94,14 @@ class BaseHandler(object):
 
     fields = []
 
+    #: tables which data is returned by GET, ETag of response
+    #: is calculated from their revisions if the list isn't empty
+    etag_tables = ()
+
+    #: GET requests are handled in read-only mode of DB session,
+    #: should be set only if GET doesn't change any data
+    read_only_get = False
+
     @classmethod
     def render(cls, instance, fields=None):
         return cls.serializer.serialize(
@@ -250,6 +261,25 @@ class BaseHandler(object):
         raise self.http(status, objects.Task.to_json(task))
 
 
+def get_etag(tables):
+    """Returns ETag of current request URL for revisions of tables."""
+    revisions = dict(db().query(Revision.name, Revision.value).filter(
+        Revision.name.in_(tables)))
+    data = [web.ctx.fullpath, settings.VERSION,
+            [(table, revisions.get(table, 0)) for table in sorted(tables)]]
+    return '"{0}"'.format(
+        hashlib.md5(jsonutils.dumps(data, sort_keys=True)).hexdigest())
+
+
+def etag_matches(etag):
+    """Checks whether If-None-Match header of request matches ETag."""
+    if_none_match = web.ctx.env.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    tags = set(tag.strip() for tag in if_none_match.split(','))
+    return bool(tags & set(('*', etag, 'W/' + etag)))
+
+
 def content_json(func, cls, *args, **kwargs):
     json_resp = lambda data: (
         jsonutils.dumps(data)
@@ -281,7 +311,18 @@ def content_json(func, cls, *args, **kwargs):
                 resource_type=resource_type
             )
 
-        resp = func(cls, *args, **kwargs)
+        if func.func_name == 'GET' and getattr(cls, 'etag_tables', None):
+            # response is not rendered at all if client has actual data
+            etag = get_etag(cls.etag_tables)
+            web.header('ETag', etag)
+            if etag_matches(etag):
+                raise web.notmodified()
+
+        if func.func_name == 'GET' and getattr(cls, 'read_only_get', False):
+            with read_only(db()):
+                resp = func(cls, *args, **kwargs)
+        else:
+            resp = func(cls, *args, **kwargs)
     except web.notmodified:
         raise
     except web.HTTPError as http_error:
@@ -596,7 +637,7 @@ class DeploymentTasksHandler(SingleHandler):
         include = web.input(include=[]).include
         tasks = self.single.get_deployment_tasks(obj)
         if end or start:
-            graph = deployment_graph.DeploymentGraph(tasks)
+            graph = deployment_graph.graphs_cache.get(tasks)
             return graph.filter_subgraph(
                 end=end, start=start, include=include).node.values()
         return tasks
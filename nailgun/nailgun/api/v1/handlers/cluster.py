@@ -44,10 +44,17 @@ from nailgun.task.manager import StopDeploymentTaskManager
 from nailgun.task.manager import UpdateEnvironmentTaskManager
 
 
+#: tables which data is shown for clusters, is_locked of cluster
+#: depends on statuses of its nodes
+CLUSTER_TABLES = ('clusters', 'cluster_changes', 'releases', 'nodes')
+
+
 class ClusterHandler(SingleHandler):
     """Cluster single handler"""
 
     single = objects.Cluster
+    etag_tables = CLUSTER_TABLES
+    read_only_get = True
     validator = ClusterValidator
 
     @content
@@ -76,6 +83,8 @@ class ClusterCollectionHandler(CollectionHandler):
     """Cluster collection handler"""
 
     collection = objects.ClusterCollection
+    etag_tables = CLUSTER_TABLES
+    read_only_get = True
     validator = ClusterValidator
 
 
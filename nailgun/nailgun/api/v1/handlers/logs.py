@@ -18,6 +18,7 @@
 Handlers dealing with logs
 """
 
+import calendar
 from itertools import dropwhile
 import logging
 import os
@@ -36,6 +37,7 @@ from nailgun.api.v1.handlers.base import content
 from nailgun.settings import settings
 from nailgun.task.manager import DumpTaskManager
 from nailgun.task.task import DumpTask
+from nailgun.utils.log_index import LogIndex
 
 
 logger = logging.getLogger(__name__)
@@ -92,6 +94,15 @@ if settings.UI_LOG_DATE_FORMAT == '%Y-%m-%d %H:%M:%S':
     }
 
 
+def get_strptime_function(log_date_format):
+    if log_date_format in STRPTIME_PERFORMANCE_HACK:
+        return STRPTIME_PERFORMANCE_HACK[log_date_format]
+    return lambda date: time.strftime(
+        settings.UI_LOG_DATE_FORMAT,
+        time.strptime(date, log_date_format)
+    )
+
+
 def read_log(
         log_file=None,
         level=None,
@@ -101,6 +112,8 @@ def read_log(
         from_byte=-1,
         fetch_older=False,
         to_byte=0,
+        date_after=None,
+        date_before=None,
         **kwargs):
     has_more = False
     entries = []
@@ -115,15 +128,12 @@ def read_log(
         allowed_levels = list(dropwhile(lambda l: l != level,
                                         log_config['levels']))
 
+    min_timestamp = calendar.timegm(date_after) if date_after else None
+    max_timestamp = calendar.timegm(date_before) if date_before else None
+
     log_file_size = os.stat(log_file).st_size
 
-    if log_date_format in STRPTIME_PERFORMANCE_HACK:
-        strptime_function = STRPTIME_PERFORMANCE_HACK[log_date_format]
-    else:
-        strptime_function = lambda date: time.strftime(
-            settings.UI_LOG_DATE_FORMAT,
-            time.strptime(date, log_date_format)
-        )
+    strptime_function = get_strptime_function(log_date_format)
 
     with open(log_file, 'r') as f:
         # we need to calculate current position manually instead of using
@@ -162,12 +172,20 @@ def read_log(
                 continue
             try:
                 entry_date = strptime_function(m.group('date'))
+                timestamp = None
+                if min_timestamp is not None or max_timestamp is not None:
+                    timestamp = calendar.timegm(
+                        time.strptime(m.group('date'), log_date_format))
             except ValueError:
                 logger.debug("Unable to parse date from log entry."
                              " Date format: %r, date part of entry: %r",
                              log_date_format,
                              m.group('date'))
                 continue
+            if min_timestamp is not None and timestamp < min_timestamp:
+                continue
+            if max_timestamp is not None and timestamp > max_timestamp:
+                continue
 
             entries.append([
                 entry_date,
@@ -192,6 +210,129 @@ def read_log(
     }
 
 
+def read_log_with_index(
+        log_file=None,
+        level=None,
+        log_config={},
+        max_entries=None,
+        regexp=None,
+        from_byte=-1,
+        fetch_older=False,
+        to_byte=0,
+        date_after=None,
+        date_before=None,
+        **kwargs):
+    """Reads log entries the same way as read_log() does, using LogIndex.
+
+    Entries are filtered by level and date using the index, so only
+    entries which are returned are read and parsed. If the index
+    doesn't match the log file, it is dropped and the log is read
+    by read_log().
+    """
+    has_more = False
+    entries = []
+    multiline = log_config.get('multiline', False)
+    skip_regexp = None
+    if 'skip_regexp' in log_config:
+        skip_regexp = re.compile(log_config['skip_regexp'])
+
+    log_index = LogIndex(log_file, log_config, settings.LOGS_INDEX_DIR)
+    min_level_rank = log_index.get_level_rank(level) if level else None
+    min_timestamp = calendar.timegm(date_after) if date_after else None
+    max_timestamp = calendar.timegm(date_before) if date_before else None
+
+    strptime_function = get_strptime_function(log_config['date_format'])
+
+    log_file_size = os.stat(log_file).st_size
+    pos = log_file_size
+    if from_byte != -1 and fetch_older:
+        pos = from_byte
+
+    stale = False
+    with log_index.open() as index, open(log_file, 'rb') as f:
+        for start, end, timestamp, level_rank in \
+                index.iter_records_backwards(pos):
+            pos = start
+            if not fetch_older and pos < to_byte:
+                has_more = pos > 0
+                break
+            if timestamp == LogIndex.invalid_timestamp:
+                continue
+            if min_level_rank is not None and (
+                    level_rank == LogIndex.unknown_level or
+                    level_rank < min_level_rank):
+                continue
+            if min_timestamp is not None and timestamp < min_timestamp:
+                continue
+            if max_timestamp is not None and timestamp > max_timestamp:
+                continue
+
+            f.seek(start)
+            lines = f.read(end - start).rstrip('\n').split('\n')
+            m = regexp.match(lines[0])
+            if m is None:
+                stale = True
+                break
+            entry_text = m.group('text')
+            if multiline:
+                multilinebuf = [
+                    line for line in lines[1:]
+                    if line and not (skip_regexp and skip_regexp.match(line))
+                ]
+                if multilinebuf:
+                    entry_text += '\n' + '\n'.join(multilinebuf)
+
+            entries.append([
+                strptime_function(m.group('date')),
+                m.group('level').upper() or 'INFO',
+                entry_text
+            ])
+
+            if len(entries) >= max_entries:
+                has_more = True
+                break
+        else:
+            pos = 0
+
+    if stale:
+        logger.warning("Index of log %r is stale, rebuilding it", log_file)
+        log_index.reset()
+        return read_log(
+            log_file=log_file, level=level, log_config=log_config,
+            max_entries=max_entries, regexp=regexp, from_byte=from_byte,
+            fetch_older=fetch_older, to_byte=to_byte,
+            date_after=date_after, date_before=date_before)
+
+    if fetch_older or (not fetch_older and from_byte == -1):
+        from_byte = pos
+        if from_byte == 0:
+            has_more = False
+
+    return {
+        'entries': entries,
+        'from': from_byte,
+        'to': log_file_size,
+        'has_more': has_more,
+    }
+
+
+def get_logs_index_dir():
+    """Returns directory for log indexes or None if it's not available."""
+    index_dir = settings.LOGS_INDEX_DIR
+    if not index_dir:
+        return None
+    try:
+        if not os.path.isdir(index_dir):
+            os.makedirs(index_dir)
+    except OSError:
+        logger.exception("Unable to create log index dir %r", index_dir)
+        return None
+    if not os.access(index_dir, os.W_OK):
+        logger.error("Log index dir %r is not writable", index_dir)
+        return None
+    return index_dir
+
+
 class LogEntryCollectionHandler(BaseHandler):
     """Log entry collection handler"""
 
@@ -241,6 +382,13 @@ class LogEntryCollectionHandler(BaseHandler):
                 'has_more': False,
             })
 
+        if get_logs_index_dir():
+            try:
+                return read_log_with_index(**data)
+            except (IOError, OSError):
+                logger.exception("Unable to read log %r using index",
+                                 log_file)
+
         return read_log(**data)
 
     def read_and_validate_data(self):
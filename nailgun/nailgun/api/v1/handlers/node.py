@@ -44,10 +44,27 @@ from nailgun.task.manager import NodeDeletionTaskManager
 
 from nailgun.logger import logger
 from nailgun import notifier
+from nailgun.utils.heartbeat import heartbeats
+
+
+#: tables which data is shown for nodes, including network data
+NODE_TABLES = (
+    'nodes',
+    'node_nic_interfaces',
+    'node_bond_interfaces',
+    'net_nic_assignments',
+    'net_bond_assignments',
+    'ip_addrs',
+    'network_groups',
+    'networking_configs',
+    'nova_network_config',
+)
 
 
 class NodeHandler(SingleHandler):
     single = objects.Node
+    etag_tables = NODE_TABLES
+    read_only_get = True
     validator = NodeValidator
 
     @content
@@ -78,6 +95,8 @@ class NodeCollectionHandler(CollectionHandler):
 
     validator = NodeValidator
     collection = objects.NodeCollection
+    etag_tables = NODE_TABLES
+    read_only_get = True
 
     @content
     def GET(self):
@@ -94,7 +113,7 @@ class NodeCollectionHandler(CollectionHandler):
         elif cluster_id:
             nodes = nodes.filter_by(cluster_id=cluster_id)
 
-        return self.collection.to_json(nodes)
+        return self.collection.to_json_stream(nodes)
 
     @content
     def PUT(self):
@@ -179,7 +198,17 @@ class NodeAgentHandler(BaseHandler):
         if not node:
             raise self.http(404, "Can't find node: {0}".format(nd))
 
-        node.timestamp = datetime.now()
+        is_cached = 'agent_checksum' in nd and (
+            node.agent_checksum == nd['agent_checksum']
+        )
+
+        if is_cached and node.online:
+            # nothing but the timestamp is changed, so the row update
+            # is coalesced with heartbeats of other nodes
+            heartbeats.touch(node.id)
+        else:
+            heartbeats.discard(node.id)
+            node.timestamp = datetime.now()
 
         if not node.online:
             node.online = True
@@ -188,9 +217,7 @@ class NodeAgentHandler(BaseHandler):
             notifier.notify("discover", msg, node_id=node.id)
         db().flush()
 
-        if 'agent_checksum' in nd and (
-            node.agent_checksum == nd['agent_checksum']
-        ):
+        if is_cached:
             return {'id': node.id, 'cached': True}
 
         self.collection.single.update_by_agent(node, nd)
@@ -32,12 +32,16 @@ class NotificationHandler(SingleHandler):
     """Notification single handler"""
 
     single = objects.Notification
+    etag_tables = ('notifications',)
+    read_only_get = True
     validator = NotificationValidator
 
 
 class NotificationCollectionHandler(CollectionHandler):
 
     collection = objects.NotificationCollection
+    etag_tables = ('notifications',)
+    read_only_get = True
     validator = NotificationValidator
 
     @content
@@ -33,6 +33,7 @@ class ReleaseHandler(SingleHandler):
 
     single = Release
     validator = ReleaseValidator
+    read_only_get = True
 
 
 class ReleaseCollectionHandler(CollectionHandler):
@@ -40,6 +41,7 @@ class ReleaseCollectionHandler(CollectionHandler):
 
     validator = ReleaseValidator
     collection = ReleaseCollection
+    read_only_get = True
 
     @content
     def GET(self):
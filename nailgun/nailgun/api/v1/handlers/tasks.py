@@ -35,6 +35,8 @@ class TaskHandler(SingleHandler):
     """Task single handler"""
 
     single = objects.Task
+    etag_tables = ('tasks',)
+    read_only_get = True
     validator = TaskValidator
 
     @content
@@ -64,6 +66,8 @@ class TaskCollectionHandler(CollectionHandler):
     """Task collection handler"""
 
     collection = objects.TaskCollection
+    etag_tables = ('tasks',)
+    read_only_get = True
     validator = TaskValidator
 
     @content
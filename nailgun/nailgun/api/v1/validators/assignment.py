@@ -93,11 +93,10 @@ class NodeAssignmentValidator(AssignmentValidator):
         )
         cls.check_unique_hostnames(nodes, cluster_id)
 
-        for node_id in received_node_ids:
-            cls.validate_roles(
-                cluster,
-                dict_data[node_id]
-            )
+        # nodes of a rack usually get the same roles, so every
+        # distinct set of roles is validated only once
+        for roles in set(frozenset(r) for r in dict_data.values()):
+            cls.validate_roles(cluster, roles)
         return dict_data
 
     @classmethod
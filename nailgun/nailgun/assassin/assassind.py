@@ -57,7 +57,10 @@ def run():
     logger.info('Running Assassind...')
     try:
         while True:
-            update_nodes_status(settings.KEEPALIVE['timeout'])
+            # API workers write agents' heartbeats to DB in batches,
+            # so timestamps in DB may be behind by the flush interval
+            update_nodes_status(settings.KEEPALIVE['timeout'] +
+                                settings.KEEPALIVE['flush_interval'])
             time.sleep(settings.KEEPALIVE['interval'])
     except (KeyboardInterrupt, SystemExit):
         logger.info('Stopping Assassind...')
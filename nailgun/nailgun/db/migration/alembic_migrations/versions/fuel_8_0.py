@@ -24,9 +24,15 @@ Create Date: 2015-10-15 17:20:11.132934
 revision = '43b2cb64dae6'
 down_revision = '1e50a4903910'
 
+import datetime
+import hashlib
+import zlib
+
 from alembic import op
 from oslo_serialization import jsonutils
+import six
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as psql
 
 from nailgun.db.sqlalchemy.models import fields
 from nailgun.utils.migration import drop_enum
@@ -122,9 +128,15 @@ def upgrade():
     create_openstack_configs_table()
     upgrade_master_node_ui_settings()
     upgrade_plugins_parameters()
+    create_node_deployment_info_table()
+    create_revisions_table()
+    upgrade_task_cache_to_payloads()
 
 
 def downgrade():
+    downgrade_task_cache_from_payloads()
+    downgrade_revisions()
+    downgrade_node_deployment_info()
     downgrade_plugins_parameters()
     downgrade_master_node_ui_settings()
     downgrade_openstack_configs()
@@ -241,6 +253,189 @@ def downgrade_openstack_configs():
     drop_enum('openstack_config_types')
 
 
+def create_node_deployment_info_table():
+    op.create_table(
+        'node_deployment_info',
+        sa.Column('id', sa.Integer, nullable=False),
+        sa.Column('node_id', sa.Integer, nullable=False),
+        sa.Column('checksum', sa.String(length=40), nullable=False),
+        sa.Column(
+            'info', fields.JSON,
+            nullable=False, server_default='[]'),
+        sa.ForeignKeyConstraint(
+            ['node_id'], ['nodes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('node_id')
+    )
+
+
+def downgrade_node_deployment_info():
+    op.drop_table('node_deployment_info')
+
+
+def create_revisions_table():
+    op.create_table(
+        'revisions',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('value', sa.BigInteger, nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade_revisions():
+    op.drop_table('revisions')
+
+
+# format of task payloads as of this migration, a copy is kept here,
+# so changes of nailgun.db.task_payloads don't change the migration
+TASK_PAYLOAD_CHUNK_MIN_SIZE = 1024
+TASK_PAYLOAD_REF_KEY = '__payload__'
+
+task_payloads_table = sa.sql.table(
+    'task_payloads',
+    sa.sql.column('checksum', sa.String(40)),
+    sa.sql.column('data', sa.LargeBinary),
+    sa.sql.column('refs', psql.ARRAY(sa.String(40))),
+    sa.sql.column('used_at', sa.DateTime),
+)
+
+
+def _encode_task_payload(document):
+    return jsonutils.dumps(document, sort_keys=True)
+
+
+def _split_task_payload(document, chunks):
+    if isinstance(document, dict):
+        return dict((k, _split_task_payload(v, chunks))
+                    for k, v in six.iteritems(document))
+
+    if isinstance(document, list):
+        items = []
+        for item in document:
+            if isinstance(item, dict):
+                data = _encode_task_payload(item)
+                if len(data) >= TASK_PAYLOAD_CHUNK_MIN_SIZE:
+                    checksum = hashlib.sha1(data).hexdigest()
+                    chunks[checksum] = data
+                    items.append({TASK_PAYLOAD_REF_KEY: checksum})
+                    continue
+            items.append(_split_task_payload(item, chunks))
+        return items
+
+    return document
+
+
+def _join_task_payload(document, chunks):
+    if isinstance(document, dict):
+        return dict((k, _join_task_payload(v, chunks))
+                    for k, v in six.iteritems(document))
+
+    if isinstance(document, list):
+        items = []
+        for item in document:
+            if isinstance(item, dict) and list(item) == [TASK_PAYLOAD_REF_KEY]:
+                items.append(jsonutils.loads(zlib.decompress(
+                    bytes(chunks[item[TASK_PAYLOAD_REF_KEY]]))))
+            else:
+                items.append(_join_task_payload(item, chunks))
+        return items
+
+    return document
+
+
+def store_task_payload(connection, document):
+    chunks = {}
+    root = _encode_task_payload(_split_task_payload(document, chunks))
+    checksum = hashlib.sha1(root).hexdigest()
+
+    payloads = dict(chunks)
+    payloads[checksum] = root
+    existing = set(row[0] for row in connection.execute(
+        sa.select([task_payloads_table.c.checksum]).where(
+            task_payloads_table.c.checksum.in_(sorted(payloads)))))
+    missing = sorted(set(payloads) - existing)
+    if missing:
+        now = datetime.datetime.utcnow()
+        connection.execute(task_payloads_table.insert(), [{
+            'checksum': name,
+            'data': zlib.compress(payloads[name]),
+            'refs': sorted(chunks) if name == checksum else [],
+            'used_at': now,
+        } for name in missing])
+    return checksum
+
+
+def load_task_payload(connection, checksum):
+    root = connection.execute(
+        sa.select([task_payloads_table.c.data,
+                   task_payloads_table.c.refs]).where(
+            task_payloads_table.c.checksum == checksum)).first()
+    if root is None:
+        return None
+
+    chunks = {}
+    if root.refs:
+        chunks = dict(connection.execute(
+            sa.select([task_payloads_table.c.checksum,
+                       task_payloads_table.c.data]).where(
+                task_payloads_table.c.checksum.in_(root.refs))))
+    return _join_task_payload(
+        jsonutils.loads(zlib.decompress(bytes(root.data))), chunks)
+
+
+def upgrade_task_cache_to_payloads():
+    op.create_table(
+        'task_payloads',
+        sa.Column('checksum', sa.String(length=40), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('refs', psql.ARRAY(sa.String(length=40)),
+                  nullable=False, server_default='{}'),
+        sa.Column('used_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('checksum')
+    )
+    op.add_column(
+        'tasks',
+        sa.Column(
+            'cache_checksum',
+            sa.String(length=40),
+            sa.ForeignKey('task_payloads.checksum'),
+            nullable=True
+        )
+    )
+
+    connection = op.get_bind()
+    select_query = sa.sql.text(
+        "SELECT id FROM tasks WHERE cache IS NOT NULL")
+    cache_query = sa.sql.text("SELECT cache FROM tasks WHERE id = :id")
+    update_query = sa.sql.text(
+        "UPDATE tasks SET cache_checksum = :checksum WHERE id = :id")
+    # caches can be big, so they are moved one by one
+    for task_id, in connection.execute(select_query).fetchall():
+        cache = connection.execute(cache_query, id=task_id).scalar()
+        checksum = store_task_payload(connection, jsonutils.loads(cache))
+        connection.execute(update_query, id=task_id, checksum=checksum)
+
+    op.drop_column('tasks', 'cache')
+
+
+def downgrade_task_cache_from_payloads():
+    op.add_column('tasks', sa.Column('cache', fields.JSON(), nullable=True))
+
+    connection = op.get_bind()
+    select_query = sa.sql.text(
+        "SELECT id, cache_checksum FROM tasks "
+        "WHERE cache_checksum IS NOT NULL")
+    update_query = sa.sql.text(
+        "UPDATE tasks SET cache = :cache WHERE id = :id")
+    for task_id, checksum in connection.execute(select_query).fetchall():
+        cache = load_task_payload(connection, checksum)
+        connection.execute(
+            update_query, id=task_id, cache=jsonutils.dumps(cache))
+
+    op.drop_column('tasks', 'cache_checksum')
+    op.drop_table('task_payloads')
+
+
 def downgrade_release_state():
     connection = op.get_bind()
 
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tracking of tables revisions
+
+Revision of a table is increased after every committed transaction which
+changed the table. Reading revisions is much cheaper than reading data,
+so they are used to find out whether data was changed since the last
+request, e.g. for ETags of API responses.
+"""
+
+import contextlib
+import itertools
+import weakref
+
+from sqlalchemy.engine import Engine
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy import inspect
+from sqlalchemy.sql.expression import UpdateBase
+
+from nailgun.logger import logger
+
+
+#: changes of these tables are not tracked
+UNTRACKED_TABLES = frozenset(('revisions', 'action_logs'))
+
+#: changes of these columns don't increase revision of the table
+IGNORED_COLUMNS = {
+    # heartbeats of nodes
+    'nodes': frozenset(('timestamp',)),
+}
+
+_CHANGED_TABLES = 'revisions_changed_tables'
+_BULK_UNTRACKED = 'revisions_bulk_untracked'
+_FLUSHING = 'revisions_flushing'
+_CONNECTIONS = 'revisions_connections'
+
+#: sessions of connections in transactions of tracked sessions,
+#: used to track Core statements executed within the session
+_connections_sessions = weakref.WeakKeyDictionary()
+
+
+def track_changes(session):
+    """Increase revisions of tables changed in committed transactions.
+
+    :param session: Session class, sessionmaker or scoped_session
+    """
+    event.listen(session, 'after_begin', _after_begin)
+    event.listen(session, 'before_flush', _before_flush)
+    event.listen(session, 'after_flush_postexec', _after_flush_postexec)
+    event.listen(session, 'after_bulk_update', _after_bulk)
+    event.listen(session, 'after_bulk_delete', _after_bulk)
+    event.listen(session, 'after_commit', _after_commit)
+    event.listen(session, 'after_rollback', _after_rollback)
+
+
+@contextlib.contextmanager
+def bulk_untracked(session):
+    """Bulk updates and deletes inside of the block aren't tracked.
+
+    Should be used for bulk updates of ignored columns only, since
+    changed columns of bulk updates are not known.
+    """
+    session.info[_BULK_UNTRACKED] = True
+    try:
+        yield
+    finally:
+        session.info.pop(_BULK_UNTRACKED, None)
+
+
+def increase(bind, names):
+    """Increase revisions of tables with given names.
+
+    :param bind: Engine or Connection
+    :param names: names of tables
+    """
+    from nailgun.db.sqlalchemy.models import Revision
+    table = Revision.__table__
+
+    missing = []
+    with bind.begin() as connection:
+        # rows are updated in the same order by all processes
+        # to avoid deadlocks
+        for name in sorted(names):
+            result = connection.execute(
+                table.update().where(table.c.name == name).values(
+                    value=table.c.value + 1))
+            if not result.rowcount:
+                missing.append(name)
+
+    for name in missing:
+        try:
+            bind.execute(table.insert().values(name=name, value=1))
+        except sa_exc.IntegrityError:
+            # the row was inserted by concurrent transaction
+            bind.execute(
+                table.update().where(table.c.name == name).values(
+                    value=table.c.value + 1))
+
+
+def _mark_changed(session, tables):
+    names = set(t.name for t in tables) - UNTRACKED_TABLES
+    if names:
+        session.info.setdefault(_CHANGED_TABLES, set()).update(names)
+
+
+def _is_modified(instance):
+    state = inspect(instance)
+    ignored = IGNORED_COLUMNS.get(state.mapper.local_table.name, ())
+    return any(attr.history.has_changes()
+               for attr in state.attrs if attr.key not in ignored)
+
+
+def _after_begin(session, transaction, connection):
+    _connections_sessions[connection] = session
+    session.info.setdefault(_CONNECTIONS, []).append(connection)
+
+
+def _before_flush(session, flush_context, instances):
+    # statements of flush are tracked by changed instances
+    session.info[_FLUSHING] = True
+    for instance in itertools.chain(session.new, session.deleted):
+        _mark_changed(session, inspect(instance).mapper.tables)
+    for instance in session.dirty:
+        if _is_modified(instance):
+            _mark_changed(session, inspect(instance).mapper.tables)
+
+
+def _after_flush_postexec(session, flush_context):
+    session.info.pop(_FLUSHING, None)
+
+
+@event.listens_for(Engine, 'after_execute')
+def _after_execute(connection, clauseelement, multiparams, params, result):
+    if not isinstance(clauseelement, UpdateBase):
+        return
+    session = _connections_sessions.get(connection)
+    if session is None or session.info.get(_FLUSHING) or \
+            session.info.get(_BULK_UNTRACKED):
+        return
+    _mark_changed(session, [clauseelement.table])
+
+
+def _after_bulk(session, query, query_context, result):
+    if session.info.get(_BULK_UNTRACKED):
+        return
+    entity = query.column_descriptions[0]['type']
+    _mark_changed(session, inspect(entity).tables)
+
+
+def _forget_connections(session):
+    session.info.pop(_FLUSHING, None)
+    for connection in session.info.pop(_CONNECTIONS, ()):
+        _connections_sessions.pop(connection, None)
+
+
+def _after_commit(session):
+    _forget_connections(session)
+    names = session.info.pop(_CHANGED_TABLES, None)
+    if not names:
+        return
+    # changes are visible to other transactions now, so revisions
+    # are increased after commit in a separate transaction
+    try:
+        increase(session.get_bind(), names)
+    except sa_exc.SQLAlchemyError:
+        logger.exception("Failed to increase revisions of %s", names)
+
+
+def _after_rollback(session):
+    _forget_connections(session)
+    session.info.pop(_CHANGED_TABLES, None)
@@ -28,6 +28,7 @@ from sqlalchemy.orm.query import Query
 from sqlalchemy import sql
 
 from nailgun.db import deadlock_detector as dd
+from nailgun.db import revisions
 from nailgun.db.sqlalchemy import utils
 from nailgun.settings import settings
 
@@ -36,15 +37,49 @@ db_str = utils.make_dsn(**settings.DATABASE)
 engine = create_engine(db_str, client_encoding='utf8')
 
 
+#: key of session info which is set in read-only mode
+_READ_ONLY = 'read_only'
+
+
 class NoCacheQuery(Query):
     """Override for common Query class.
     Needed for automatic refreshing objects
     from database during every query for evading
     problems with multiple sessions
+
+    In read-only mode of the session already loaded objects
+    are not refreshed, see read_only().
     """
     def __init__(self, *args, **kwargs):
         self._populate_existing = True
         super(NoCacheQuery, self).__init__(*args, **kwargs)
+        if is_read_only(self.session):
+            self._populate_existing = False
+
+
+def is_read_only(session):
+    """Checks whether session is in read-only mode."""
+    return session is not None and session.info.get(_READ_ONLY, False)
+
+
+@contextlib.contextmanager
+def read_only(session):
+    """Read-only mode of the session.
+
+    Queries don't overwrite objects which are already loaded, so
+    each row is hydrated only once, and objects may skip loading
+    of big columns they don't show, see NailgunObject.query().
+    The mode is intended for rendering of data, objects changed
+    in it must not be relied on by long-living sessions.
+
+    :param session: session instance
+    """
+    previous = session.info.get(_READ_ONLY, False)
+    session.info[_READ_ONLY] = True
+    try:
+        yield session
+    finally:
+        session.info[_READ_ONLY] = previous
 
 
 class DeadlocksSafeQueryMixin(object):
@@ -183,6 +218,7 @@ db = scoped_session(
         class_=session_class
     )
 )
+revisions.track_changes(db)
 
 
 def syncdb():
@@ -29,6 +29,7 @@ from nailgun.db.sqlalchemy.models.release import Release
 from nailgun.db.sqlalchemy.models.node import Node
 from nailgun.db.sqlalchemy.models.node import NodeAttributes
 from nailgun.db.sqlalchemy.models.node import NodeBondInterface
+from nailgun.db.sqlalchemy.models.node import NodeDeploymentInfo
 from nailgun.db.sqlalchemy.models.node import NodeNICInterface
 from nailgun.db.sqlalchemy.models.node import NodeGroup
 
@@ -47,6 +48,7 @@ from nailgun.db.sqlalchemy.models.cluster_plugin_link import ClusterPluginLink
 from nailgun.db.sqlalchemy.models.plugin_link import PluginLink
 
 from nailgun.db.sqlalchemy.models.task import Task
+from nailgun.db.sqlalchemy.models.task import TaskPayload
 
 from nailgun.db.sqlalchemy.models.master_node_settings \
     import MasterNodeSettings
@@ -55,3 +57,5 @@ from nailgun.db.sqlalchemy.models.plugins import ClusterPlugins
 from nailgun.db.sqlalchemy.models.plugins import Plugin
 
 from nailgun.db.sqlalchemy.models.openstack_config import OpenstackConfig
+
+from nailgun.db.sqlalchemy.models.revision import Revision
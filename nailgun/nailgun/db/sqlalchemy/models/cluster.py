@@ -25,6 +25,7 @@ from sqlalchemy import UnicodeText
 
 from sqlalchemy.dialects import postgresql as psql
 from sqlalchemy.orm import backref
+from sqlalchemy.orm import deferred
 from sqlalchemy.orm import relationship
 
 from oslo_serialization import jsonutils
@@ -113,7 +114,7 @@ class Cluster(Base):
     replaced_provisioning_info = Column(JSON, default={})
     is_customized = Column(Boolean, default=False)
     fuel_version = Column(Text, nullable=False)
-    deployment_tasks = Column(JSON, default=[])
+    deployment_tasks = deferred(Column(JSON, default=[]))
     components = Column(
         MutableList.as_mutable(JSON),
         default=[],
@@ -15,21 +15,52 @@
 #    under the License.
 
 from oslo_serialization import jsonutils
+import six
 import sqlalchemy.types as types
 
 
+def _get_json_decoder():
+    """Returns the fastest available function for decoding of JSON
+
+    simplejson is used if its C extension is available, it's noticeably
+    faster than the standard library decoder on big documents.
+    """
+    try:
+        import simplejson
+        from simplejson import _speedups  # noqa
+    except ImportError:
+        return jsonutils.loads
+
+    def loads(value):
+        # decoding of unicode gives unicode strings as jsonutils does
+        if isinstance(value, six.binary_type):
+            value = value.decode('utf-8')
+        return simplejson.loads(value)
+
+    return loads
+
+
 class JSON(types.TypeDecorator):
+    """JSON document which is stored as text
+
+    Columns of big documents which are rarely used should be deferred,
+    so they are loaded and decoded on the first access only.
+    """
 
     impl = types.Text
 
+    #: functions which are used for encoding and decoding of values
+    dumps = staticmethod(jsonutils.dumps)
+    loads = staticmethod(_get_json_decoder())
+
     def process_bind_param(self, value, dialect):
         if value is not None:
-            value = jsonutils.dumps(value)
+            value = self.dumps(value)
         return value
 
     def process_result_value(self, value, dialect):
         if value is not None:
-            value = jsonutils.loads(value)
+            value = self.loads(value)
         return value
 
 
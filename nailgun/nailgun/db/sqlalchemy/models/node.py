@@ -226,6 +226,24 @@ class NodeAttributes(Base):
     vms_conf = Column(JSON, default=[], server_default='[]')
 
 
+class NodeDeploymentInfo(Base):
+    """Last serialized deployment info of a node.
+
+    Keeps per-role data produced by the deployment serializer together
+    with a checksum of its inputs, so that unchanged nodes don't have
+    to be serialized again.
+    """
+    __tablename__ = 'node_deployment_info'
+    id = Column(Integer, primary_key=True)
+    node_id = Column(
+        Integer,
+        ForeignKey('nodes.id', ondelete='CASCADE'),
+        nullable=False,
+        unique=True)
+    checksum = Column(String(40), nullable=False)
+    info = Column(JSON, default=[], server_default='[]', nullable=False)
+
+
 class NodeNICInterface(Base):
     __tablename__ = 'node_nic_interfaces'
     id = Column(Integer, primary_key=True)
@@ -22,6 +22,7 @@ from sqlalchemy import Unicode
 from sqlalchemy import UniqueConstraint
 
 from sqlalchemy.dialects import postgresql as psql
+from sqlalchemy.orm import deferred
 from sqlalchemy.orm import relationship
 
 from nailgun import consts
@@ -57,7 +58,7 @@ class Release(Base):
     roles_metadata = Column(JSON, default={})
     network_roles_metadata = Column(JSON, default=[], server_default='[]')
     wizard_metadata = Column(JSON, default={})
-    deployment_tasks = Column(JSON, default=[])
+    deployment_tasks = deferred(Column(JSON, default=[]))
     vmware_attributes_metadata = Column(JSON, default=[])
     components_metadata = Column(
         MutableList.as_mutable(JSON), default=[], server_default='[]')
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from sqlalchemy import BigInteger
+from sqlalchemy import Column
+from sqlalchemy import String
+
+from nailgun.db.sqlalchemy.models.base import Base
+
+
+class Revision(Base):
+    """Counter of committed changes of a table (see nailgun.db.revisions)"""
+
+    __tablename__ = 'revisions'
+    name = Column(String(64), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
@@ -14,21 +14,35 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from datetime import datetime
 import uuid
 
 from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy.dialects import postgresql as psql
 from sqlalchemy import Enum
+from sqlalchemy import event
 from sqlalchemy import Float
 from sqlalchemy import ForeignKey
+from sqlalchemy import inspect
 from sqlalchemy import Integer
+from sqlalchemy import LargeBinary
+from sqlalchemy.orm import attributes
+from sqlalchemy.orm import exc as orm_exc
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm import relationship, backref
+from sqlalchemy.orm.util import was_deleted
 from sqlalchemy import String
 from sqlalchemy import Text
-from sqlalchemy.orm import relationship, backref, deferred
 
 from nailgun import consts
 from nailgun.db import db
 from nailgun.db.sqlalchemy.models.base import Base
 from nailgun.db.sqlalchemy.models.fields import JSON
+from nailgun.db import task_payloads
+
+#: marks cache of task which is not stored yet
+_PENDING = object()
 
 
 class Task(Base):
@@ -49,7 +63,9 @@ class Task(Base):
         default='running'
     )
     progress = Column(Integer, default=0)
-    cache = deferred(Column(JSON, default={}))
+    # cache is kept in task_payloads, see Task.cache
+    cache_checksum = Column(
+        String(40), ForeignKey('task_payloads.checksum'), nullable=True)
     result = Column(JSON, default={})
     parent_id = Column(Integer, ForeignKey('tasks.id'))
     subtasks = relationship(
@@ -74,6 +90,35 @@ class Task(Base):
             self.status
         )
 
+    @property
+    def cache(self):
+        """Data of the task, usually the message sent to astute.
+
+        It's loaded from payloads store on the first access.
+        """
+        if was_deleted(self):
+            # the same as for deferred column of deleted row
+            raise orm_exc.ObjectDeletedError(inspect(self))
+
+        checksum, value = self.__dict__.get('_cache', (None, {}))
+        if checksum is _PENDING:
+            return value
+        if self.cache_checksum is None:
+            return {}
+        if checksum != self.cache_checksum:
+            session = object_session(self) or db()
+            value = task_payloads.load(
+                session.connection(), self.cache_checksum)
+            self.__dict__['_cache'] = (self.cache_checksum, value)
+        return value
+
+    @cache.setter
+    def cache(self, value):
+        # the value is stored on flush, so it still can be changed
+        # in place the same way as a value of JSON column
+        self.__dict__['_cache'] = (_PENDING, value)
+        attributes.flag_modified(self, 'cache_checksum')
+
     def create_subtask(self, name, **kwargs):
         if not name:
             raise ValueError("Subtask name not specified")
@@ -82,3 +127,32 @@ class Task(Base):
         self.subtasks.append(task)
         db().flush()
         return task
+
+
+@event.listens_for(Task, 'before_insert')
+@event.listens_for(Task, 'before_update')
+def _store_cache(mapper, connection, task):
+    checksum, value = task.__dict__.get('_cache', (None, None))
+    if checksum is not _PENDING:
+        return
+
+    if value is None:
+        task.cache_checksum = None
+    else:
+        task.cache_checksum = task_payloads.store(connection, value)
+        task_payloads.purge(connection)
+    task.__dict__['_cache'] = (task.cache_checksum, value)
+
+
+class TaskPayload(Base):
+    """Compressed JSON document which is stored by its checksum.
+
+    See nailgun.db.task_payloads for details.
+    """
+    __tablename__ = 'task_payloads'
+    checksum = Column(String(40), primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    # checksums of chunks which are used by the document
+    refs = Column(psql.ARRAY(String(40)), nullable=False,
+                  default=[], server_default='{}')
+    used_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Content-addressed store of big JSON documents of tasks
+
+Documents are compressed and stored by checksums of their content.
+Big items of lists, e.g. data of nodes in astute messages, are stored
+as separate chunks, so documents which contain the same items share
+them.
+"""
+
+import copy
+import datetime
+import hashlib
+import zlib
+
+from oslo_serialization import jsonutils
+import six
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as psql
+from sqlalchemy import exc as sa_exc
+
+from nailgun.db.sqlalchemy.models.fields import JSON
+
+
+#: items of lists which take this number of bytes or more
+#: are stored as separate chunks
+CHUNK_MIN_SIZE = 1024
+
+#: unreferenced payloads are purged only if they weren't used for this
+#: time, so payloads which are being stored by concurrent transactions
+#: are not purged
+PURGE_TIMEOUT = datetime.timedelta(hours=1)
+
+_REF_KEY = '__payload__'
+
+_payloads = sa.sql.table(
+    'task_payloads',
+    sa.sql.column('checksum', sa.String(40)),
+    sa.sql.column('data', sa.LargeBinary),
+    sa.sql.column('refs', psql.ARRAY(sa.String(40))),
+    sa.sql.column('used_at', sa.DateTime),
+)
+
+_tasks = sa.sql.table(
+    'tasks',
+    sa.sql.column('cache_checksum', sa.String(40)),
+)
+
+
+def store(connection, document):
+    """Stores document, returns its checksum.
+
+    :param connection: connection which transaction is used
+    :param document: JSON serializable document
+    :returns: checksum of the document
+    """
+    chunks = {}
+    root = _encode(_split(document, chunks))
+    checksum = _checksum(root)
+
+    payloads = dict(chunks)
+    payloads[checksum] = root
+    now = datetime.datetime.utcnow()
+
+    while True:
+        # used payloads are touched, so they aren't purged before
+        # this transaction is committed
+        existing = set(row[0] for row in connection.execute(
+            _payloads.update().where(
+                _payloads.c.checksum.in_(sorted(payloads))
+            ).values(used_at=now).returning(_payloads.c.checksum)))
+
+        missing = sorted(set(payloads) - existing)
+        if not missing:
+            break
+        try:
+            with connection.begin_nested():
+                connection.execute(_payloads.insert(), [{
+                    'checksum': name,
+                    'data': zlib.compress(payloads[name]),
+                    'refs': sorted(chunks) if name == checksum else [],
+                    'used_at': now,
+                } for name in missing])
+            break
+        except sa_exc.IntegrityError:
+            # the same payloads were stored by concurrent transaction
+            continue
+
+    return checksum
+
+
+def load(connection, checksum):
+    """Loads document by its checksum.
+
+    :param connection: connection which transaction is used
+    :param checksum: checksum of the document
+    :returns: document or None if it is not found
+    """
+    root = connection.execute(
+        sa.select([_payloads.c.data, _payloads.c.refs]).where(
+            _payloads.c.checksum == checksum)).first()
+    if root is None:
+        return None
+
+    chunks = {}
+    if root.refs:
+        chunks = dict(connection.execute(
+            sa.select([_payloads.c.checksum, _payloads.c.data]).where(
+                _payloads.c.checksum.in_(root.refs))))
+    return _join(_decode(root.data), chunks, set())
+
+
+def purge(connection):
+    """Removes payloads which are not referenced by tasks.
+
+    :param connection: connection which transaction is used
+    """
+    roots = _payloads.alias('roots')
+    used_roots = sa.select([_tasks.c.cache_checksum]).where(
+        _tasks.c.cache_checksum.isnot(None))
+    used_chunks = sa.select([sa.func.unnest(roots.c.refs)]).where(
+        roots.c.checksum.in_(used_roots))
+
+    connection.execute(_payloads.delete().where(sa.and_(
+        _payloads.c.used_at < datetime.datetime.utcnow() - PURGE_TIMEOUT,
+        ~_payloads.c.checksum.in_(used_roots),
+        ~_payloads.c.checksum.in_(used_chunks),
+    )))
+
+
+def _encode(document):
+    # keys are sorted, so equal documents have the same checksum
+    return jsonutils.dumps(document, sort_keys=True)
+
+
+def _decode(data):
+    return JSON.loads(zlib.decompress(bytes(data)))
+
+
+def _checksum(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _split(document, chunks):
+    """Replaces big items of lists with references to chunks."""
+    if isinstance(document, dict):
+        return dict(
+            (k, _split(v, chunks)) for k, v in six.iteritems(document))
+
+    if isinstance(document, (list, tuple)):
+        items = []
+        for item in document:
+            if isinstance(item, dict):
+                data = _encode(item)
+                if len(data) >= CHUNK_MIN_SIZE:
+                    checksum = _checksum(data)
+                    chunks[checksum] = data
+                    items.append({_REF_KEY: checksum})
+                    continue
+            items.append(_split(item, chunks))
+        return items
+
+    return document
+
+
+def _join(document, chunks, used):
+    """Replaces references to chunks with their data."""
+    if isinstance(document, dict):
+        return dict(
+            (k, _join(v, chunks, used)) for k, v in six.iteritems(document))
+
+    if isinstance(document, list):
+        items = []
+        for item in document:
+            if isinstance(item, dict) and list(item) == [_REF_KEY]:
+                checksum = item[_REF_KEY]
+                if checksum in used:
+                    # the same chunk is used several times in document
+                    item = copy.deepcopy(chunks[checksum])
+                else:
+                    chunks[checksum] = _decode(chunks[checksum])
+                    used.add(checksum)
+                    item = chunks[checksum]
+            else:
+                item = _join(item, chunks, used)
+            items.append(item)
+        return items
+
+    return document
@@ -13,7 +13,57 @@
 #    under the License.
 
 
+import threading
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+
 from nailgun.expression.expression_parser import parse
+from nailgun.settings import settings
+
+
+class CompiledExpressionsCache(object):
+    """Process-wide LRU cache of compiled expressions.
+
+    Compiled expressions don't depend on models, so they are keyed
+    on expression text only and shared between Expression instances.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        # PLY parser is not reentrant, parsing must be serialized too
+        self._lock = threading.Lock()
+
+    def get(self, expression_text):
+        with self._lock:
+            try:
+                compiled = self._items.pop(expression_text)
+                self.hits += 1
+            except KeyError:
+                compiled = parse(expression_text)
+                self.misses += 1
+                if len(self._items) >= self.max_size:
+                    self._items.popitem(last=False)
+            self._items[expression_text] = compiled
+            return compiled
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+compiled_expressions = CompiledExpressionsCache(
+    settings.EXPRESSIONS_CACHE_SIZE)
 
 
 class Expression(object):
@@ -21,7 +71,7 @@ class Expression(object):
         self.expression_text = expression_text
         self.models = models if models is not None else {}
         self.strict = strict
-        self.compiled_expression = parse(self)
+        self.compiled_expression = compiled_expressions.get(expression_text)
 
     def evaluate(self):
-        return self.compiled_expression()
+        return self.compiled_expression(self)
@@ -79,8 +79,6 @@ def t_error(t):
 
 ply.lex.lex()
 
-expression = None
-
 precedence = (
     ('left', 'OR'),
     ('left', 'AND'),
@@ -98,15 +96,15 @@ def p_expression_binop(p):
     """
     result, arg1, op, arg2 = p
     if op == '==':
-        result = lambda: arg1() == arg2()
+        result = lambda e: arg1(e) == arg2(e)
     elif op == '!=':
-        result = lambda: arg1() != arg2()
+        result = lambda e: arg1(e) != arg2(e)
     elif op == 'or':
-        result = lambda: arg1() or arg2()
+        result = lambda e: arg1(e) or arg2(e)
     elif op == 'and':
-        result = lambda: arg1() and arg2()
+        result = lambda e: arg1(e) and arg2(e)
     elif op == 'in':
-        result = lambda: arg1() in arg2()
+        result = lambda e: arg1(e) in arg2(e)
     p[0] = SubexpressionWrapper(result)
 
 
@@ -114,7 +112,7 @@ def p_not_expression(p):
     """expression : NOT expression
     """
     subexpression = p[2]
-    p[0] = SubexpressionWrapper(lambda: not subexpression())
+    p[0] = SubexpressionWrapper(lambda e: not subexpression(e))
 
 
 def p_expression_group(p):
@@ -136,7 +134,7 @@ def p_expression_scalar(p):
 def p_expression_modelpath(p):
     """expression : MODELPATH
     """
-    p[0] = ModelPathWrapper(p[1], expression)
+    p[0] = ModelPathWrapper(p[1])
 
 
 def p_error(p):
@@ -146,7 +144,10 @@ def p_error(p):
 parser = ply.yacc.yacc(debug=False, write_tables=False)
 
 
-def parse(expr):
-    global expression
-    expression = expr
-    return parser.parse(expression.expression_text)
+def parse(expression_text):
+    """Compiles expression text into a callable.
+
+    The result doesn't depend on models, it should be called
+    with an Expression instance which provides models and strict flag.
+    """
+    return parser.parse(expression_text)
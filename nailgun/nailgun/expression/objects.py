@@ -17,10 +17,10 @@ class ScalarWrapper(object):
     def __init__(self, value):
         self.value = value
 
-    def evaluate(self):
+    def evaluate(self, expression):
         return self.value
 
-    def __call__(self):
+    def __call__(self, expression):
         return self.value
 
 
@@ -28,13 +28,11 @@ class SubexpressionWrapper(object):
     def __init__(self, subexpression):
         self.subexpression = subexpression
 
-    def evaluate(self):
-        self.value = self.subexpression()
-        return self.value
+    def evaluate(self, expression):
+        return self.subexpression(expression)
 
-    def __call__(self):
-        self.evaluate()
-        return self.value
+    def __call__(self, expression):
+        return self.evaluate(expression)
 
 
 class ModelPath(object):
@@ -47,38 +45,42 @@ class ModelPath(object):
             self.model_name = path_parts[0]
             self.attribute = path_parts[1]
 
-    def set_model(self, models):
+    def get_model(self, models):
         if self.model_name not in models:
             raise KeyError('No model with name "{0}" defined'.format(
                 self.model_name))
-        self.model = models[self.model_name]
+        return models[self.model_name]
 
-    def get_value(self):
+    def get_value(self, models):
         def get_attribute_value(model, path):
             value = model[path.pop(0)]
             return get_attribute_value(value, path) if len(path) else value
-        return get_attribute_value(self.model, self.attribute.split('.'))
+        return get_attribute_value(self.get_model(models),
+                                   self.attribute.split('.'))
 
 
 class ModelPathWrapper(object):
-    def __init__(self, path, expression):
+    """Reference to a model attribute within a compiled expression.
+
+    Models are not bound at compile time, they are taken from
+    the expression being evaluated, so compiled expressions can be
+    shared between Expression instances with different models.
+    """
+
+    def __init__(self, path):
         self.path = path
         self.model_path = ModelPath(path)
-        self.expression = expression
 
-    def evaluate(self):
-        self.model_path.set_model(self.expression.models)
+    def evaluate(self, expression):
         result = None
         try:
-            result = self.model_path.get_value()
+            result = self.model_path.get_value(expression.models)
         except (KeyError, AttributeError):
-            if self.expression.strict:
+            if expression.strict:
                 raise TypeError(
                     'Value of {0} is undefined. Set options.strict'
                     ' to false to allow undefined values.'.format(self.path))
-        self.value = result
-        return self.model_path
+        return result
 
-    def __call__(self):
-        self.evaluate()
-        return self.value
+    def __call__(self, expression):
+        return self.evaluate(expression)
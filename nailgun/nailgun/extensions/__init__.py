@@ -22,5 +22,6 @@ from nailgun.extensions.base import fire_callback_on_node_delete
 from nailgun.extensions.base import fire_callback_on_node_collection_delete
 from nailgun.extensions.base import fire_callback_on_node_create
 from nailgun.extensions.base import fire_callback_on_node_update
+from nailgun.extensions.base import fire_callback_on_node_collection_update
 from nailgun.extensions.base import fire_callback_on_node_reset
 from nailgun.extensions.base import fire_callback_on_cluster_delete
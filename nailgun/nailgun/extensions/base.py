@@ -90,6 +90,11 @@ def fire_callback_on_node_update(node):
         extension.on_node_update(node)
 
 
+def fire_callback_on_node_collection_update(nodes):
+    for extension in get_all_extensions():
+        extension.on_node_collection_update(nodes)
+
+
 def fire_callback_on_node_reset(node):
     for extension in get_all_extensions():
         extension.on_node_reset(node)
@@ -165,6 +170,16 @@ class BaseExtension(object):
     def on_node_update(cls, node):
         """Callback which gets executed when node is updated"""
 
+    @classmethod
+    def on_node_collection_update(cls, nodes):
+        """Callback which gets executed when nodes are updated in bulk
+
+        Falls back to :func:`on_node_update` for every node, extensions
+        which can handle the whole collection at once should override it.
+        """
+        for node in nodes:
+            cls.on_node_update(node)
+
     @classmethod
     def on_node_reset(cls, node):
         """Callback which gets executed when node is reseted"""
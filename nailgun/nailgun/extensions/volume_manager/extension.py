@@ -20,6 +20,7 @@ import six
 
 from nailgun.extensions import BaseExtension
 from nailgun.logger import logger
+from nailgun.objects import Cluster
 from nailgun.objects import Node
 from nailgun.objects import Notification
 
@@ -67,17 +68,45 @@ class VolumeManagerExtension(BaseExtension):
         try:
             VolumeObject.set_default_node_volumes(node)
         except Exception as exc:
-            logger.exception(exc)
-            msg = "Failed to generate volumes for node '{0}': '{1}'".format(
-                node.human_readable_name, six.text_type(exc))
-            Notification.create({
-                'topic': 'error',
-                'message': msg,
-                'node_id': node.id})
+            cls._notify_volumes_failure(node, exc)
 
         if node.cluster_id:
             Node.add_pending_change(node, 'disks')
 
+    @classmethod
+    def set_default_nodes_volumes(cls, nodes):
+        """Generates and saves default volumes of nodes in bulk
+
+        :param nodes: list of Node instances
+        """
+        from .objects.volumes import VolumeObject
+
+        nodes_volumes = {}
+        for node in nodes:
+            try:
+                nodes_volumes[node.id] = \
+                    VolumeObject.get_default_node_volumes(node)
+            except Exception as exc:
+                cls._notify_volumes_failure(node, exc)
+        VolumeObject.set_nodes_volumes(nodes_volumes)
+
+        clusters_nodes = {}
+        for node in nodes:
+            if node.cluster_id:
+                clusters_nodes.setdefault(node.cluster, []).append(node.id)
+        for cluster, node_ids in six.iteritems(clusters_nodes):
+            Cluster.add_pending_changes_for_nodes(cluster, 'disks', node_ids)
+
+    @classmethod
+    def _notify_volumes_failure(cls, node, exc):
+        logger.exception(exc)
+        msg = "Failed to generate volumes for node '{0}': '{1}'".format(
+            node.human_readable_name, six.text_type(exc))
+        Notification.create({
+            'topic': 'error',
+            'message': msg,
+            'node_id': node.id})
+
     @classmethod
     def on_node_create(cls, node):
         cls.set_default_node_volumes(node)
@@ -86,6 +115,10 @@ class VolumeManagerExtension(BaseExtension):
     def on_node_update(cls, node):
         cls.set_default_node_volumes(node)
 
+    @classmethod
+    def on_node_collection_update(cls, nodes):
+        cls.set_default_nodes_volumes(nodes)
+
     @classmethod
     def on_node_reset(cls, node):
         cls.set_default_node_volumes(node)
@@ -19,13 +19,17 @@ Classes for working with disks and volumes.
 All sizes in megabytes.
 """
 
+from collections import OrderedDict
 from copy import deepcopy
 from functools import partial
+import hashlib
+import threading
 
 from oslo_serialization import jsonutils
 
 from nailgun.errors import errors
 from nailgun.logger import logger
+from nailgun.settings import settings
 
 from .objects.adapters import NailgunNodeAdapter
 
@@ -576,6 +580,56 @@ class Disk(object):
         return jsonutils.dumps(self.render(), indent=4)
 
 
+class VolumesLayoutsCache(object):
+    """Process-wide LRU cache of volumes layouts.
+
+    Allocation of volumes depends only on sizes of disks, RAM and
+    volumes which are allowed for the node, so nodes with the same
+    hardware and roles get the same layout. Cached layouts are copied
+    on both put and get, so they can't be changed by callers.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns copy of layout or None if it's not cached."""
+        with self._lock:
+            try:
+                layout = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items[key] = layout
+        return deepcopy(layout)
+
+    def put(self, key, layout):
+        layout = deepcopy(layout)
+        with self._lock:
+            if key in self._items:
+                del self._items[key]
+            elif len(self._items) >= self.max_size:
+                self._items.popitem(last=False)
+            self._items[key] = layout
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+layouts_cache = VolumesLayoutsCache(settings.VOLUMES_LAYOUTS_CACHE_SIZE)
+
+
 class VolumeManager(object):
 
     def _wrap_node(self, node):
@@ -598,6 +652,7 @@ class VolumeManager(object):
         # For swap calculation
         self.ram = node.ram
         self.allowed_volumes = node.get_node_spaces()
+        self._generators = self._get_generators()
 
         self.disks = []
         disks_count = len(node.disks)
@@ -622,9 +677,9 @@ class VolumeManager(object):
 
             self.disks.append(disk)
 
-        self.__logger('Initialized with node: %s' % node.full_name)
-        self.__logger('Initialized with volumes: %s' % self.volumes)
-        self.__logger('Initialized with disks: %s' % self.disks)
+        self.__logger('Initialized with node: %s', node.full_name)
+        self.__logger('Initialized with volumes: %s', self.volumes)
+        self.__logger('Initialized with disks: %s', self.disks)
 
     @staticmethod
     def _build_disk_id_by_keys(data, keys=(), keys_for_lists=()):
@@ -726,8 +781,8 @@ class VolumeManager(object):
 
     def set_volume_size(self, disk_id, volume_name, size):
         """Set size of volume."""
-        self.__logger('Update volume size for disk=%s volume_name=%s size=%s' %
-                      (disk_id, volume_name, size))
+        self.__logger('Update volume size for disk=%s volume_name=%s size=%s',
+                      disk_id, volume_name, size)
 
         disk = filter(lambda disk: disk.id == disk_id, self.disks)[0]
 
@@ -753,21 +808,21 @@ class VolumeManager(object):
 
                 self.volumes[idx] = self.expand_generators(vg_template)
 
-        self.__logger('Updated volume size %s' % self.volumes)
+        self.__logger('Updated volume size %s', self.volumes)
         return self.volumes
 
     def set_volume_flags(self, disk_id, volume):
         """Set flags of volume."""
         volume_name = volume['name']
-        self.__logger('Update volume flags for disk=%s volume_name=%s' %
-                      (disk_id, volume_name))
+        self.__logger('Update volume flags for disk=%s volume_name=%s',
+                      disk_id, volume_name)
 
         disk = next(d for d in self.disks if d.id == disk_id)
 
         if volume.get('keep_data', False):
             disk.set_keep_data_flag(volume_name, volume.get('keep_data'))
 
-        self.__logger('Updated volume flags %s' % self.volumes)
+        self.__logger('Updated volume flags %s', self.volumes)
         return self.volumes
 
     def get_space_type(self, volume_name):
@@ -800,7 +855,7 @@ class VolumeManager(object):
 
         return size
 
-    def call_generator(self, generator, *args):
+    def _get_generators(self):
         generators = {
             # Calculate swap space based on total RAM
             'calc_swap_size': self._calc_swap_size,
@@ -834,14 +889,16 @@ class VolumeManager(object):
 
         generators['calc_os_vg_size'] = generators['calc_os_size']
         generators['calc_min_os_size'] = generators['calc_os_size']
+        return generators
 
-        if generator not in generators:
+    def call_generator(self, generator, *args):
+        if generator not in self._generators:
             raise errors.CannotFindGenerator(
                 u'Cannot find generator %s' % generator)
 
-        result = generators[generator](*args)
-        self.__logger('Generator %s with args %s returned result: %s' %
-                      (generator, args, result))
+        result = self._generators[generator](*args)
+        self.__logger('Generator %s with args %s returned result: %s',
+                      generator, args, result)
         return result
 
     def _calc_root_size(self):
@@ -892,28 +949,27 @@ class VolumeManager(object):
 
     def _allocate_all_free_space_for_volume(self, volume_info):
         """Allocate all existing space on all disks."""
-        self.__logger('Allocate all free space for volume %s ' % (volume_info))
+        self.__logger('Allocate all free space for volume %s ', volume_info)
 
         for disk in self.disks:
             if disk.free_space > 0:
                 self.__logger('Allocating all available space for volume: '
-                              'disk: %s volume: %s' %
-                              (disk.id, volume_info))
+                              'disk: %s volume: %s', disk.id, volume_info)
                 self._get_allocator(disk, volume_info)(volume_info)
             else:
                 self.__logger('Not enough free space for volume '
-                              'allocation: disk: %s volume: %s' %
-                              (disk.id, volume_info))
+                              'allocation: disk: %s volume: %s',
+                              disk.id, volume_info)
                 self._get_allocator(disk, volume_info)(volume_info, 0)
 
     def _allocate_size_for_volume(self, volume_info, size):
         """Allocate volumes with particaular size."""
-        self.__logger('Allocate volume %s with size %s ' % (volume_info, size))
+        self.__logger('Allocate volume %s with size %s ', volume_info, size)
 
         not_allocated_size = size
         for disk in self.disks:
-            self.__logger('Creating volume: disk: %s, vg: %s' %
-                          (disk.id, volume_info))
+            self.__logger('Creating volume: disk: %s, vg: %s',
+                          disk.id, volume_info)
 
             if disk.free_space >= not_allocated_size:
                 # if we can allocate all required size
@@ -932,7 +988,7 @@ class VolumeManager(object):
 
     def _allocate_full_disk(self, volume_info):
         """Allocate full disks for a volume."""
-        self.__logger('Allocate full disk for volume %s ' % (volume_info))
+        self.__logger('Allocate full disk for volume %s ', volume_info)
 
         for disk in self.disks:
             existing_volumes = [v for v in disk.volumes if not is_service(v)
@@ -959,9 +1015,52 @@ class VolumeManager(object):
         self.volumes = [d.render() for d in self.disks]
 
         if not self.allowed_volumes:
-            self.__logger('Role is None return volumes: %s' % self.volumes)
+            self.__logger('Role is None return volumes: %s', self.volumes)
             return self.volumes
 
+        key = self._get_layout_key()
+        layout = layouts_cache.get(key)
+        if layout is not None:
+            self.__logger('Volumes layout is taken from cache')
+            self._set_layout(layout)
+        else:
+            self._allocate_volumes()
+            layouts_cache.put(key, self._get_layout())
+
+        self.__logger('Generated volumes: %s', self.volumes)
+        return self.volumes
+
+    def _get_layout_key(self):
+        """Returns key of volumes layout of the node.
+
+        Identifiers and names of disks don't affect allocation,
+        so they aren't included.
+        """
+        data = {
+            'ram': self.ram,
+            'disks': [(d.size, d.boot_is_raid, d.max_lvm_meta_pool_size)
+                      for d in self.disks],
+            'volumes': self.allowed_volumes,
+        }
+        return hashlib.sha1(jsonutils.dumps(data, sort_keys=True)).hexdigest()
+
+    def _get_layout(self):
+        return {
+            'volumes': self.volumes,
+            'disks': [(d.volumes, d.free_space) for d in self.disks],
+        }
+
+    def _set_layout(self, layout):
+        volumes = layout['volumes']
+        # rendered disks go first in volumes
+        for disk, rendered, (disk_volumes, free_space) in zip(
+                self.disks, volumes, layout['disks']):
+            rendered.update(id=disk.id, name=disk.name, extra=disk.extra)
+            disk.volumes = disk_volumes
+            disk.free_space = free_space
+        self.volumes = volumes
+
+    def _allocate_volumes(self):
         self.volumes.extend(only_vg(self.allowed_volumes))
 
         # Firstly allocate volumes which required
@@ -993,9 +1092,6 @@ class VolumeManager(object):
 
         self.volumes = self.expand_generators(self.volumes)
 
-        self.__logger('Generated volumes: %s' % self.volumes)
-        return self.volumes
-
     @property
     def _all_disks_free_space(self):
         return sum([d.free_space for d in self.disks])
@@ -1027,9 +1123,8 @@ class VolumeManager(object):
             if generator is not None:
                 genval = self.call_generator(
                     generator, *generator_args)
-                self.__logger(
-                    'Generator {0} with args {1} expanded to: {2}'.format(
-                        generator, generator_args, genval))
+                self.__logger('Generator %s with args %s expanded to: %s',
+                              generator, generator_args, genval)
                 return genval
             else:
                 return dict((k, self.expand_generators(v))
@@ -1048,12 +1143,8 @@ class VolumeManager(object):
         disks_space = sum([d.size for d in self.disks])
         minimal_installation_size = self.__calc_minimal_installation_size()
 
-        self.__logger(
-            'Checking disks space: disks space {0}, minimal size {1}'.format(
-                disks_space,
-                minimal_installation_size
-            )
-        )
+        self.__logger('Checking disks space: disks space %s, minimal size %s',
+                      disks_space, minimal_installation_size)
 
         if disks_space < minimal_installation_size:
             raise errors.NotEnoughFreeSpace()
@@ -1085,5 +1176,7 @@ class VolumeManager(object):
 
         return min_installation_size
 
-    def __logger(self, message):
-        logger.debug('VolumeManager %s: %s', id(self), message)
+    def __logger(self, message, *args):
+        # arguments are formatted only if debug messages are logged,
+        # volumes and disks are big enough to make it noticeable
+        logger.debug('VolumeManager %s: ' + message, id(self), *args)
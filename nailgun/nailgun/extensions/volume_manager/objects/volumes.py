@@ -16,6 +16,8 @@
 
 from copy import deepcopy
 
+import six
+
 from ..manager import VolumeManager
 from ..models.node_volumes import NodeVolumes
 from .adapters import NailgunNodeAdapter
@@ -61,9 +63,34 @@ class VolumeObject(object):
 
         return volumes
 
+    @classmethod
+    def set_nodes_volumes(cls, nodes_volumes):
+        """Sets volumes of several nodes at once
+
+        :param nodes_volumes: dict of node id -> volumes for the node
+        """
+        if not nodes_volumes:
+            return
+
+        volumes_db = db().query(NodeVolumes).filter(
+            NodeVolumes.node_id.in_(nodes_volumes))
+        existing = dict((v.node_id, v) for v in volumes_db)
+
+        for node_id, volumes in six.iteritems(nodes_volumes):
+            if node_id in existing:
+                existing[node_id].volumes = deepcopy(volumes)
+            else:
+                db().add(NodeVolumes(node_id=node_id, volumes=volumes))
+
+        db().flush()
+
+    @classmethod
+    def get_default_node_volumes(cls, node):
+        return VolumeManager(node).gen_volumes_info()
+
     @classmethod
     def set_default_node_volumes(cls, node):
-        cls.set_volumes(node, VolumeManager(node).gen_volumes_info())
+        cls.set_volumes(node, cls.get_default_node_volumes(node))
 
     @classmethod
     def _get_model_by_node_id(cls, node_id):
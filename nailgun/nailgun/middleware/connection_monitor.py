@@ -12,10 +12,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import atexit
 import datetime
 import hashlib
 import itertools
+import os
 import six
+import threading
 
 from nailgun.middleware import utils
 
@@ -23,6 +26,8 @@ from nailgun.db import db
 from nailgun.db.sqlalchemy.models import ActionLog
 
 from nailgun import consts
+from nailgun.logger import logger
+from nailgun.settings import settings
 
 
 compiled_urls_actions_mapping = utils.compile_mapping_keys(
@@ -117,14 +122,162 @@ compiled_urls_actions_mapping = utils.compile_mapping_keys(
     }
 )
 
+urls_actions_matcher = utils.CombinedMatcher(
+    six.iterkeys(compiled_urls_actions_mapping))
+
+
+class ActionLogsWriter(object):
+    """Stores every action log in DB right away."""
+
+    def write(self, action_log_kwargs):
+        db.add(ActionLog(**action_log_kwargs))
+        db.commit()
+
+
+class AsyncActionLogsWriter(object):
+    """Stores action logs in DB in background.
+
+    Action logs are put into a bounded queue which is drained by
+    a daemon thread, the thread stores them with bulk inserts. If the
+    queue is full, action log is stored synchronously, so records
+    aren't lost under heavy load. When the process exits, the queue
+    is drained within shutdown_timeout seconds.
+    """
+
+    # marks the end of the queue for the writer thread
+    _stop = object()
+
+    def __init__(self, queue_size, batch_size, shutdown_timeout=10):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.shutdown_timeout = shutdown_timeout
+        self.queue = None
+        self.dropped = 0
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def write(self, action_log_kwargs):
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(action_log_kwargs)
+        except six.moves.queue.Full:
+            logger.warning("Action logs queue is full, storing synchronously")
+            try:
+                self._store([action_log_kwargs])
+            except Exception:
+                logger.exception("Failed to store action log")
+                self._drop(1)
+
+    def flush(self):
+        """Blocks until all queued action logs are stored."""
+        if self.queue is not None and self._pid == os.getpid():
+            self.queue.join()
+
+    def stop(self):
+        """Stores queued action logs and stops the writer thread."""
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        try:
+            self.queue.put(self._stop, timeout=self.shutdown_timeout)
+        except six.moves.queue.Full:
+            pass
+        self._thread.join(self.shutdown_timeout)
+        if self._thread.is_alive():
+            self._drop(self.queue.qsize())
+
+    def _drop(self, count):
+        if count:
+            with self._lock:
+                self.dropped += count
+            logger.error("%d action logs are dropped, %d in total",
+                         count, self.dropped)
+
+    def _ensure_started(self):
+        # threads don't survive fork, so the writer thread is started
+        # lazily in every uWSGI worker
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        with self._lock:
+            if self._pid != pid:
+                self.queue = six.moves.queue.Queue(maxsize=self.queue_size)
+                self._thread = threading.Thread(
+                    target=self._run, name='action-logs-writer')
+                self._thread.daemon = True
+                self._thread.start()
+                atexit.register(self.stop)
+                self._pid = pid
+
+    def _run(self):
+        stopped = False
+        while not stopped:
+            batch = []
+            item = self.queue.get()
+            while True:
+                if item is self._stop:
+                    self.queue.task_done()
+                    stopped = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except six.moves.queue.Empty:
+                    break
+
+            if not batch:
+                continue
+            try:
+                self._store(batch)
+            except Exception:
+                logger.exception("Failed to store %d action logs", len(batch))
+                self._drop(len(batch))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _store(self, action_logs_kwargs):
+        try:
+            db().execute(ActionLog.__table__.insert(), action_logs_kwargs)
+            db().commit()
+        except Exception:
+            db().rollback()
+            raise
+
+
+_action_logs_writer = None
+
+
+def get_action_logs_writer():
+    """Returns process-wide action logs writer configured by settings."""
+    global _action_logs_writer
+    if _action_logs_writer is None:
+        config = settings.ACTION_LOGS_WRITER or {}
+        if config.get('async'):
+            _action_logs_writer = AsyncActionLogsWriter(
+                queue_size=config['queue_size'],
+                batch_size=config['batch_size'])
+        else:
+            _action_logs_writer = ActionLogsWriter()
+    return _action_logs_writer
+
 
 class ConnectionMonitorMiddleware(object):
 
     methods_to_analyze = ('POST', 'PUT', 'DELETE', 'PATCH')
 
+    # writer of action logs, it's taken from get_action_logs_writer()
+    # if not set explicitly
+    writer = None
+
     def __init__(self, app):
         self.app = app
         self.status = None
+        if self.writer is None:
+            self.writer = get_action_logs_writer()
 
     def __call__(self, env, start_response):
         if env['REQUEST_METHOD'] in self.methods_to_analyze:
@@ -179,19 +332,14 @@ class ConnectionMonitorMiddleware(object):
 
                 create_kwargs['cluster_id'] = cluster_id
 
-                db.add(ActionLog(**create_kwargs))
-                db.commit()
+                self.writer.write(create_kwargs)
 
                 return response_to_propagate
 
         return self.app(env, start_response)
 
     def _get_url_matcher(self, url):
-        for url_matcher in six.iterkeys(compiled_urls_actions_mapping):
-            if url_matcher.match(url):
-                return url_matcher
-
-        return None
+        return urls_actions_matcher.match(url)
 
     def _get_actor_id(self, env):
         token_id = env.get('HTTP_X_AUTH_TOKEN')
@@ -44,3 +44,34 @@ def get_group_from_matcher(matcher_obj, string_to_match, group_name):
         return groups_dictionary.get(group_name)
 
     return None
+
+
+class CombinedMatcher(object):
+    """Matches a string against several compiled patterns at once.
+
+    Patterns are joined into a single regular expression, so only one
+    match is performed instead of trying patterns one by one. Named
+    groups of patterns are turned into non-capturing ones, index of
+    the matched alternative is taken from lastindex.
+    """
+
+    named_group_re = re.compile(r'\(\?P<\w+>')
+
+    def __init__(self, compiled_patterns):
+        self.patterns_by_group = {}
+        parts = []
+        group_index = 1
+        for compiled in compiled_patterns:
+            part = '({0})'.format(
+                self.named_group_re.sub('(?:', compiled.pattern))
+            parts.append(part)
+            self.patterns_by_group[group_index] = compiled
+            group_index += re.compile(part).groups
+        self.combined = re.compile('|'.join(parts))
+
+    def match(self, string):
+        """Returns the compiled pattern which matches string or None."""
+        matched = self.combined.match(string)
+        if matched:
+            return self.patterns_by_group[matched.lastindex]
+        return None
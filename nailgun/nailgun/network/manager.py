@@ -17,7 +17,6 @@
 from collections import defaultdict
 
 from itertools import chain
-from itertools import groupby
 from itertools import islice
 
 from netaddr import IPAddress
@@ -488,18 +487,6 @@ class NetworkManager(object):
                 return False
         return True
 
-    @classmethod
-    def _iter_free_ips(cls, ip_ranges, ips_in_use):
-        """Iterator over free IP addresses in given IP ranges.
-
-        IP addresses which exist in ips_in_use are excluded from output.
-        """
-        for ip_range in ip_ranges:
-            for ip_addr in ip_range:
-                ip_str = str(ip_addr)
-                if ip_str not in ips_in_use:
-                    yield ip_str
-
     @classmethod
     def check_ips_belong_to_admin_ranges(cls, ips):
         """Check if every provided IP belongs to any Admin networks' IP range.
@@ -517,42 +504,59 @@ class NetworkManager(object):
         )
         return cls.check_ips_belong_to_ranges(ips, admin_ranges_db)
 
+    @classmethod
+    def _get_ips_in_use_within_ranges(cls, ip_ranges):
+        """Gets IP addresses from DB which belong to given IP ranges.
+
+        All occupied addresses are fetched with a single query,
+        the filtering by ranges is done on the DB side.
+
+        :param ip_ranges: list of netaddr.IPRange
+        :returns: list of IP addresses as strings
+        """
+        if not ip_ranges:
+            return []
+
+        ips_in_db = db().query(
+            IPAddr.ip_addr.distinct()
+        ).filter(
+            or_(*[IPAddr.ip_addr.between(str(r[0]), str(r[-1]))
+                  for r in ip_ranges])
+        )
+        return [ip[0] for ip in ips_in_db]
+
     @classmethod
     def get_free_ips_from_ranges(cls, net_name, ip_ranges, ips_in_use, count):
         """Gets the list of free IP addresses for given IP ranges.
 
         Required quantity of IPs is set in "count". IP addresses
         which exist in ips_in_use or exist in DB are excluded.
+        Free addresses are computed by subtraction of occupied
+        addresses from the ranges, so DB is queried only once.
         """
-        result = []
-        ip_iterator = cls._iter_free_ips(ip_ranges, ips_in_use)
-        while count > 0:
-            # Eager IP mining to not run DB query on every single IP when just
-            # 1 or 2 IPs are required and a long series of IPs from this range
-            # are occupied already.
-            free_ips = list(
-                islice(
-                    ip_iterator,
-                    0,
-                    max(count, consts.MIN_IPS_PER_DB_QUERY))
-            )
-            if not free_ips:
-                ranges_str = ','.join(str(r) for r in ip_ranges)
-                raise errors.OutOfIPs(
-                    "Not enough free IP addresses in ranges [{0}] of '{1}' "
-                    "network".format(ranges_str, net_name))
-
-            ips_in_db = db().query(
-                IPAddr.ip_addr.distinct()
-            ).filter(
-                IPAddr.ip_addr.in_(free_ips)
-            )
+        if count <= 0:
+            return []
 
-            for ip in ips_in_db:
-                free_ips.remove(ip[0])
-            free_ips = free_ips[:count]
-            result.extend(free_ips)
-            count -= len(free_ips)
+        versions = set(r.version for r in ip_ranges)
+        occupied = [
+            ip for ip in chain(
+                ips_in_use, cls._get_ips_in_use_within_ranges(ip_ranges))
+            if IPAddress(ip).version in versions
+        ]
+
+        result = []
+        for version in sorted(versions):
+            intervals = utils.get_free_ip_intervals(
+                [r for r in ip_ranges if r.version == version], occupied)
+            result.extend(islice(
+                utils.iter_ips_from_intervals(intervals, version),
+                count - len(result)))
+
+        if len(result) < count:
+            ranges_str = ','.join(str(r) for r in ip_ranges)
+            raise errors.OutOfIPs(
+                "Not enough free IP addresses in ranges [{0}] of '{1}' "
+                "network".format(ranges_str, net_name))
 
         return result
 
@@ -797,6 +801,40 @@ class NetworkManager(object):
                         NetworkGroup.id.in_(ng_ids)))
         db().flush()
 
+    @classmethod
+    def assign_networks_by_default_to_nodes(cls, nodes):
+        """Assigns networks by default to interfaces of several nodes.
+
+        Does the same as :func:`assign_networks_by_default` for every
+        node but fetches network groups with one query and flushes
+        the session once.
+
+        :param nodes: list of Node instances
+        """
+        assignments = []
+        for node in nodes:
+            for nic in node.interfaces:
+                while nic.assigned_networks_list:
+                    nic.assigned_networks_list.pop()
+
+            nics = dict((nic.id, nic) for nic in node.interfaces)
+            for nic in cls.get_default_interfaces_configuration(node):
+                if 'assigned_networks' in nic:
+                    assignments.append((
+                        nics[nic['id']],
+                        [ng['id'] for ng in nic['assigned_networks']]
+                    ))
+
+        ng_ids = set(ng_id for _, ids in assignments for ng_id in ids)
+        ngs = {}
+        if ng_ids:
+            ngs = dict((ng.id, ng) for ng in db().query(NetworkGroup).filter(
+                NetworkGroup.id.in_(ng_ids)))
+        for nic, ids in assignments:
+            nic.assigned_networks_list = [ngs[ng_id] for ng_id in ids
+                                          if ng_id in ngs]
+        db().flush()
+
     @classmethod
     def get_cluster_networkgroups_by_node(cls, node):
         """Method for receiving cluster network groups by node.
@@ -821,10 +859,17 @@ class NetworkManager(object):
                 for ng in nic.assigned_networks_list]
 
     @classmethod
-    def _get_admin_node_network(cls, node):
-        net = cls.get_admin_network_group(node_id=node.id)
+    def _get_admin_node_network(cls, node, net=None, ip_addr=None):
+        """Returns admin network data of node.
+
+        :param node: Node instance
+        :param net: admin NetworkGroup of node, it's fetched if not passed
+        :param ip_addr: admin IP of node, it's fetched if net isn't passed
+        """
+        if net is None:
+            net = cls.get_admin_network_group(node_id=node.id)
+            ip_addr = cls.get_admin_ip_for_node(node.id)
         net_cidr = IPNetwork(net.cidr)
-        ip_addr = cls.get_admin_ip_for_node(node.id)
         if ip_addr:
             ip_addr = cls.get_ip_w_cidr_prefix_len(ip_addr, net)
 
@@ -836,7 +881,7 @@ class NetworkManager(object):
             'netmask': str(net_cidr.netmask),
             'brd': str(net_cidr.broadcast),
             'gateway': net.gateway,
-            'dev': cls.get_admin_interface(node).name
+            'dev': cls.get_admin_interface(node, admin_net=net).name
         }
 
     @classmethod
@@ -880,6 +925,49 @@ class NetworkManager(object):
             # Node doesn't belong to any cluster, so it should not have nets
             return []
 
+        return cls._get_node_networks(node)
+
+    @classmethod
+    def get_nodes_networks(cls, nodes):
+        """Returns networks of several nodes, see get_node_networks().
+
+        Admin networks and admin IPs are fetched for all nodes at once,
+        so interfaces and IPs of nodes should be loaded eagerly to avoid
+        per node queries completely.
+
+        :param nodes: list of Node instances
+        :returns: dict of {node id: list of networks}
+        """
+        result = dict((node.id, []) for node in nodes)
+        nodes = [node for node in nodes if node.cluster_id is not None]
+        if not nodes:
+            return result
+
+        admin_nets = {}
+        for net in db().query(NetworkGroup).filter_by(
+                name='fuelweb_admin').order_by(NetworkGroup.id):
+            admin_nets.setdefault(net.group_id, net)
+
+        admin_ips = {}
+        for node_id, net_id, ip_addr in db().query(
+            IPAddr.node, IPAddr.network, IPAddr.ip_addr
+        ).filter(
+            IPAddr.node.in_([node.id for node in nodes]),
+            IPAddr.network.in_([net.id for net in admin_nets.values()])
+        ).order_by(IPAddr.id):
+            admin_ips.setdefault((node_id, net_id), ip_addr)
+
+        for node in nodes:
+            admin_net = (admin_nets.get(node.group_id) or
+                         admin_nets.get(None))
+            if admin_net is None:
+                raise errors.AdminNetworkNotFound()
+            result[node.id] = cls._get_node_networks(
+                node, admin_net, admin_ips.get((node.id, admin_net.id)))
+        return result
+
+    @classmethod
+    def _get_node_networks(cls, node, admin_net=None, admin_ip=None):
         network_data = []
         for interface in node.interfaces:
             networks_wo_admin = cls._get_networks_except_admin(
@@ -893,7 +981,8 @@ class NetworkManager(object):
                     network_data.append(cls._get_network_data_wo_ip(
                         node, interface, net))
 
-        network_data.append(cls._get_admin_node_network(node))
+        network_data.append(
+            cls._get_admin_node_network(node, admin_net, admin_ip))
 
         return network_data
 
@@ -1202,7 +1291,13 @@ class NetworkManager(object):
         }
 
     @classmethod
-    def get_admin_interface(cls, node):
+    def get_admin_interface(cls, node, admin_net=None):
+        """Returns interface of node which is connected to admin network.
+
+        :param node: Node instance
+        :param admin_net: admin NetworkGroup of node, it's fetched
+                          if not passed
+        """
         try:
             return cls._get_interface_by_network_name(
                 node, 'fuelweb_admin')
@@ -1210,8 +1305,11 @@ class NetworkManager(object):
             logger.debug(u'Cannot find interface with assigned admin '
                          'network group on %s', node.full_name)
 
+        if admin_net is None:
+            admin_net = cls.get_admin_network_group(node.id)
+        admin_cidr = IPNetwork(admin_net.cidr)
         for iface in node.nic_interfaces:
-            if cls.is_ip_belongs_to_admin_subnet(iface.ip_addr, node.id):
+            if iface.ip_addr and IPAddress(iface.ip_addr) in admin_cidr:
                 return iface
 
         logger.warning(u'Cannot find admin interface for node '
@@ -1973,6 +2071,113 @@ class AssignIPs61Mixin(AssignIPsLegacyMixin):
 
 
 class AssignIPs70Mixin(object):
+    @classmethod
+    def assign_ips_in_bulk(cls, cluster, nodes):
+        """Idempotent assignment of IPs from all cluster networks to nodes.
+
+        Unlike calling assign_ips() for every network, all required
+        data (networks of nodes, IP ranges and already assigned IPs)
+        is fetched with a few queries, missing assignments are computed
+        in memory and new IP addresses are stored with a single bulk
+        insert. Admin network is not processed here.
+
+        :param cluster: Cluster instance.
+        :type  cluster: instance
+        :param nodes: The sequence of Node objects
+        :type  nodes: iterable
+        :returns: None
+        :raises: errors.NodeNotBelongToCluster, errors.OutOfIPs
+        """
+        nodes_by_id = {}
+        for node in nodes:
+            if node.cluster_id != cluster.id:
+                raise errors.NodeNotBelongToCluster(
+                    u"Node id='{0}' doesn't belong to Cluster id='{1}'"
+                    .format(node.id, cluster.id)
+                )
+            nodes_by_id[node.id] = node
+
+        if not nodes_by_id:
+            return
+
+        node_ids_by_network = defaultdict(list)
+        query = (
+            db().query(Node.id, NetworkGroup.id)
+            .join(NodeGroup.nodes)
+            .join(NodeGroup.networks)
+            .filter(NodeGroup.cluster_id == cluster.id,
+                    NetworkGroup.name != consts.NETWORKS.fuelweb_admin,
+                    Node.id.in_(nodes_by_id))
+            .order_by(Node.id)
+        )
+        for node_id, net_id in query:
+            node_ids_by_network[net_id].append(node_id)
+
+        if not node_ids_by_network:
+            return
+
+        networks = (
+            db().query(NetworkGroup)
+            .options(joinedload('ip_ranges'))
+            .filter(NetworkGroup.id.in_(node_ids_by_network))
+            .order_by(NetworkGroup.id)
+        )
+
+        assigned_ips = defaultdict(list)
+        query = (
+            db().query(IPAddr.node, IPAddr.network, IPAddr.ip_addr)
+            .filter(IPAddr.node.in_(nodes_by_id),
+                    IPAddr.network.in_(node_ids_by_network))
+        )
+        for node_id, net_id, ip_addr in query:
+            assigned_ips[(node_id, net_id)].append(ip_addr)
+
+        new_ips = []
+        ips_in_use = set()
+        for network in networks:
+            if not network.meta.get('notation'):
+                continue
+
+            ip_ranges = [IPRange(r.first, r.last) for r in network.ip_ranges]
+            nodes_need_ips = []
+            for node_id in node_ids_by_network[network.id]:
+                if network.name == consts.NETWORKS.public and \
+                        not objects.Node.should_have_public_with_ip(
+                            nodes_by_id[node_id]):
+                    continue
+
+                ips = assigned_ips[(node_id, network.id)]
+                if any(IPAddress(ip) in r for ip in ips for r in ip_ranges):
+                    logger.info(
+                        u"Node id='{0}' already has an IP address "
+                        "inside '{1}' network.".format(node_id, network.name)
+                    )
+                    continue
+                nodes_need_ips.append(node_id)
+
+            if not nodes_need_ips:
+                continue
+
+            free_ips = cls.get_free_ips(
+                network, len(nodes_need_ips), ips_in_use=ips_in_use)
+            ips_in_use.update(free_ips)
+            for ip, node_id in zip(free_ips, nodes_need_ips):
+                logger.info(
+                    "Assigning IP for node '{0}' in network '{1}'".format(
+                        node_id, network.name)
+                )
+                new_ips.append(
+                    {'node': node_id, 'network': network.id, 'ip_addr': ip})
+
+        if new_ips:
+            # revisions of ip_addrs are increased by revisions tracking
+            # of Core statements
+            db().execute(IPAddr.__table__.insert(), new_ips)
+            # the insert bypasses the session, so already loaded
+            # collections of IPs have to be reloaded
+            for node_id in set(ip['node'] for ip in new_ips):
+                db().expire(nodes_by_id[node_id], ['ip_addrs'])
+
     @classmethod
     def assign_ips_for_nodes_w_template(cls, cluster, nodes):
         """Assign IPs for the case when network template is applied.
@@ -2001,34 +2206,5 @@ class AssignIPs70Mixin(object):
                 cluster, nodes
             )
 
-        nodes_by_id = dict((n.id, n) for n in nodes)
-
-        query = (
-            db().query(
-                Node.id,
-                NetworkGroup.id,
-                NetworkGroup.name,
-                NetworkGroup.meta)
-            .join(NodeGroup.nodes)
-            .join(NodeGroup.networks)
-            .filter(NodeGroup.cluster_id == cluster.id,
-                    NetworkGroup.name != consts.NETWORKS.fuelweb_admin)
-            .order_by(NetworkGroup.id)
-        )
-
-        # Group by NetworkGroup.id
-        for key, items in groupby(query, lambda x: x[1]):
-            head_item = next(items)
-            network_name = head_item[2]
-            network_metadata = head_item[3]
-            if not network_metadata.get('notation'):
-                continue
-
-            head = [nodes_by_id[head_item[0]]]
-            tail = (nodes_by_id[item[0]] for item in items)
-            cls.assign_ips(
-                cluster,
-                chain(iter(head), tail), network_name,
-            )
-
+        cls.assign_ips_in_bulk(cluster, nodes)
         cls.assign_admin_ips(nodes)
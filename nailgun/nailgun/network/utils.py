@@ -15,6 +15,7 @@
 #    under the License.
 
 import netaddr
+import six
 
 
 def is_same_mac(mac1, mac2):
@@ -27,3 +28,51 @@ def is_same_mac(mac1, mac2):
         return netaddr.EUI(mac1) == netaddr.EUI(mac2)
     except netaddr.AddrFormatError as e:
         raise ValueError(e)
+
+
+def get_free_ip_intervals(ip_ranges, ips_in_use):
+    """Subtract occupied IP addresses from the given IP ranges.
+
+    Addresses are handled as integers, so the result is computed
+    without iterating over every address of the ranges.
+
+    :param ip_ranges: iterable of netaddr.IPRange
+    :param ips_in_use: iterable of IP addresses (strings or netaddr.IPAddress)
+    :returns: sorted list of non-overlapping (first, last) integer pairs
+    """
+    intervals = []
+    for first, last in sorted((r.first, r.last) for r in ip_ranges):
+        if intervals and first <= intervals[-1][1] + 1:
+            intervals[-1][1] = max(intervals[-1][1], last)
+        else:
+            intervals.append([first, last])
+
+    used = sorted(set(int(netaddr.IPAddress(ip)) for ip in ips_in_use))
+
+    result = []
+    idx = 0
+    for first, last in intervals:
+        # skip occupied addresses which are below the current interval
+        while idx < len(used) and used[idx] < first:
+            idx += 1
+        start = first
+        while idx < len(used) and used[idx] <= last:
+            if used[idx] > start:
+                result.append((start, used[idx] - 1))
+            start = used[idx] + 1
+            idx += 1
+        if start <= last:
+            result.append((start, last))
+    return result
+
+
+def iter_ips_from_intervals(intervals, version=4):
+    """Iterate over IP addresses in the given integer intervals.
+
+    :param intervals: iterable of (first, last) integer pairs
+    :param version: IP protocol version of the addresses
+    :returns: generator of IP addresses as strings
+    """
+    for first, last in intervals:
+        for value in six.moves.range(first, last + 1):
+            yield str(netaddr.IPAddress(value, version))
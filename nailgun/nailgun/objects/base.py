@@ -24,13 +24,16 @@ from itertools import ifilter
 import operator
 
 from oslo_serialization import jsonutils
+import six
 
 from sqlalchemy import and_, not_
+from sqlalchemy.orm import defer
 from sqlalchemy.orm import joinedload
 
 from nailgun.objects.serializers.base import BasicSerializer
 
 from nailgun.db import db
+from nailgun.db import is_read_only
 from nailgun.db import NoCacheQuery
 from nailgun.errors import errors
 
@@ -44,6 +47,21 @@ class NailgunObject(object):
     #: SQLAlchemy model for object
     model = None
 
+    #: Big model fields which aren't serialized, they aren't loaded
+    #: until accessed if session is in read-only mode
+    deferred_fields = ()
+
+    @classmethod
+    def query(cls):
+        """Get query of object instances
+
+        :returns: SQLAlchemy query
+        """
+        q = db().query(cls.model)
+        if cls.deferred_fields and is_read_only(db()):
+            q = q.options(*(defer(field) for field in cls.deferred_fields))
+        return q
+
     @classmethod
     def get_by_uid(cls, uid, fail_if_not_found=False, lock_for_update=False):
         """Get instance by it's uid (PK in case of SQLAlchemy)
@@ -53,7 +71,7 @@ class NailgunObject(object):
         :param lock_for_update: lock returned object for update (DB mutex)
         :returns: instance of an object (model)
         """
-        q = db().query(cls.model)
+        q = cls.query()
         if lock_for_update:
             q = q.with_lockmode('update')
         res = q.get(uid)
@@ -166,7 +184,7 @@ class NailgunCollection(object):
 
         :returns: iterable (SQLAlchemy query)
         """
-        return db().query(cls.single.model)
+        return cls.single.query()
 
     @classmethod
     def _query_order_by(cls, query, order_by):
@@ -418,6 +436,31 @@ class NailgunCollection(object):
             )
         )
 
+    @classmethod
+    def to_json_stream(cls, iterable=None, fields=None, chunk_size=100):
+        """Serialize iterable to JSON which is returned by chunks
+
+        Objects are serialized to dicts before the first chunk is
+        returned, so the database isn't accessed while the response
+        is being sent.
+
+        :param iterable: iterable (SQLAlchemy query)
+        :param fields: exact fields to serialize
+        :param chunk_size: number of objects in one chunk
+        :returns: generator of JSON array parts
+        """
+        items = cls.to_list(fields=fields, iterable=iterable)
+
+        def generate():
+            yield '['
+            for start in six.moves.range(0, len(items), chunk_size):
+                chunk = jsonutils.dumps(items[start:start + chunk_size])
+                # strip brackets of serialized list
+                yield (',' if start else '') + chunk[1:-1]
+            yield ']'
+
+        return generate()
+
     @classmethod
     def create(cls, data):
         """Create object instance with specified parameters in DB
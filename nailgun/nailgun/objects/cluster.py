@@ -128,6 +128,12 @@ class Cluster(NailgunObject):
     #: Serializer for Cluster
     serializer = ClusterSerializer
 
+    #: Big fields which aren't serialized
+    deferred_fields = (
+        "replaced_deployment_info",
+        "replaced_provisioning_info",
+    )
+
     @classmethod
     def create(cls, data):
         """Create Cluster instance with specified parameters in DB.
@@ -488,6 +494,39 @@ class Cluster(NailgunObject):
         return db().query(models.Node).filter_by(
             cluster=cluster, pending_deletion=False).order_by(models.Node.id)
 
+    @classmethod
+    def add_pending_changes_for_nodes(cls, instance, changes_type, node_ids):
+        """Add pending changes of the same type for several nodes at once.
+
+        :param instance: Cluster instance
+        :param changes_type: name of changes to add
+        :param node_ids: ids of nodes for changes
+        :returns: None
+        """
+        node_ids = set(node_ids)
+        if not node_ids:
+            return
+
+        logger.debug(
+            u"New pending changes in environment %s: %s node_ids=%s",
+            instance.id, changes_type, sorted(node_ids))
+
+        existing = db().query(models.ClusterChanges.node_id).filter(
+            models.ClusterChanges.cluster_id == instance.id,
+            models.ClusterChanges.name == changes_type,
+            models.ClusterChanges.node_id.in_(node_ids)
+        )
+        node_ids.difference_update(node_id for node_id, in existing)
+
+        db().add_all(
+            models.ClusterChanges(
+                cluster_id=instance.id,
+                name=changes_type,
+                node_id=node_id
+            ) for node_id in sorted(node_ids)
+        )
+        db().flush()
+
     @classmethod
     def clear_pending_changes(cls, instance, node_id=None):
         """Clear pending changes for current Cluster.
@@ -592,10 +631,7 @@ class Cluster(NailgunObject):
         from nailgun.objects import NodeCollection
         NodeCollection.reset_network_template(nodes_to_remove)
 
-        map(
-            net_manager.assign_networks_by_default,
-            nodes_to_add
-        )
+        net_manager.assign_networks_by_default_to_nodes(nodes_to_add)
         cls.update_nodes_network_template(instance, nodes_to_add)
         db().flush()
 
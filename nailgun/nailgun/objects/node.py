@@ -38,6 +38,7 @@ from nailgun.db import db
 from nailgun.db.sqlalchemy import models
 from nailgun.errors import errors
 from nailgun.extensions import fire_callback_on_node_collection_delete
+from nailgun.extensions import fire_callback_on_node_collection_update
 from nailgun.extensions import fire_callback_on_node_create
 from nailgun.extensions import fire_callback_on_node_delete
 from nailgun.extensions import fire_callback_on_node_reset
@@ -63,6 +64,13 @@ class Node(NailgunObject):
     #: Serializer for Node
     serializer = NodeSerializer
 
+    #: Big fields which aren't serialized
+    deferred_fields = (
+        "replaced_deployment_info",
+        "replaced_provisioning_info",
+        "network_template",
+    )
+
     @classmethod
     def delete(cls, instance):
         fire_callback_on_node_delete(instance)
@@ -140,17 +148,20 @@ class Node(NailgunObject):
         ).first()
 
     @classmethod
-    def should_have_public_with_ip(cls, instance):
+    def should_have_public_with_ip(cls, instance, roles_metadata=None):
         """Returns True if node should have IP belonging to Public network
 
         :param instance: Node DB instance
+        :param roles_metadata: roles metadata of node's cluster, it's
+                               queried if not given
         :returns: True when node has Public network
         """
         if Cluster.should_assign_public_to_all_nodes(instance.cluster):
             return True
 
         roles = itertools.chain(instance.roles, instance.pending_roles)
-        roles_metadata = Cluster.get_roles(instance.cluster)
+        if roles_metadata is None:
+            roles_metadata = Cluster.get_roles(instance.cluster)
 
         for role in roles:
             if roles_metadata.get(role, {}).get('public_ip_required'):
@@ -159,7 +170,7 @@ class Node(NailgunObject):
         return False
 
     @classmethod
-    def should_have_public(cls, instance):
+    def should_have_public(cls, instance, roles_metadata=None):
         """Determine whether this node should be connected to Public network,
 
         no matter with or without an IP address assigned from that network
@@ -168,15 +179,18 @@ class Node(NailgunObject):
         nodes, but does not require IP address assigned to external bridge.
 
         :param instance: Node DB instance
+        :param roles_metadata: roles metadata of node's cluster, it's
+                               queried if not given
         :returns: True when node has Public network
         """
-        if cls.should_have_public_with_ip(instance):
+        if cls.should_have_public_with_ip(instance, roles_metadata):
             return True
 
         dvr_enabled = Cluster.neutron_dvr_enabled(instance.cluster)
         if dvr_enabled:
             roles = itertools.chain(instance.roles, instance.pending_roles)
-            roles_metadata = Cluster.get_roles(instance.cluster)
+            if roles_metadata is None:
+                roles_metadata = Cluster.get_roles(instance.cluster)
 
             for role in roles:
                 if roles_metadata.get(role, {}).get('public_for_dvr_required'):
@@ -315,10 +329,11 @@ class Node(NailgunObject):
         return match
 
     @classmethod
-    def assign_group(cls, instance):
+    def assign_group(cls, instance, admin_ngs=None):
         if instance.group_id is None and instance.ip:
-            admin_ngs = db().query(models.NetworkGroup).filter_by(
-                name="fuelweb_admin")
+            if admin_ngs is None:
+                admin_ngs = db().query(models.NetworkGroup).filter_by(
+                    name="fuelweb_admin")
             ip = IPAddress(instance.ip)
 
             for ng in admin_ngs:
@@ -999,6 +1014,31 @@ class NodeCollection(NailgunCollection):
     #: Single Node object class
     single = Node
 
+    @classmethod
+    def to_list(cls, iterable=None, fields=None):
+        """Serialize nodes to list of dicts
+
+        Network data is calculated for all nodes at once, so nodes should
+        be loaded with eager_nodes_handlers() to avoid per node queries.
+
+        :param iterable: iterable (SQLAlchemy query)
+        :param fields: exact fields to serialize
+        :returns: list of dicts
+        """
+        nodes = list(iterable or cls.all())
+        use_fields = fields or cls.single.serializer.fields
+        if 'network_data' not in use_fields:
+            return [cls.single.to_dict(n, fields=use_fields) for n in nodes]
+
+        networks = Cluster.get_network_manager().get_nodes_networks(nodes)
+        node_fields = [f for f in use_fields if f != 'network_data']
+        result = []
+        for node in nodes:
+            node_data = cls.single.to_dict(node, fields=node_fields)
+            node_data['network_data'] = networks[node.id]
+            result.append(node_data)
+        return result
+
     @classmethod
     def eager_nodes_handlers(cls, iterable):
         """Eager load objects instances that is used in nodes handler.
@@ -1033,6 +1073,68 @@ class NodeCollection(NailgunCollection):
     def get_by_ids(cls, ids):
         return db.query(models.Node).filter(models.Node.id.in_(ids)).all()
 
+    @classmethod
+    def assign_to_cluster(cls, instances, cluster, pending_roles):
+        """Assign nodes to Cluster with pending roles in bulk.
+
+        Has the same effect as updating every node with cluster_id,
+        pending_roles and pending_addition via :func:`Node.update`, but
+        networks, volumes and pending changes of all nodes are handled
+        by batched calls instead of per-node queries and flushes.
+
+        :param instances: list of Node instances
+        :param cluster: Cluster instance
+        :param pending_roles: dict of node id -> list of pending roles
+        :returns: None
+        """
+        added_nodes = []
+        updated_nodes = []
+        for instance in instances:
+            if instance.cluster_id is None:
+                instance.cluster_id = cluster.id
+                added_nodes.append(instance)
+            elif instance.cluster_id != cluster.id:
+                raise errors.CannotUpdate(
+                    u"Changing cluster on the fly is not allowed"
+                )
+
+            roles = pending_roles[instance.id]
+            roles_changed = set(roles) != set(instance.pending_roles)
+            if roles_changed:
+                if not roles:
+                    Cluster.clear_pending_changes(
+                        cluster, node_id=instance.id)
+                instance.pending_roles = roles
+
+            instance.pending_addition = True
+            if (roles_changed or instance in added_nodes) and \
+                    instance.status not in (
+                        consts.NODE_STATUSES.provisioning,
+                        consts.NODE_STATUSES.deploying):
+                updated_nodes.append(instance)
+
+        logger.debug(
+            u"Assigning nodes %s to environment %s",
+            [n.id for n in instances], cluster.id)
+        db().flush()
+
+        if added_nodes:
+            admin_ngs = db().query(models.NetworkGroup).filter_by(
+                name=consts.NETWORKS.fuelweb_admin).all()
+            for instance in added_nodes:
+                cls.single.assign_group(instance, admin_ngs=admin_ngs)
+
+            net_manager = Cluster.get_network_manager(cluster)
+            net_manager.assign_networks_by_default_to_nodes(added_nodes)
+            Cluster.add_pending_changes_for_nodes(
+                cluster, consts.CLUSTER_CHANGES.interfaces,
+                [n.id for n in added_nodes])
+            Cluster.update_nodes_network_template(cluster, added_nodes)
+
+        if updated_nodes:
+            fire_callback_on_node_collection_update(updated_nodes)
+        db().flush()
+
     @classmethod
     def reset_network_template(cls, instances):
         for instance in instances:
@@ -42,6 +42,13 @@ class Release(NailgunObject):
     #: Serializer for Release
     serializer = release_serializer.ReleaseSerializer
 
+    #: Big fields which aren't serialized
+    deferred_fields = (
+        "networks_metadata",
+        "volumes_metadata",
+        "network_roles_metadata",
+    )
+
     @classmethod
     def create(cls, data):
         """Create Release instance with specified parameters in DB.
@@ -16,6 +16,7 @@
 
 """Base classes of deployment serializers for orchestrator"""
 
+from collections import defaultdict
 from copy import deepcopy
 from netaddr import IPNetwork
 
@@ -24,6 +25,7 @@ from nailgun.db.sqlalchemy.models import NetworkGroup
 from nailgun.errors import errors
 from nailgun.objects import Cluster
 from nailgun.objects import Node
+from nailgun.orchestrator.serialization_context import SerializationContext
 from nailgun.settings import settings
 
 
@@ -164,20 +166,25 @@ class NetworkDeploymentSerializer(object):
     @classmethod
     def update_nodes_net_info(cls, cluster, nodes):
         """Adds information about networks to each node."""
+        context = SerializationContext.get(cluster)
+        nodes_by_uid = defaultdict(list)
+        for n in nodes:
+            nodes_by_uid[n['uid']].append(n)
+
         for node in Cluster.get_nodes_not_for_deletion(cluster):
-            netw_data = node.network_data
+            netw_data = context.get_node_networks(node)
             addresses = {}
             for net in node.cluster.network_groups:
                 if net.name == 'public' and \
-                        not Node.should_have_public_with_ip(node):
+                        not context.should_have_public_with_ip(node):
                     continue
                 if net.meta.get('render_addr_mask'):
                     addresses.update(cls.get_addr_mask(
                         netw_data,
                         net.name,
                         net.meta.get('render_addr_mask')))
-            [n.update(addresses) for n in nodes
-                if n['uid'] == str(node.uid)]
+            for n in nodes_by_uid[str(node.uid)]:
+                n.update(addresses)
         return nodes
 
     @classmethod
@@ -15,12 +15,16 @@
 #    under the License.
 
 from collections import defaultdict
+from copy import deepcopy
+import hashlib
+import threading
 try:
     from collections import OrderedDict
 except ImportError:
     from ordereddict import OrderedDict
 
 import networkx as nx
+from oslo_serialization import jsonutils
 import six
 
 from nailgun import consts
@@ -29,6 +33,7 @@ from nailgun.logger import logger
 from nailgun import objects
 from nailgun.orchestrator import priority_serializers as ps
 from nailgun.orchestrator.tasks_serializer import TaskSerializers
+from nailgun.settings import settings
 
 
 class DeploymentGraph(nx.DiGraph):
@@ -122,16 +127,46 @@ class DeploymentGraph(nx.DiGraph):
         :param processed_nodes: set of nodes names
         :returns: list of nodes names
         """
-        result = []
-        for node in self.nodes():
-            if node in processed_nodes:
-                continue
+        levels = self.get_levels(processed_nodes)
+        return levels[0] if levels else []
 
-            predecessors = nx.dfs_predecessors(self.reverse(), node)
-            if (set(predecessors.keys()) <= processed_nodes):
-                result.append(node)
+    def get_levels(self, processed_nodes):
+        """Split not processed nodes into levels of execution.
 
-        return result
+        Nodes of a level have all their predecessors (not only direct
+        parents) either in processed_nodes or on the previous levels,
+        so the first level is the same as get_next_groups() result.
+        Levels are calculated in one pass in topological order,
+        nodes which are part of a cycle are not included in any level.
+
+        :param processed_nodes: set of nodes names
+        :returns: list of lists of nodes names
+        """
+        # required level is the level after the deepest not processed
+        # predecessor, processed nodes pass requirements of their
+        # predecessors through to successors
+        required = dict((node, 0) for node in self.nodes())
+        in_degree = dict(self.in_degree())
+        ready = [node for node, degree in six.iteritems(in_degree)
+                 if not degree]
+        levels = defaultdict(set)
+
+        while ready:
+            node = ready.pop()
+            level = required[node]
+            if node not in processed_nodes:
+                levels[level].add(node)
+                level += 1
+
+            for successor in self.successors(node):
+                required[successor] = max(required[successor], level)
+                in_degree[successor] -= 1
+                if not in_degree[successor]:
+                    ready.append(successor)
+
+        # keep order of nodes in graph inside of each level
+        return [[node for node in self.nodes() if node in levels[level]]
+                for level in sorted(levels)]
 
     def get_groups_subgraph(self):
         roles = [t['id'] for t in self.node.values()
@@ -258,14 +293,70 @@ class DeploymentGraph(nx.DiGraph):
         return wgraph
 
 
+class DeploymentGraphsCache(object):
+    """Process-wide LRU cache of deployment graphs.
+
+    Graphs are keyed on checksum of tasks they are built from, so a graph
+    is shared by all clusters with the same release and set of enabled
+    plugins, and it is built again as soon as tasks of the release or of
+    a plugin are changed. Cached graphs must not be modified, AstuteGraph
+    works with a copy of the graph.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_key(cls, tasks):
+        return hashlib.sha1(jsonutils.dumps(tasks, sort_keys=True)).hexdigest()
+
+    def get(self, tasks):
+        """Returns graph for tasks, the graph is shared and read-only.
+
+        :param tasks: list of deployment tasks
+        :returns: DeploymentGraph instance
+        """
+        key = self.get_key(tasks)
+        with self._lock:
+            try:
+                graph = self._items.pop(key)
+                self.hits += 1
+            except KeyError:
+                # tasks are copied, so that changes of passed tasks
+                # don't affect cached graph
+                graph = DeploymentGraph(deepcopy(tasks))
+                self.misses += 1
+                if len(self._items) >= self.max_size:
+                    self._items.popitem(last=False)
+            self._items[key] = graph
+            return graph
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+graphs_cache = DeploymentGraphsCache(settings.DEPLOYMENT_GRAPHS_CACHE_SIZE)
+
+
 class AstuteGraph(object):
     """This object stores logic that required for working with astute"""
 
     def __init__(self, cluster):
         self.cluster = cluster
         self.tasks = objects.Cluster.get_deployment_tasks(cluster)
-        self.graph = DeploymentGraph()
-        self.graph.add_tasks(self.tasks)
+        # tasks of the graph are changed by cluster specific filters
+        # and serializers, so the cached graph is copied
+        self.graph = graphs_cache.get(self.tasks).copy()
         self.serializers = TaskSerializers()
 
     def only_tasks(self, task_ids):
@@ -361,9 +452,8 @@ class AstuteGraph(object):
 
         # if there is no nodes with some roles - mark them as success roles
         processed_groups = set(all_groups) - set(grouped_nodes.keys())
-        current_groups = groups_subgraph.get_next_groups(processed_groups)
 
-        while current_groups:
+        for current_groups in groups_subgraph.get_levels(processed_groups):
             one_by_one = []
             parallel = []
 
@@ -382,10 +472,6 @@ class AstuteGraph(object):
 
             self.process_parallel_nodes(priority, parallel, grouped_nodes)
 
-            # fetch next part of groups
-            processed_groups.update(current_groups)
-            current_groups = groups_subgraph.get_next_groups(processed_groups)
-
     def stage_tasks_serialize(self, tasks, nodes):
         """Serialize tasks for certain stage
 
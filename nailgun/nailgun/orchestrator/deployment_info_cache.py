@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Reuse of serialized deployment info of nodes whose inputs didn't change"""
+
+from collections import defaultdict
+from copy import deepcopy
+import hashlib
+
+from oslo_serialization import jsonutils
+import six
+import sqlalchemy as sa
+
+from nailgun.db import db
+from nailgun.db.sqlalchemy import models
+from nailgun.extensions import node_extension_call
+from nailgun.logger import logger
+from nailgun.settings import settings
+
+
+def _checksum(data):
+    return hashlib.sha1(jsonutils.dumps(
+        data, sort_keys=True, default=six.text_type)).hexdigest()
+
+
+def _select(model, *criteria):
+    """Returns rows of model table as list of dicts ordered by id."""
+    table = model.__table__
+    query = sa.select([table]).where(sa.and_(*criteria)).order_by(table.c.id)
+    return [dict(row) for row in db().execute(query)]
+
+
+def _group_by(rows, key):
+    result = defaultdict(list)
+    for row in rows:
+        result[row[key]].append(row)
+    return result
+
+
+class DeploymentInfoCache(object):
+    """Stores serialized deployment info of nodes between deployments
+
+    The checksum of a node is calculated from all database rows which the
+    deployment serializer reads for the node: the node itself, its
+    attributes, volumes, interfaces with assigned networks and IPs. The
+    checksum of the cluster data (attributes, network configuration,
+    network groups, node groups, releases and plugins) and of the
+    serializer is mixed in, so a change of them invalidates all nodes.
+
+    Only the per-node part of deployment info is stored. Common attributes
+    (e.g. list of all nodes in the cluster) are calculated on every
+    serialization and merged by the serializer afterwards.
+    """
+
+    #: fields which are changed all the time and aren't serialized
+    volatile_node_fields = ('timestamp', 'progress')
+    volatile_cluster_fields = ('status',)
+
+    def __init__(self, serializer, cluster, nodes):
+        self.checksums = self._get_checksums(serializer, cluster, nodes)
+        self.stored = dict(
+            (node_id, (checksum, info)) for node_id, checksum, info in
+            db().query(
+                models.NodeDeploymentInfo.node_id,
+                models.NodeDeploymentInfo.checksum,
+                models.NodeDeploymentInfo.info
+            ).filter(
+                models.NodeDeploymentInfo.node_id.in_(list(self.checksums))
+            )
+        )
+        self.updated = {}
+
+    @classmethod
+    def is_enabled(cls):
+        return settings.DEPLOYMENT_INFO_CACHE.get('enabled', False)
+
+    def get(self, node):
+        """Returns stored deployment info if the node hasn't changed.
+
+        :param node: Node instance
+        :returns: list of serialized roles of the node or None
+        """
+        checksum, info = self.stored.get(node.id, (None, None))
+        if checksum == self.checksums[node.id]:
+            return info
+        return None
+
+    def put(self, node, info):
+        """Remembers new deployment info of the node until save()."""
+        self.updated[node.id] = deepcopy(info)
+
+    def save(self):
+        """Writes deployment info of changed nodes to the database."""
+        if self.updated:
+            logger.debug(
+                "Deployment info is reused for nodes %s, serialized for "
+                "nodes %s",
+                sorted(set(self.checksums) - set(self.updated)),
+                sorted(self.updated))
+
+            db().query(models.NodeDeploymentInfo).filter(
+                models.NodeDeploymentInfo.node_id.in_(list(self.updated))
+            ).delete(synchronize_session=False)
+            db().execute(
+                models.NodeDeploymentInfo.__table__.insert(),
+                [{'node_id': node_id,
+                  'checksum': self.checksums[node_id],
+                  'info': info}
+                 for node_id, info in six.iteritems(self.updated)])
+            db().flush()
+            self.updated = {}
+
+    @classmethod
+    def _get_checksums(cls, serializer, cluster, nodes):
+        # pending changes of instances must be taken into account
+        db().flush()
+
+        cluster_checksum = cls._get_cluster_checksum(serializer, cluster)
+        nodes_ids = [n.id for n in nodes]
+
+        nics = _select(
+            models.NodeNICInterface,
+            models.NodeNICInterface.node_id.in_(nodes_ids))
+        bonds = _select(
+            models.NodeBondInterface,
+            models.NodeBondInterface.node_id.in_(nodes_ids))
+        nic_assignments = _group_by(_select(
+            models.NetworkNICAssignment,
+            models.NetworkNICAssignment.interface_id.in_(
+                [nic['id'] for nic in nics] or [None])
+        ), 'interface_id')
+        bond_assignments = _group_by(_select(
+            models.NetworkBondAssignment,
+            models.NetworkBondAssignment.bond_id.in_(
+                [bond['id'] for bond in bonds] or [None])
+        ), 'bond_id')
+        for nic in nics:
+            nic['assigned_networks'] = nic_assignments[nic['id']]
+        for bond in bonds:
+            bond['assigned_networks'] = bond_assignments[bond['id']]
+
+        nics = _group_by(nics, 'node_id')
+        bonds = _group_by(bonds, 'node_id')
+        attributes = _group_by(_select(
+            models.NodeAttributes,
+            models.NodeAttributes.node_id.in_(nodes_ids)), 'node_id')
+        ips = _group_by(_select(
+            models.IPAddr, models.IPAddr.node.in_(nodes_ids)), 'node')
+        nodes_rows = dict((row['id'], row) for row in _select(
+            models.Node, models.Node.id.in_(nodes_ids)))
+
+        checksums = {}
+        for node in nodes:
+            node_row = nodes_rows[node.id]
+            for field in cls.volatile_node_fields:
+                node_row.pop(field, None)
+
+            checksums[node.id] = _checksum({
+                'cluster': cluster_checksum,
+                'node': node_row,
+                'attributes': attributes[node.id],
+                'nics': nics[node.id],
+                'bonds': bonds[node.id],
+                'ips': ips[node.id],
+                'volumes': node_extension_call('get_node_volumes', node),
+            })
+        return checksums
+
+    @classmethod
+    def _get_cluster_checksum(cls, serializer, cluster):
+        configs = _select(
+            models.NetworkingConfig,
+            models.NetworkingConfig.cluster_id == cluster.id)
+        configs_ids = [c['id'] for c in configs] or [None]
+        nodegroups = _select(
+            models.NodeGroup, models.NodeGroup.cluster_id == cluster.id)
+        networks = _select(
+            models.NetworkGroup,
+            sa.or_(
+                models.NetworkGroup.group_id.in_(
+                    [g['id'] for g in nodegroups] or [None]),
+                models.NetworkGroup.group_id.is_(None)))
+        networks_ids = [n['id'] for n in networks] or [None]
+        cluster_rows = _select(
+            models.Cluster, models.Cluster.id == cluster.id)
+        for row in cluster_rows:
+            for field in cls.volatile_cluster_fields:
+                row.pop(field, None)
+        cluster_plugins = _select(
+            models.ClusterPlugins,
+            models.ClusterPlugins.cluster_id == cluster.id)
+
+        return _checksum({
+            'serializer': '.'.join((
+                type(serializer).__module__, type(serializer).__name__)),
+            'version': settings.VERSION,
+            'dns_domain': settings.DNS_DOMAIN,
+            'cluster': cluster_rows,
+            'attributes': _select(
+                models.Attributes,
+                models.Attributes.cluster_id == cluster.id),
+            'vmware_attributes': _select(
+                models.VmwareAttributes,
+                models.VmwareAttributes.cluster_id == cluster.id),
+            'network_configs': configs,
+            'neutron_configs': _select(
+                models.NeutronConfig,
+                models.NeutronConfig.__table__.c.id.in_(configs_ids)),
+            'nova_network_configs': _select(
+                models.NovaNetworkConfig,
+                models.NovaNetworkConfig.__table__.c.id.in_(configs_ids)),
+            'nodegroups': nodegroups,
+            'networks': networks,
+            'ip_ranges': _select(
+                models.IPAddrRange,
+                models.IPAddrRange.network_group_id.in_(networks_ids)),
+            'vips': _select(
+                models.IPAddr,
+                models.IPAddr.network.in_(networks_ids),
+                models.IPAddr.node.is_(None)),
+            'releases': _select(
+                models.Release,
+                models.Release.id.in_(
+                    [cluster.release_id, cluster.pending_release_id])),
+            'cluster_plugins': cluster_plugins,
+            'plugins': _select(
+                models.Plugin,
+                models.Plugin.id.in_(
+                    [p['plugin_id'] for p in cluster_plugins] or [None])),
+        })
@@ -60,6 +60,8 @@ from nailgun.orchestrator.nova_serializers import \
     NovaNetworkDeploymentSerializer61
 from nailgun.orchestrator.nova_serializers import \
     NovaNetworkDeploymentSerializer70
+from nailgun.orchestrator.deployment_info_cache import DeploymentInfoCache
+from nailgun.orchestrator.serialization_context import SerializationContext
 
 
 class DeploymentMultinodeSerializer(GraphBasedSerializer):
@@ -69,19 +71,27 @@ class DeploymentMultinodeSerializer(GraphBasedSerializer):
 
     critical_roles = ['controller', 'ceph-osd', 'primary-mongo']
 
-    def serialize(self, cluster, nodes, ignore_customized=False):
-        """Method generates facts which are passed to puppet."""
+    def serialize(self, cluster, nodes, ignore_customized=False,
+                  use_cache=False):
+        """Method generates facts which are passed to puppet.
+
+        :param use_cache: reuse and store serialized nodes in
+                          DeploymentInfoCache, if it's enabled
+        """
         def keyfunc(node):
             return bool(node.replaced_deployment_info)
 
+        nodes = list(nodes)
         serialized_nodes = []
-        for customized, node_group in groupby(nodes, keyfunc):
-            if customized and not ignore_customized:
-                serialized_nodes.extend(
-                    self.serialize_customized(cluster, node_group))
-            else:
-                serialized_nodes.extend(self.serialize_generated(
-                    cluster, node_group))
+        with SerializationContext(cluster) as context:
+            context.preload_nodes(nodes)
+            for customized, node_group in groupby(nodes, keyfunc):
+                if customized and not ignore_customized:
+                    serialized_nodes.extend(
+                        self.serialize_customized(cluster, node_group))
+                else:
+                    serialized_nodes.extend(self.serialize_generated(
+                        cluster, node_group, use_cache=use_cache))
 
         # NOTE(dshulyak) tasks should not be preserved from replaced deployment
         # info, there is different mechanism to control changes in tasks
@@ -89,8 +99,8 @@ class DeploymentMultinodeSerializer(GraphBasedSerializer):
         self.set_tasks(serialized_nodes)
         return serialized_nodes
 
-    def serialize_generated(self, cluster, nodes):
-        nodes = self.serialize_nodes(nodes)
+    def serialize_generated(self, cluster, nodes, use_cache=False):
+        nodes = self.serialize_nodes(nodes, use_cache=use_cache)
         common_attrs = self.get_common_attrs(cluster)
 
         self.set_deployment_priorities(nodes)
@@ -226,17 +236,34 @@ class DeploymentMultinodeSerializer(GraphBasedSerializer):
         for n in nodes:
             n['fail_if_error'] = n['role'] in self.critical_roles
 
-    def serialize_nodes(self, nodes):
+    def serialize_nodes(self, nodes, use_cache=False):
         """Serialize node for each role.
 
         For example if node has two roles then
         in orchestrator will be passed two serialized
         nodes.
+
+        If use_cache is set, serialized data of nodes which are not changed
+        since the previous deployment is taken from DeploymentInfoCache
+        if it's enabled. Otherwise nothing is written to the database.
         """
+        nodes = list(nodes)
+        cache = None
+        if use_cache and nodes and DeploymentInfoCache.is_enabled():
+            cache = DeploymentInfoCache(self, nodes[0].cluster, nodes)
+
         serialized_nodes = []
         for node in nodes:
-            for role in objects.Node.all_roles(node):
-                serialized_nodes.append(self.serialize_node(node, role))
+            node_info = cache.get(node) if cache else None
+            if node_info is None:
+                node_info = [self.serialize_node(node, role)
+                             for role in objects.Node.all_roles(node)]
+                if cache:
+                    cache.put(node, node_info)
+            serialized_nodes.extend(node_info)
+
+        if cache:
+            cache.save()
         return serialized_nodes
 
     def serialize_node(self, node, role):
@@ -254,7 +281,9 @@ class DeploymentMultinodeSerializer(GraphBasedSerializer):
 
         net_serializer = self.get_net_provider_serializer(node.cluster)
         node_attrs.update(net_serializer.get_node_attrs(node))
-        node_attrs.update(net_serializer.network_ranges(node.group_id))
+        node_attrs.update(SerializationContext.get(node.cluster).memoize(
+            ('network_ranges', node.group_id),
+            net_serializer.network_ranges, node.group_id))
         node_attrs.update(self.get_image_cache_max_size(node))
         node_attrs.update(self.generate_test_vm_image_data(node))
 
@@ -373,8 +402,7 @@ class DeploymentHASerializer(DeploymentMultinodeSerializer):
 
     def get_assigned_vips(self, cluster):
         """Assign and get vips for net groups."""
-        return objects.Cluster.get_network_manager(cluster).\
-            assign_vips_for_net_groups(cluster)
+        return SerializationContext.get(cluster).assign_vips_for_net_groups()
 
 
 class DeploymentMultinodeSerializer50(MuranoMetadataSerializerMixin,
@@ -578,7 +606,8 @@ def get_serializer_for_cluster(cluster):
     return serializers_map[latest_version][env_mode]
 
 
-def serialize(orchestrator_graph, cluster, nodes, ignore_customized=False):
+def serialize(orchestrator_graph, cluster, nodes, ignore_customized=False,
+              use_cache=False):
     """Serialization depends on deployment mode."""
     objects.Cluster.set_primary_roles(cluster, nodes)
     # TODO(apply only for specified subset of nodes)
@@ -586,4 +615,5 @@ def serialize(orchestrator_graph, cluster, nodes, ignore_customized=False):
     serializer = get_serializer_for_cluster(cluster)(orchestrator_graph)
 
     return serializer.serialize(
-        cluster, nodes, ignore_customized=ignore_customized)
+        cluster, nodes, ignore_customized=ignore_customized,
+        use_cache=use_cache)
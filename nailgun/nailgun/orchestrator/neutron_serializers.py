@@ -31,6 +31,8 @@ from nailgun.db.sqlalchemy import models
 from nailgun.logger import logger
 from nailgun import objects
 from nailgun.orchestrator.base_serializers import NetworkDeploymentSerializer
+from nailgun.orchestrator.serialization_context import \
+    SerializationContext
 from nailgun.settings import settings
 from nailgun import utils
 
@@ -58,8 +60,7 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
     @classmethod
     def network_provider_node_attrs(cls, cluster, node):
         """Serialize node, then it will be merged with common attributes."""
-        nm = objects.Cluster.get_network_manager(cluster)
-        networks = nm.get_node_networks(node)
+        networks = SerializationContext.get(cluster).get_node_networks(node)
         node_attrs = {
             'network_scheme': cls.generate_network_scheme(node, networks),
         }
@@ -74,14 +75,14 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
         merged with common attributes, if mellanox plugin or iSER storage
         enabled.
         """
+        cluster_attrs = SerializationContext.get(
+            cluster).get_editable_attributes()
+
         # Get Mellanox data
-        neutron_mellanox_data = \
-            objects.Cluster.get_editable_attributes(cluster)\
-            .get('neutron_mellanox', {})
+        neutron_mellanox_data = cluster_attrs.get('neutron_mellanox', {})
 
         # Get storage data
-        storage_data = \
-            objects.Cluster.get_editable_attributes(cluster).get('storage', {})
+        storage_data = cluster_attrs.get('storage', {})
 
         # Get network manager
         nm = objects.Cluster.get_network_manager(cluster)
@@ -203,6 +204,8 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
     @classmethod
     def generate_network_scheme(cls, node, networks):
 
+        context = SerializationContext.get(node.cluster)
+
         # Create a data structure and fill it with static values.
 
         attrs = {
@@ -222,7 +225,7 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
             'transformations': []
         }
 
-        if objects.Node.should_have_public(node):
+        if context.should_have_public(node):
             attrs['endpoints']['br-ex'] = {}
             attrs['roles']['ex'] = 'br-ex'
 
@@ -283,7 +286,7 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
         # to provide a right ordering of ifdown/ifup operations with
         # IP interfaces.
         brnames = ['br-ex', 'br-mgmt', 'br-storage', 'br-fw-admin']
-        if not objects.Node.should_have_public(node):
+        if not context.should_have_public(node):
             brnames.pop(0)
 
         for brname in brnames:
@@ -298,7 +301,7 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
             ('management', 'br-mgmt'),
             ('fuelweb_admin', 'br-fw-admin'),
         ]
-        if objects.Node.should_have_public(node):
+        if context.should_have_public(node):
             netgroup_mapping.append(('public', 'br-ex'))
 
         netgroups = {}
@@ -310,7 +313,7 @@ class NeutronNetworkDeploymentSerializer(NetworkDeploymentSerializer):
                 attrs['endpoints'][brname]['IP'] = [netgroup['ip']]
             netgroups[ngname] = netgroup
 
-        if objects.Node.should_have_public(node):
+        if context.should_have_public(node):
             attrs['endpoints']['br-ex']['gateway'] = \
                 netgroups['public']['gateway']
         else:
@@ -555,6 +558,8 @@ class NeutronNetworkDeploymentSerializer60(
 
     @classmethod
     def generate_network_scheme(cls, node, networks):
+        context = SerializationContext.get(node.cluster)
+
         attrs = super(NeutronNetworkDeploymentSerializer60, cls). \
             generate_network_scheme(node, networks)
 
@@ -573,7 +578,7 @@ class NeutronNetworkDeploymentSerializer60(
             ('management', 'br-mgmt'),
             ('fuelweb_admin', 'br-fw-admin'),
         ]
-        if objects.Node.should_have_public(node):
+        if context.should_have_public(node):
             netgroup_mapping.append(('public', 'br-ex'))
 
         for ngname, brname in netgroup_mapping:
@@ -583,10 +588,10 @@ class NeutronNetworkDeploymentSerializer60(
             attrs['endpoints'][brname]['other_nets'] = \
                 other_nets.get(ngname, [])
 
-        if objects.Node.should_have_public(node):
+        if context.should_have_public(node):
             attrs['endpoints']['br-ex']['default_gateway'] = True
         else:
-            gw = nm.get_default_gateway(node.id)
+            gw = context.get_default_gateway(node)
             attrs['endpoints']['br-fw-admin']['gateway'] = gw
             attrs['endpoints']['br-fw-admin']['default_gateway'] = True
 
@@ -716,6 +721,8 @@ class NeutronNetworkDeploymentSerializer61(
     @classmethod
     def generate_network_scheme(cls, node, networks):
 
+        context = SerializationContext.get(node.cluster)
+
         # Create a data structure and fill it with static values.
         attrs = {
             'version': '1.1',
@@ -729,7 +736,7 @@ class NeutronNetworkDeploymentSerializer61(
             },
         }
 
-        is_public = objects.Node.should_have_public(node)
+        is_public = context.should_have_public(node)
         if is_public:
             attrs['endpoints']['br-ex'] = {'IP': 'none'}
             attrs['endpoints']['br-floating'] = {'IP': 'none'}
@@ -773,7 +780,7 @@ class NeutronNetworkDeploymentSerializer61(
             attrs['endpoints']['br-ex']['gateway'] = \
                 netgroups['public']['gateway']
         else:
-            gw = nm.get_default_gateway(node.id)
+            gw = context.get_default_gateway(node)
             attrs['endpoints']['br-fw-admin']['gateway'] = gw
 
         # Fill up interfaces.
@@ -807,8 +814,7 @@ class NeutronNetworkDeploymentSerializer61(
         attrs['transformations'] = cls.generate_transformations(
             node, nm, nets_by_ifaces, is_public, prv_base_ep)
 
-        if objects.NodeGroupCollection.get_by_cluster_id(
-                node.cluster.id).count() > 1:
+        if context.get_node_groups_count() > 1:
             cls.generate_routes(node, attrs, nm, netgroup_mapping, netgroups,
                                 networks)
 
@@ -881,9 +887,10 @@ class NeutronNetworkDeploymentSerializer70(
     @classmethod
     def get_node_non_default_networks(cls, node):
         """Returns list of non-default networks assigned to node."""
-        nm = objects.Cluster.get_network_manager(node.cluster)
+        networks = SerializationContext.get(
+            node.cluster).get_node_networks(node)
         return filter(lambda net: net['name'] not in consts.NETWORKS,
-                      nm.get_node_networks(node))
+                      networks)
 
     @classmethod
     def get_bridge_name(cls, name, suffix=0):
@@ -928,7 +935,8 @@ class NeutronNetworkDeploymentSerializer70(
             consts.NETWORKS.management: 'br-mgmt'}
 
         # roles can be assigned to br-ex only in case it has a public IP
-        if objects.Node.should_have_public_with_ip(node):
+        context = SerializationContext.get(node.cluster)
+        if context.should_have_public_with_ip(node):
             mapping[consts.NETWORKS.public] = 'br-ex'
 
         if node.cluster.network_config.segmentation_type in \
@@ -944,7 +952,8 @@ class NeutronNetworkDeploymentSerializer70(
         nm = objects.Cluster.get_network_manager(node.cluster)
 
         mapping = dict()
-        networks = nm.get_node_networks(node)
+        networks = SerializationContext.get(
+            node.cluster).get_node_networks(node)
         for net in cls.get_network_to_endpoint_mapping(node):
             netgroup = nm.get_network_by_netname(net, networks)
             if netgroup.get('ip'):
@@ -961,7 +970,9 @@ class NeutronNetworkDeploymentSerializer70(
         - 'get_network_role_mapping_to_interfaces'.
         """
         roles = dict()
-        for role in objects.Cluster.get_network_roles(node.cluster):
+        network_roles = SerializationContext.get(
+            node.cluster).get_network_roles()
+        for role in network_roles:
             default_mapping = mapping.get(role['default_mapping'])
             if default_mapping:
                 roles[role['id']] = default_mapping
@@ -1010,6 +1021,8 @@ class NeutronNetworkDeploymentSerializer70(
         :param networks: list of networks data dicts
         :return: dict of network scheme attributes
         """
+        context = SerializationContext.get(node.cluster)
+
         attrs = {
             'version': '1.1',
             'provider': 'lnx',
@@ -1018,7 +1031,7 @@ class NeutronNetworkDeploymentSerializer70(
             'roles': cls.get_network_role_mapping_to_interfaces(node),
         }
 
-        is_public = objects.Node.should_have_public(node)
+        is_public = context.should_have_public(node)
         if is_public:
             attrs['endpoints']['br-ex'] = {'IP': 'none'}
             attrs['endpoints']['br-floating'] = {'IP': 'none'}
@@ -1059,11 +1072,11 @@ class NeutronNetworkDeploymentSerializer70(
             })
 
         # Add gateway.
-        if objects.Node.should_have_public_with_ip(node):
+        if context.should_have_public_with_ip(node):
             attrs['endpoints']['br-ex']['gateway'] = \
                 netgroups['public']['gateway']
         else:
-            gw = nm.get_default_gateway(node.id)
+            gw = context.get_default_gateway(node)
             attrs['endpoints']['br-fw-admin']['gateway'] = gw
 
         # Fill up interfaces.
@@ -1097,8 +1110,7 @@ class NeutronNetworkDeploymentSerializer70(
         attrs['transformations'] = cls.generate_transformations(
             node, nm, nets_by_ifaces, is_public, prv_base_ep)
 
-        if objects.NodeGroupCollection.get_by_cluster_id(
-                node.cluster.id).count() > 1:
+        if context.get_node_groups_count() > 1:
             cls.generate_routes(node, attrs, nm, netgroup_mapping, netgroups,
                                 networks)
 
@@ -1133,7 +1145,6 @@ class NeutronNetworkDeploymentSerializer70(
     @classmethod
     def generate_network_metadata(cls, cluster):
         nodes = dict()
-        nm = objects.Cluster.get_network_manager(cluster)
 
         for node in objects.Cluster.get_nodes_not_for_deletion(cluster):
             name = objects.Node.get_slave_name(node)
@@ -1152,7 +1163,8 @@ class NeutronNetworkDeploymentSerializer70(
 
         return dict(
             nodes=nodes,
-            vips=nm.assign_vips_for_net_groups(cluster)
+            vips=SerializationContext.get(
+                cluster).assign_vips_for_net_groups()
         )
 
     @classmethod
@@ -1211,6 +1223,8 @@ class NeutronNetworkTemplateSerializer70(
     @classmethod
     def generate_network_scheme(cls, node, networks):
 
+        context = SerializationContext.get(node.cluster)
+
         roles = cls._get_network_roles(node)
         # Create a data structure and fill it with static values.
         attrs = {
@@ -1252,7 +1266,7 @@ class NeutronNetworkTemplateSerializer70(
         else:
             admin_ep = roles['admin/pxe']
             attrs['endpoints'][admin_ep]['gateway'] = \
-                nm.get_default_gateway(node.id)
+                context.get_default_gateway(node)
 
         # Fill up interfaces.
         for iface in node.nic_interfaces:
@@ -1264,8 +1278,7 @@ class NeutronNetworkTemplateSerializer70(
 
         attrs['transformations'] = cls.generate_transformations(node)
 
-        if objects.NodeGroupCollection.get_by_cluster_id(
-                node.cluster.id).count() > 1:
+        if context.get_node_groups_count() > 1:
             cls.generate_routes(node, attrs, nm, netgroup_mapping, netgroups,
                                 networks)
 
@@ -1308,6 +1321,10 @@ class NeutronNetworkTemplateSerializer70(
         This info is deprecated in 7.0 and should be removed in later version.
         """
         nm = objects.Cluster.get_network_manager(cluster)
+        nodes_by_uid = defaultdict(list)
+        for n in nodes:
+            nodes_by_uid[n['uid']].append(n)
+
         for node in objects.Cluster.get_nodes_not_for_deletion(cluster):
             netw_data = []
             for name, data in six.iteritems(
@@ -1322,8 +1339,8 @@ class NeutronNetworkTemplateSerializer70(
                         netw_data,
                         net['name'],
                         render_addr_mask))
-            [n.update(addresses) for n in nodes
-             if n['uid'] == str(node.uid)]
+            for n in nodes_by_uid[str(node.uid)]:
+                n.update(addresses)
         return nodes
 
 
@@ -1408,7 +1425,8 @@ class NeutronNetworkDeploymentSerializer80(
             consts.NETWORKS.management:
                 consts.DEFAULT_BRIDGES_NAMES.br_mgmt}
         # roles can be assigned to br-ex only in case it has a public IP
-        if objects.Node.should_have_public_with_ip(node):
+        context = SerializationContext.get(node.cluster)
+        if context.should_have_public_with_ip(node):
             mapping[consts.NETWORKS.public] = \
                 consts.DEFAULT_BRIDGES_NAMES.br_ex
         if node.cluster.network_config.segmentation_type in \
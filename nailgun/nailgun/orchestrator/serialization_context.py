@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Cluster-wide data shared by deployment serializers of all nodes"""
+
+from copy import deepcopy
+import threading
+
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import subqueryload
+
+from nailgun.db import db
+from nailgun.db.sqlalchemy.models import Node
+from nailgun import objects
+
+
+class SerializationContext(object):
+    """Memoizes cluster-level data during serialization of a cluster
+
+    Data which is the same for all nodes of a cluster (attributes,
+    roles, networks of node groups, VIPs) and data which is requested
+    several times for the same node (its networks) is calculated on the
+    first access only.
+
+    The context is active inside of ``with`` block. Outside of it get()
+    returns a new context on every call, so nothing is memoized between
+    serializations and data is always up to date.
+    """
+
+    _local = threading.local()
+
+    def __init__(self, cluster):
+        self.cluster = cluster
+        self._memo = {}
+        self._previous = None
+
+    @classmethod
+    def get(cls, cluster):
+        """Returns active context of a cluster or a new one
+
+        :param cluster: Cluster DB instance
+        :returns: SerializationContext instance
+        """
+        context = getattr(cls._local, 'context', None)
+        if context is not None and context.cluster.id == cluster.id:
+            return context
+        return cls(cluster)
+
+    def __enter__(self):
+        self._previous = getattr(self._local, 'context', None)
+        self._local.context = self
+        return self
+
+    def __exit__(self, *exc_info):
+        self._local.context = self._previous
+        self._previous = None
+
+    def memoize(self, key, func, *args):
+        """Returns result of func(*args) calculated once per context
+
+        Returned value is shared by all callers and must not be modified.
+        """
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = func(*args)
+            return value
+
+    def preload_nodes(self, nodes):
+        """Loads relations of nodes used by serializers in bulk
+
+        Loaded collections are set on DB instances which are already
+        in the session, so serializers of nodes do not issue queries
+        for every node.
+        """
+        nodes_ids = [n.id for n in nodes]
+        if not nodes_ids:
+            return
+        db().query(Node).filter(
+            Node.id.in_(nodes_ids)
+        ).options(
+            joinedload('attributes'),
+            subqueryload('ip_addrs').joinedload('network_data'),
+            subqueryload('nic_interfaces').subqueryload(
+                'assigned_networks_list'),
+            subqueryload('bond_interfaces').subqueryload(
+                'assigned_networks_list'),
+        ).all()
+
+    @property
+    def network_manager(self):
+        return self.memoize(
+            'network_manager',
+            objects.Cluster.get_network_manager, self.cluster)
+
+    def get_editable_attributes(self):
+        return self.memoize(
+            'editable_attributes',
+            objects.Cluster.get_editable_attributes, self.cluster)
+
+    def get_roles(self):
+        return self.memoize(
+            'roles', objects.Cluster.get_roles, self.cluster)
+
+    def get_network_roles(self):
+        return self.memoize(
+            'network_roles',
+            objects.Cluster.get_network_roles, self.cluster)
+
+    def get_node_groups_count(self):
+        return self.memoize(
+            'node_groups_count',
+            lambda: objects.NodeGroupCollection.get_by_cluster_id(
+                self.cluster.id).count())
+
+    def assign_vips_for_net_groups(self):
+        return deepcopy(self.memoize(
+            'vips',
+            self.network_manager.assign_vips_for_net_groups, self.cluster))
+
+    def get_node_networks(self, node):
+        return deepcopy(self.memoize(
+            ('node_networks', node.id),
+            self.network_manager.get_node_networks, node))
+
+    def get_default_gateway(self, node):
+        # gateway depends only on admin network of node's group
+        return self.memoize(
+            ('default_gateway', node.group_id),
+            self.network_manager.get_default_gateway, node.id)
+
+    def should_have_public_with_ip(self, node):
+        return self.memoize(
+            ('should_have_public_with_ip', node.id),
+            objects.Node.should_have_public_with_ip, node, self.get_roles())
+
+    def should_have_public(self, node):
+        return self.memoize(
+            ('should_have_public', node.id),
+            objects.Node.should_have_public, node, self.get_roles())
@@ -28,6 +28,7 @@ from nailgun import objects
 from nailgun.orchestrator import deployment_serializers
 from nailgun.orchestrator import tasks_templates as templates
 from nailgun.settings import settings
+from nailgun.utils import debian
 
 
 def get_uids_for_tasks(nodes, tasks):
@@ -193,13 +194,20 @@ class UploadMOSRepo(GenericRolesHook):
             # This task is to allow installing packages from
             # unauthenticated repositories.
             yield templates.make_ubuntu_unauth_repos_task(uids)
+
+            # Release files of pinned repos are fetched concurrently
+            pinned_repos = [r for r in repos if r.get('priority')]
+            releases = dict(six.moves.zip(
+                (r['name'] for r in pinned_repos),
+                debian.get_release_files(pinned_repos, retries=3)))
             for repo in repos:
                 yield templates.make_ubuntu_sources_task(uids, repo)
 
                 if repo.get('priority'):
                     # do not add preferences task to task list if we can't
                     # complete it (e.g. can't retrieve or parse Release file)
-                    task = templates.make_ubuntu_preferences_task(uids, repo)
+                    task = templates.make_ubuntu_preferences_task(
+                        uids, repo, release=releases[repo['name']])
                     if task is not None:
                         yield task
             yield templates.make_apt_update_task(uids)
@@ -41,7 +41,7 @@ def make_ubuntu_sources_task(uids, repo):
     return make_upload_task(uids, sources_content, sources_path)
 
 
-def make_ubuntu_preferences_task(uids, repo):
+def make_ubuntu_preferences_task(uids, repo, release=None):
     # NOTE(ikalnitsky): In order to implement the proper pinning,
     # we have to download and parse the repo's "Release" file.
     # Generally, that's not a good idea to make some HTTP request
@@ -56,11 +56,15 @@ def make_ubuntu_preferences_task(uids, repo):
     preferences_content = []
 
     try:
-        release = debian.get_release_file(repo, retries=3)
+        # release content may be fetched in advance with other repos
+        if release is None:
+            release = debian.get_release_file(repo, retries=3)
+        elif isinstance(release, Exception):
+            raise release
         release = debian.parse_release_file(release)
         pin = debian.get_apt_preferences_line(release)
 
-    except requests.exceptions.HTTPError as exc:
+    except requests.exceptions.RequestException as exc:
         logger.error("Failed to fetch 'Release' file due to '%s'. "
                      "The apt preferences won't be applied for repo '%s'.",
                      six.text_type(exc), repo['name'])
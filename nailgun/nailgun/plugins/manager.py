@@ -363,6 +363,10 @@ class PluginManager(object):
             plugin_adapter = wrap_plugin(plugin)
             plugin_adapter.sync_metadata_to_db()
 
+        # graphs with outdated tasks would be never used again
+        from nailgun.orchestrator.deployment_graph import graphs_cache
+        graphs_cache.clear()
+
     @classmethod
     def enable_plugins_by_components(cls, cluster):
         """Enable plugin by components
@@ -14,8 +14,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import contextlib
+import os
+import threading
+
 import six
-import functools
 
 import amqp.exceptions as amqp_exceptions
 from kombu import Connection
@@ -75,25 +79,135 @@ nailgun_queue = Queue(
 )
 
 
-def cast(name, message, service=False):
-    logger.debug(
-        "RPC cast to orchestrator:\n{0}".format(
-            jsonutils.dumps(message, indent=4)
-        )
+def get_nailgun_worker_queue(index):
+    """Returns queue consumed by receiverd worker with a given index
+
+    Messages from the 'nailgun' queue are routed to worker queues
+    by receiverd dispatcher when receiverd runs in a pool mode.
+    """
+    name = 'nailgun.worker.{0}'.format(index)
+    return Queue(
+        name,
+        exchange=nailgun_exchange,
+        routing_key=name
     )
+
+
+class ProducersPool(object):
+    """Keeps AMQP connections open between casts
+
+    Connections are shared between threads of a process, but never
+    between processes: after fork a process starts with an empty pool.
+    Connections inherited from a parent process are dropped without
+    closing, since their sockets are still used by the parent.
+    """
+
+    def __init__(self, url, size):
+        self.url = url
+        self.size = size
+        self._pid = None
+        self._connections = None
+        self._lock = threading.Lock()
+
+    def _get_connections(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._connections = six.moves.queue.LifoQueue()
+                    self._pid = pid
+        return self._connections
+
+    @contextlib.contextmanager
+    def acquire(self):
+        """Yields a connection which isn't used by other threads
+
+        A connection is returned to the pool only if no error happened
+        while it was used, so broken connections are never reused.
+        """
+        connections = self._get_connections()
+        try:
+            conn = connections.get_nowait()
+        except six.moves.queue.Empty:
+            conn = Connection(self.url)
+
+        try:
+            yield conn
+        except Exception:
+            conn.release()
+            raise
+
+        if connections.qsize() < self.size:
+            connections.put(conn)
+        else:
+            conn.release()
+
+    def clear(self):
+        """Closes all idle connections of the current process"""
+        connections = self._get_connections()
+        while True:
+            try:
+                connections.get_nowait().release()
+            except six.moves.queue.Empty:
+                break
+
+
+producers = ProducersPool(
+    conn_str, int(settings.RABBITMQ.get('producers_pool_size', 4)))
+
+
+def _publish(conn, name, message, service):
     use_queue = naily_queue if not service else naily_service_queue
     use_exchange = naily_exchange if not service else naily_service_exchange
-    with Connection(conn_str) as conn:
-        with conn.Producer(serializer='json') as producer:
-            publish = functools.partial(producer.publish, message,
-                exchange=use_exchange, routing_key=name, declare=[use_queue])
-            try:
-                publish()
-            except amqp_exceptions.PreconditionFailed as e:
-                logger.warning(six.text_type(e))
-                # (dshulyak) we should drop both exchanges/queues in order
-                # for astute to be able to recover temporary queues
-                utils.delete_entities(
-                    conn, naily_service_exchange, naily_service_queue,
-                    naily_exchange, naily_queue)
-                publish()
+    # queue is declared only once per connection, kombu caches
+    # declared entities in conn.declared_entities
+    with conn.Producer(serializer='json') as producer:
+        producer.publish(message, exchange=use_exchange,
+                         routing_key=name, declare=[use_queue])
+
+
+def _cast(casts):
+    """Publishes messages and removes them from casts once they are sent"""
+    with producers.acquire() as conn:
+        while casts:
+            name, message, service = casts[0]
+            logger.debug(
+                "RPC cast to orchestrator:\n{0}".format(
+                    jsonutils.dumps(message, indent=4)
+                )
+            )
+            _publish(conn, name, message, service)
+            casts.popleft()
+
+
+def cast_many(casts):
+    """Sends several messages to orchestrator using a single connection
+
+    :param casts: list of (name, message, service) tuples, the same
+                  as arguments of cast()
+    """
+    casts = collections.deque(casts)
+    try:
+        _cast(casts)
+    except amqp_exceptions.PreconditionFailed as e:
+        logger.warning(six.text_type(e))
+        # (dshulyak) we should drop both exchanges/queues in order
+        # for astute to be able to recover temporary queues
+        with Connection(conn_str) as conn:
+            utils.delete_entities(
+                conn, naily_service_exchange, naily_service_queue,
+                naily_exchange, naily_queue)
+        # pooled connections consider deleted entities as declared
+        producers.clear()
+        _cast(casts)
+    except (amqp_exceptions.AMQPError, IOError) as e:
+        logger.warning("RPC cast failed, retrying with new connection: %s",
+                       six.text_type(e))
+        # idle connections are likely broken as well, e.g. after
+        # restart of the broker
+        producers.clear()
+        _cast(casts)
+
+
+def cast(name, message, service=False):
+    cast_many([(name, message, service)])
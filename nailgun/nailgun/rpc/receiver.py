@@ -23,6 +23,7 @@ import six
 import traceback
 
 from oslo_serialization import jsonutils
+from sqlalchemy import case
 from sqlalchemy import or_
 
 from nailgun import consts
@@ -264,20 +265,32 @@ class NailgunReceiver(object):
         # if there no node except master - then just skip updating
         # nodes status, for the task itself astute will send
         # message with descriptive error
+        nodes_ids = {}
         if nodes:
 
             # lock nodes for updating so they can't be deleted
-            q_nodes = objects.NodeCollection.filter_by_id_list(
-                None,
-                [n['uid'] for n in nodes],
-            )
+            q_nodes = db().query(Node.id).filter(
+                Node.id.in_([n['uid'] for n in nodes]))
             q_nodes = objects.NodeCollection.order_by(q_nodes, 'id')
-            objects.NodeCollection.lock_for_update(q_nodes).all()
+            nodes_ids = dict(
+                (six.text_type(node_id), node_id) for node_id,
+                in objects.NodeCollection.lock_for_update(q_nodes))
+
+        update_fields = (
+            'error_msg',
+            'error_type',
+            'status',
+            'progress',
+            'online'
+        )
+        # values of node fields which are updated with a single
+        # statement for all nodes, {field: {node_id: value}}
+        bulk_update = collections.defaultdict(dict)
 
         # First of all, let's update nodes in database
         for node in nodes:
-            node_db = objects.Node.get_by_uid(node['uid'])
-            if not node_db:
+            node_id = nodes_ids.get(six.text_type(node['uid']))
+            if node_id is None:
                 logger.warning(
                     u"No node found with uid '{0}' - nothing changed".format(
                         node['uid']
@@ -285,13 +298,21 @@ class NailgunReceiver(object):
                 )
                 continue
 
-            update_fields = (
-                'error_msg',
-                'error_type',
-                'status',
-                'progress',
-                'online'
-            )
+            if node.get('status') != 'error' and node.get('online') \
+                    is not False:
+                for param in update_fields:
+                    if param in node:
+                        logger.debug(
+                            u"Updating node {0} - set {1} to {2}".format(
+                                node['uid'],
+                                param,
+                                node[param]
+                            )
+                        )
+                        bulk_update[param][node_id] = node[param]
+                continue
+
+            node_db = objects.Node.get_by_uid(node_id)
             for param in update_fields:
                 if param in node:
                     logger.debug(
@@ -324,6 +345,21 @@ class NailgunReceiver(object):
                             node_id=node['uid'],
                             task_uuid=task_uuid
                         )
+
+        if bulk_update:
+            updated_ids = set()
+            for values in six.itervalues(bulk_update):
+                updated_ids.update(values)
+            db().query(Node).filter(
+                Node.id.in_(updated_ids)
+            ).update(
+                dict(
+                    (param, case(values, value=Node.id,
+                                 else_=getattr(Node, param)))
+                    for param, values in six.iteritems(bulk_update)
+                ),
+                synchronize_session='fetch'
+            )
         db().flush()
         if nodes and not progress:
             progress = TaskHelper.recalculate_deployment_task_progress(task)
@@ -14,62 +14,194 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import multiprocessing
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(__file__))
 
+import time
 import traceback
+import zlib
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
 
 import six
 
 from kombu import Connection
 from kombu.mixins import ConsumerMixin
+from kombu import Producer
 
 import amqp.exceptions as amqp_exceptions
 
 from nailgun.db import db
+from nailgun.db.sqlalchemy.models import Task
 from nailgun.errors import errors
 from nailgun.logger import logger
 import nailgun.rpc as rpc
 from nailgun.rpc.receiver import NailgunReceiver
 from nailgun.rpc import utils
+from nailgun.settings import settings
+
+
+class MethodTimings(object):
+    """Collects processing time of RPC methods
+
+    Summary is written to the log every report_interval seconds.
+    """
+
+    def __init__(self, report_interval):
+        self.report_interval = report_interval
+        self.stats = {}
+        self.reported_at = time.time()
+
+    def add(self, method, elapsed):
+        logger.debug(
+            "RPC method %s processed in %.3f seconds", method, elapsed)
+        count, total, max_time = self.stats.get(method, (0, 0.0, 0.0))
+        self.stats[method] = (
+            count + 1, total + elapsed, max(max_time, elapsed))
+        if time.time() - self.reported_at >= self.report_interval:
+            self.report()
+
+    def report(self):
+        for method, (count, total, max_time) in sorted(
+                six.iteritems(self.stats)):
+            logger.info(
+                "RPC method %s: processed %d messages, "
+                "average time %.3f seconds, max time %.3f seconds",
+                method, count, total / count, max_time)
+        self.reported_at = time.time()
+
+
+class ProgressMessages(object):
+    """Holds progress-only messages until they are merged and processed
+
+    Messages are released when the oldest of them is older than max_age
+    seconds or when there are max_size of them.
+    """
+
+    def __init__(self, max_age, max_size):
+        self.max_age = max_age
+        self.max_size = max_size
+        self.messages = OrderedDict()
+        self.size = 0
+        self.first_added_at = None
+
+    def add(self, body, msg):
+        task_uuid = body['args']['task_uuid']
+        self.messages.setdefault(task_uuid, []).append((body, msg))
+        self.size += 1
+        if self.first_added_at is None:
+            self.first_added_at = time.time()
+
+    def is_ready(self):
+        if not self.size:
+            return False
+        return self.size >= self.max_size or \
+            time.time() - self.first_added_at >= self.max_age
+
+    def pop(self):
+        """Returns list of (merged message body, list of messages)"""
+        result = []
+        for messages in six.itervalues(self.messages):
+            bodies = [body for body, _ in messages]
+            if len(bodies) > 1:
+                logger.debug(
+                    "Merged %d progress messages of task %s",
+                    len(bodies), bodies[0]['args']['task_uuid'])
+            result.append((utils.merge_progress_messages(bodies),
+                           [msg for _, msg in messages]))
+        self.messages.clear()
+        self.size = 0
+        self.first_added_at = None
+        return result
 
 
 class RPCConsumer(ConsumerMixin):
 
-    def __init__(self, connection, receiver):
+    def __init__(self, connection, receiver, queues=None, prefetch_count=0):
         self.connection = connection
         self.receiver = receiver
+        self.queues = queues or [rpc.nailgun_queue]
+        self.prefetch_count = prefetch_count
+        self.timings = MethodTimings(
+            settings.RPC_CONSUMER['stats_interval'])
+
+        self.progress_messages = None
+        if settings.RPC_CONSUMER['coalesce_interval']:
+            max_size = settings.RPC_CONSUMER['coalesce_max_messages']
+            # no more messages are delivered until buffered ones are acked
+            if prefetch_count:
+                max_size = min(max_size, prefetch_count)
+            self.progress_messages = ProgressMessages(
+                settings.RPC_CONSUMER['coalesce_interval'], max_size)
 
     def get_consumers(self, Consumer, channel):
-        return [Consumer(queues=[rpc.nailgun_queue],
-                         callbacks=[self.consume_msg])]
+        consumer = Consumer(queues=self.queues,
+                            callbacks=[self.consume_msg])
+        if self.prefetch_count:
+            consumer.qos(prefetch_count=self.prefetch_count)
+        return [consumer]
 
     def consume_msg(self, body, msg):
+        if self.progress_messages is not None and \
+                utils.is_progress_message(body):
+            self.progress_messages.add(body, msg)
+            if self.progress_messages.is_ready():
+                self.process_progress_messages()
+            return
+
+        # keep order of messages, buffered ones are older
+        self.process_progress_messages()
+        self.process_msg(body, [msg])
+
+    def on_iteration(self):
+        if self.progress_messages is not None and \
+                self.progress_messages.is_ready():
+            self.process_progress_messages()
+
+    def process_progress_messages(self):
+        if self.progress_messages is None:
+            return
+        for body, msgs in self.progress_messages.pop():
+            self.process_msg(body, msgs)
+
+    def process_msg(self, body, msgs):
         callback = getattr(self.receiver, body["method"])
+        started_at = time.time()
         try:
             callback(**body["args"])
         except errors.CannotFindTask as e:
             logger.warn(str(e))
-            msg.ack()
+            self._ack(msgs)
         except Exception:
             logger.error(traceback.format_exc())
-            msg.ack()
+            self._ack(msgs)
         except KeyboardInterrupt:
             logger.error("Receiverd interrupted.")
-            msg.requeue()
+            for msg in msgs:
+                msg.requeue()
             raise
         else:
             db.commit()
-            msg.ack()
+            self._ack(msgs)
         finally:
             db.remove()
+            self.timings.add(body["method"], time.time() - started_at)
+
+    @staticmethod
+    def _ack(msgs):
+        for msg in msgs:
+            msg.ack()
 
     def on_precondition_failed(self, error_msg):
         logger.warning(error_msg)
         utils.delete_entities(
-            self.connection, rpc.nailgun_exchange, rpc.nailgun_queue)
+            self.connection, rpc.nailgun_exchange, *self.queues)
 
     def run(self, *args, **kwargs):
         try:
@@ -79,10 +211,139 @@ class RPCConsumer(ConsumerMixin):
             self.run(*args, **kwargs)
 
 
+class RPCDispatcher(RPCConsumer):
+    """Routes messages from the 'nailgun' queue to worker queues
+
+    Messages of the same cluster (or of the same task if it does not
+    belong to any cluster) are always routed to the same worker, so
+    they are processed in the order they were sent by orchestrator.
+    """
+
+    #: max number of task uuid -> cluster id pairs kept in memory
+    clusters_cache_size = 1000
+
+    def __init__(self, connection, workers_count, prefetch_count=0):
+        super(RPCDispatcher, self).__init__(
+            connection, None, prefetch_count=prefetch_count)
+        self.worker_queues = [rpc.get_nailgun_worker_queue(i)
+                              for i in six.moves.range(workers_count)]
+        self.clusters = {}
+        self.producer = None
+        # progress messages are merged by workers
+        self.progress_messages = None
+
+    def get_consumers(self, Consumer, channel):
+        self.producer = Producer(channel, serializer='json')
+        return super(RPCDispatcher, self).get_consumers(Consumer, channel)
+
+    def get_cluster_id(self, task_uuid):
+        if task_uuid not in self.clusters:
+            if len(self.clusters) >= self.clusters_cache_size:
+                self.clusters.clear()
+            self.clusters[task_uuid] = db().query(Task.cluster_id).filter_by(
+                uuid=task_uuid).scalar()
+        return self.clusters[task_uuid]
+
+    def get_worker_queue(self, body):
+        task_uuid = (body.get("args") or {}).get("task_uuid")
+        if task_uuid is None:
+            route_key = body["method"]
+        else:
+            cluster_id = self.get_cluster_id(task_uuid)
+            if cluster_id is None:
+                route_key = task_uuid
+            else:
+                route_key = 'cluster-{0}'.format(cluster_id)
+        index = zlib.crc32(six.b(route_key)) % len(self.worker_queues)
+        return self.worker_queues[index]
+
+    def consume_msg(self, body, msg):
+        try:
+            queue = self.get_worker_queue(body)
+            self.producer.publish(
+                body,
+                exchange=rpc.nailgun_exchange,
+                routing_key=queue.routing_key,
+                declare=[queue])
+            msg.ack()
+        finally:
+            db.remove()
+
+
+def run_worker(index):
+    with Connection(rpc.conn_str) as conn:
+        RPCConsumer(
+            conn, NailgunReceiver,
+            queues=[rpc.get_nailgun_worker_queue(index)],
+            prefetch_count=settings.RPC_CONSUMER['prefetch_count']
+        ).run()
+
+
+def run_dispatcher(workers_count):
+    with Connection(rpc.conn_str) as conn:
+        RPCDispatcher(
+            conn, workers_count,
+            prefetch_count=settings.RPC_CONSUMER['prefetch_count']
+        ).run()
+
+
+def _run_process(target, *args):
+    try:
+        target(*args)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+
+
+def run_pool(workers_count):
+    """Runs dispatcher and workers, restarts them if they exit
+
+    Supervisor process itself does not access DB or AMQP, so it is
+    safe to fork new processes from it at any moment.
+    """
+    targets = {'dispatcher': (run_dispatcher, workers_count)}
+    for index in six.moves.range(workers_count):
+        targets['worker-{0}'.format(index)] = (run_worker, index)
+
+    processes = {}
+    try:
+        while True:
+            for name, args in six.iteritems(targets):
+                process = processes.get(name)
+                if process is not None and process.is_alive():
+                    continue
+                if process is not None:
+                    logger.warning(
+                        "RPC consumer %s exited with code %s, restarting",
+                        name, process.exitcode)
+                process = multiprocessing.Process(
+                    target=_run_process, name=name, args=args)
+                process.start()
+                processes[name] = process
+            time.sleep(1)
+    finally:
+        for process in six.itervalues(processes):
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+
 def run():
+    workers_count = settings.RPC_CONSUMER['workers']
+    if workers_count > 0:
+        logger.info(
+            "Starting RPC consumer pool with %d workers...", workers_count)
+        try:
+            run_pool(workers_count)
+        except (KeyboardInterrupt, SystemExit):
+            logger.info("Stopping RPC consumer pool...")
+        return
+
     logger.info("Starting standalone RPC consumer...")
     with Connection(rpc.conn_str) as conn:
         try:
-            RPCConsumer(conn, NailgunReceiver).run()
+            RPCConsumer(
+                conn, NailgunReceiver,
+                prefetch_count=settings.RPC_CONSUMER['prefetch_count']
+            ).run()
         except (KeyboardInterrupt, SystemExit):
             logger.info("Stopping standalone RPC consumer...")
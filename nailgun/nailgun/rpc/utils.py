@@ -14,8 +14,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+
 import six
 
+from nailgun import consts
 from nailgun.logger import logger
 
 
@@ -25,3 +31,57 @@ def delete_entities(conn, *entities):
         channel = conn.channel()
         bound_entity = entity(channel)
         bound_entity.delete()
+
+
+#: fields of nodes which can be reported in progress-only deploy_resp
+PROGRESS_NODE_FIELDS = frozenset(('uid', 'status', 'progress'))
+
+
+def is_progress_message(body):
+    """Checks that message only reports deployment progress of nodes
+
+    Such messages do not change task status and do not report node
+    failures, so several of them can be merged into one without changing
+    the result of their processing.
+    """
+    if body.get('method') != 'deploy_resp':
+        return False
+
+    args = body.get('args') or {}
+    if not args.get('task_uuid') or not args.get('nodes'):
+        return False
+    if args.get('error') or args.get('status') not in (
+            None, consts.TASK_STATUSES.running):
+        return False
+    if set(args) - set(('task_uuid', 'nodes', 'status', 'progress')):
+        return False
+
+    for node in args['nodes']:
+        if not isinstance(node, dict) or 'uid' not in node:
+            return False
+        if set(node) - PROGRESS_NODE_FIELDS:
+            return False
+        if node['uid'] == consts.MASTER_ROLE:
+            return False
+        if node.get('status') == consts.NODE_STATUSES.error:
+            return False
+    return True
+
+
+def merge_progress_messages(bodies):
+    """Merges progress-only messages of the same task into one
+
+    Latest reported fields of every node win, task status and progress
+    are taken from the latest message.
+
+    :param bodies: list of messages in the order they were received
+    :returns: message body
+    """
+    nodes = OrderedDict()
+    for body in bodies:
+        for node in body['args']['nodes']:
+            nodes.setdefault(six.text_type(node['uid']), {}).update(node)
+
+    args = dict(bodies[-1]['args'])
+    args['nodes'] = list(six.itervalues(nodes))
+    return {'method': bodies[-1]['method'], 'args': args}
@@ -14,8 +14,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import gzip
 import requests
 import six
+import threading
 import time
 import urllib3
 
@@ -61,16 +63,25 @@ class StatsSender(object):
         return False
 
     def send_data_to_url(self, url, data):
+        headers = {
+            'content-type': 'application/json',
+            'master-node-uid': InstallationInfo().get_master_node_uid()
+        }
+        return self.post_to_url(url, headers, jsonutils.dumps(data))
+
+    def post_to_url(self, url, headers, body):
+        """Posts already serialized body to collector
+
+        Doesn't touch DB, so it can be called from a separate thread.
+
+        :returns: response or None if request failed
+        """
         resp = None
         try:
-            headers = {
-                'content-type': 'application/json',
-                'master-node-uid': InstallationInfo().get_master_node_uid()
-            }
             resp = requests.post(
                 url,
                 headers=headers,
-                data=jsonutils.dumps(data),
+                data=body,
                 timeout=settings.COLLECTOR_RESP_TIMEOUT)
         except (urllib3.exceptions.DecodeError,
                 urllib3.exceptions.ProxyError,
@@ -84,6 +95,27 @@ class StatsSender(object):
                 "Sending data to collector failed: %s", six.text_type(e))
         return resp
 
+    def post_to_url_async(self, url, headers, body):
+        """Posts body to collector in a separate thread
+
+        :returns: function which waits for the request and returns
+                  its response
+        """
+        result = {}
+
+        def post():
+            result['resp'] = self.post_to_url(url, headers, body)
+
+        thread = threading.Thread(target=post)
+        thread.daemon = True
+        thread.start()
+
+        def wait():
+            thread.join()
+            return result.get('resp')
+
+        return wait
+
     def is_status_acceptable(
             self, resp_status_code, resp_status,
             codes=(requests.codes.created, requests.codes.ok)
@@ -98,67 +130,145 @@ class StatsSender(object):
                 url=self.build_collector_url("COLLECTOR_ACTION_LOGS_URL"),
                 data={"action_logs": records}
             )
-            resp_dict = resp.json()
-            if self.is_status_acceptable(resp.status_code,
-                                         resp_dict["status"]):
-                records_resp = resp_dict["action_logs"]
-                saved_ids = set()
-                failed_ids = set()
-                skipped_ids = set()
-                for record in records_resp:
-                    if record["status"] == \
-                            consts.LOG_RECORD_SEND_STATUS.failed:
-                        failed_ids.add(record["external_id"])
-                    elif record["status"] == \
-                            consts.LOG_RECORD_SEND_STATUS.skipped:
-                        skipped_ids.add(record["external_id"])
-                    else:
-                        saved_ids.add(record["external_id"])
-                sent_saved_ids = set(saved_ids) & set(ids)
-                logger.info("Action logs records saved: %s, failed: %s, "
-                            "skipped: %s",
-                            six.text_type(list(sent_saved_ids)),
-                            six.text_type(list(failed_ids)),
-                            six.text_type(list(skipped_ids)))
-                if sent_saved_ids:
-                    db().query(models.ActionLog).filter(
-                        models.ActionLog.id.in_(sent_saved_ids)
-                    ).update(
-                        {"is_sent": True}, synchronize_session=False
-                    )
-                    db().commit()
-            else:
-                logger.error("Unexpected collector answer: %s",
-                             six.text_type(resp.text))
+            self.save_action_log_sent(resp, ids)
 
-    def send_action_log(self):
-        action_log = db().query(models.ActionLog).order_by(
+    def save_action_log_sent(self, resp, ids):
+        """Marks action logs saved by collector as sent
+
+        :param resp: response of collector on sent action logs
+        :param ids: ids of sent action logs
+        """
+        if resp is None:
+            return
+
+        resp_dict = resp.json()
+        if self.is_status_acceptable(resp.status_code,
+                                     resp_dict["status"]):
+            records_resp = resp_dict["action_logs"]
+            saved_ids = set()
+            failed_ids = set()
+            skipped_ids = set()
+            for record in records_resp:
+                if record["status"] == \
+                        consts.LOG_RECORD_SEND_STATUS.failed:
+                    failed_ids.add(record["external_id"])
+                elif record["status"] == \
+                        consts.LOG_RECORD_SEND_STATUS.skipped:
+                    skipped_ids.add(record["external_id"])
+                else:
+                    saved_ids.add(record["external_id"])
+            sent_saved_ids = set(saved_ids) & set(ids)
+            logger.info("Action logs records saved: %s, failed: %s, "
+                        "skipped: %s",
+                        six.text_type(list(sent_saved_ids)),
+                        six.text_type(list(failed_ids)),
+                        six.text_type(list(skipped_ids)))
+            if sent_saved_ids:
+                db().query(models.ActionLog).filter(
+                    models.ActionLog.id.in_(sent_saved_ids)
+                ).update(
+                    {"is_sent": True}, synchronize_session=False
+                )
+                db().commit()
+        else:
+            logger.error("Unexpected collector answer: %s",
+                         six.text_type(resp.text))
+
+    def get_action_log_chunk(self, last_id):
+        """Fetches the next chunk of unsent action logs
+
+        Chunks are paginated by id, not by offset, so every chunk costs
+        the same regardless of the number of rows before it. Only
+        serialized columns are fetched, ORM objects are not built.
+
+        :param last_id: id of the last record of the previous chunk
+        :returns: list of rows with serialized fields
+        """
+        fields = objects.ActionLog.serializer.fields
+        return db().query(
+            *[getattr(models.ActionLog, f) for f in fields]
+        ).filter(
+            models.ActionLog.is_sent.is_(False),
+            models.ActionLog.id > last_id
+        ).order_by(
             models.ActionLog.id
-        ).filter_by(
-            is_sent=False
-        ).limit(settings.STATS_SEND_COUNT)
-        logger.info("Action log has %d unsent records", action_log.count())
+        ).limit(settings.STATS_SEND_COUNT).all()
+
+    def build_action_log_body(self, rows, uid):
+        """Serializes chunk of action logs into request body
+
+        Records are written one by one into the body, which is
+        gzipped if STATS_COMPRESS_ACTION_LOGS is enabled.
 
+        :param rows: rows returned by get_action_log_chunk
+        :param uid: master node uid
+        :returns: tuple of request body and dict of extra headers
+        """
+        fields = objects.ActionLog.serializer.fields
+        buf = six.BytesIO()
+        headers = {}
+        if settings.STATS_COMPRESS_ACTION_LOGS:
+            stream = gzip.GzipFile(fileobj=buf, mode='wb')
+            headers['content-encoding'] = 'gzip'
+        else:
+            stream = buf
+
+        stream.write(b'{"action_logs": [')
+        for i, row in enumerate(rows):
+            body = dict(zip(fields, row))
+            record = {
+                'external_id': body['id'],
+                'master_node_uid': uid,
+                'body': body
+            }
+            if i:
+                stream.write(b', ')
+            stream.write(six.b(jsonutils.dumps(record)))
+        stream.write(b']}')
+
+        if stream is not buf:
+            stream.close()
+        return buf.getvalue(), headers
+
+    def send_action_log(self):
         uid = InstallationInfo().get_master_node_uid()
-        offset = 0
+        url = self.build_collector_url("COLLECTOR_ACTION_LOGS_URL")
+        headers = {
+            'content-type': 'application/json',
+            'master-node-uid': uid
+        }
+
+        # request with a chunk is in flight while the next chunk
+        # is fetched, and its response is handled afterwards
+        pending = None
+        last_id = 0
+        sent_count = 0
         while True:
-            log_chunk = action_log.offset(offset)
-            records = []
-            ids = []
-            logger.info("Send records: %s", six.text_type(log_chunk.count()))
-            for log_record in log_chunk:
-                body = objects.ActionLog.to_dict(log_record)
-                record = {
-                    'external_id': body['id'],
-                    'master_node_uid': uid,
-                    'body': body
-                }
-                records.append(record)
-                ids.append(log_record.id)
-            self.send_log_serialized(records, ids)
-            if log_chunk.count() < settings.STATS_SEND_COUNT:
+            rows = self.get_action_log_chunk(last_id)
+            request = None
+            if rows:
+                logger.info("Send %d action logs records", len(rows))
+                body, extra_headers = self.build_action_log_body(rows, uid)
+                chunk_headers = dict(headers, **extra_headers)
+                request = (
+                    self.post_to_url_async(url, chunk_headers, body),
+                    [row.id for row in rows]
+                )
+                last_id = rows[-1].id
+                sent_count += len(rows)
+
+            if pending is not None:
+                wait, ids = pending
+                self.save_action_log_sent(wait(), ids)
+            pending = request
+
+            if len(rows) < settings.STATS_SEND_COUNT:
                 break
-            offset += settings.STATS_SEND_COUNT
+
+        if pending is not None:
+            wait, ids = pending
+            self.save_action_log_sent(wait(), ids)
+        logger.info("Action log records sent: %d", sent_count)
 
     def send_installation_info(self):
         logger.info("Sending installation structure info")
@@ -379,7 +379,7 @@ class TaskHelper(object):
         """Retrieve "cache" attritbute from task instance.
 
         In some cases row that is related to task_instance is deleted
-        from db and, since "cache" attribute has marked as deffered,
+        from db and, since "cache" attribute is loaded on demand,
         SQLAlchemy error occurs.
 
         :param task_instance: task object to inspect
@@ -537,6 +537,15 @@ class ApplyChangesTaskManager(TaskManager, DeploymentCheckMixin):
             tasks.CheckBeforeDeploymentTask
         )
 
+        # check_before is deleted when checks pass,
+        # so timings of checks are kept in result of supertask
+        timings = (check_before.result or {}).get('timings')
+        if timings:
+            result = dict(supertask.result or {})
+            result['check_before_deployment_timings'] = timings
+            supertask.result = result
+            db().flush()
+
         # if failed to check prerequisites
         # then task is already set to error
         if check_before.status == consts.TASK_STATUSES.error:
@@ -17,6 +17,8 @@
 import collections
 from copy import deepcopy
 import os
+import threading
+import time
 
 import netaddr
 import six
@@ -50,7 +52,7 @@ from nailgun.orchestrator import tasks_templates
 from nailgun.settings import settings
 from nailgun.task.fake import FAKE_THREADS
 from nailgun.task.helpers import TaskHelper
-from nailgun.utils import http_get
+from nailgun.utils import http_pool
 from nailgun.utils import logs as logs_utils
 from nailgun.utils.restrictions import VmwareAttributesRestriction
 from nailgun.utils.zabbix import ZabbixManager
@@ -99,6 +101,11 @@ def fake_cast(queue, messages, **kwargs):
         make_thread_task_in_orchestrator(messages)
 
 
+def fake_cast_many(casts):
+    for queue, messages, service in casts:
+        fake_cast(queue, messages, service=service)
+
+
 class DeploymentTask(object):
     """Task for applying changes to cluster
 
@@ -180,7 +187,7 @@ class DeploymentTask(object):
         # it should not cause any issues with deployment/progress and was
         # done by design
         serialized_cluster = deployment_serializers.serialize(
-            orchestrator_graph, task.cluster, nodes)
+            orchestrator_graph, task.cluster, nodes, use_cache=True)
         pre_deployment = stages.pre_deployment_serialize(
             orchestrator_graph, task.cluster, nodes)
         post_deployment = stages.post_deployment_serialize(
@@ -1071,36 +1078,136 @@ class CheckNetworksTask(object):
         db().commit()
 
 
+class CheckBeforeDeploymentSnapshot(object):
+    """Cluster data shared by checks before deployment
+
+    Nodes, attributes and volume managers of nodes are loaded on the
+    first access and then reused by all checks. The snapshot is active
+    inside of ``with`` block, outside of it get() returns a new snapshot
+    on every call, so a check which is run on its own sees actual data.
+    """
+
+    _local = threading.local()
+
+    def __init__(self, cluster):
+        self.cluster = cluster
+        self._memo = {}
+        self._previous = None
+
+    @classmethod
+    def get(cls, cluster):
+        snapshot = getattr(cls._local, 'snapshot', None)
+        if snapshot is not None and snapshot.cluster.id == cluster.id:
+            return snapshot
+        return cls(cluster)
+
+    def __enter__(self):
+        self._previous = getattr(self._local, 'snapshot', None)
+        self._local.snapshot = self
+        return self
+
+    def __exit__(self, *exc_info):
+        self._local.snapshot = self._previous
+        self._previous = None
+
+    def memoize(self, key, func, *args):
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = func(*args)
+            return value
+
+    def get_nodes(self):
+        return self.memoize(
+            'nodes', lambda: sorted(self.cluster.nodes, key=lambda n: n.id))
+
+    def get_nodes_by_role(self, role_name):
+        """Nodes which have role_name in roles or pending roles
+
+        Behaves like :func:`objects.Cluster.get_nodes_by_role` but
+        filters already loaded nodes instead of querying DB.
+        """
+        if role_name not in self.get_roles():
+            return []
+        return [n for n in self.get_nodes()
+                if role_name in n.roles or role_name in n.pending_roles]
+
+    def get_nodes_to_deploy(self):
+        return self.memoize(
+            'nodes_to_deploy', TaskHelper.nodes_to_deploy, self.cluster)
+
+    def get_roles(self):
+        return self.memoize(
+            'roles', objects.Cluster.get_roles, self.cluster)
+
+    def get_merged_attributes(self):
+        return self.memoize(
+            'merged_attributes',
+            objects.Attributes.merged_attrs, self.cluster.attributes)
+
+    def get_editable_attributes(self):
+        return self.memoize(
+            'editable_attributes',
+            objects.Cluster.get_editable_attributes, self.cluster)
+
+    def get_volume_manager(self, node):
+        return self.memoize(
+            ('volume_manager', node.id), lambda: node.volume_manager)
+
+
 class CheckBeforeDeploymentTask(object):
 
+    #: names of methods with checks, in order of execution
+    checks = (
+        '_check_nodes_are_online',
+        '_check_controllers_count',
+        '_check_disks',
+        '_check_ceph',
+        '_check_volumes',
+        '_check_public_network',
+        '_check_vmware_consistency',
+        '_validate_network_template',
+        '_check_deployment_graph_for_correctness',
+    )
+
     @classmethod
     def execute(cls, task):
-        cls._check_nodes_are_online(task)
-        cls._check_controllers_count(task)
-        cls._check_disks(task)
-        cls._check_ceph(task)
-        cls._check_volumes(task)
-        cls._check_public_network(task)
-        cls._check_vmware_consistency(task)
-        cls._validate_network_template(task)
-        cls._check_deployment_graph_for_correctness(task)
-
+        checks = list(cls.checks)
         if objects.Release.is_external_mongo_enabled(task.cluster.release):
-            cls._check_mongo_nodes(task)
+            checks.append('_check_mongo_nodes')
+
+        timings = collections.OrderedDict()
+        try:
+            with CheckBeforeDeploymentSnapshot(task.cluster):
+                for check in checks:
+                    started_at = time.time()
+                    try:
+                        getattr(cls, check)(task)
+                    finally:
+                        timings[check] = round(time.time() - started_at, 3)
+        finally:
+            logger.debug(
+                "Checks before deployment of cluster %s took: %s",
+                task.cluster.id, timings)
+            result = dict(task.result or {})
+            result['timings'] = timings
+            task.result = result
 
     @classmethod
     def _check_nodes_are_online(cls, task):
-        offline_nodes = db().query(Node).\
-            filter(Node.cluster == task.cluster).\
-            filter_by(online=False).\
-            filter_by(pending_deletion=False)
+        snapshot = CheckBeforeDeploymentSnapshot.get(task.cluster)
+        offline_nodes = [n for n in snapshot.get_nodes()
+                         if not n.online and not n.pending_deletion]
 
         offline_nodes_not_ready = [n for n in offline_nodes
                                    if n.status != consts.NODE_STATUSES.ready]
-        nodes_to_deploy = TaskHelper.nodes_to_deploy(task.cluster)
-        offline_nodes_to_redeploy = [
-            n for n in offline_nodes
-            if n.status == consts.NODE_STATUSES.ready and n in nodes_to_deploy]
+        offline_nodes_to_redeploy = []
+        if len(offline_nodes_not_ready) < len(offline_nodes):
+            nodes_to_deploy = snapshot.get_nodes_to_deploy()
+            offline_nodes_to_redeploy = [
+                n for n in offline_nodes
+                if n.status == consts.NODE_STATUSES.ready and
+                n in nodes_to_deploy]
 
         if offline_nodes_not_ready or offline_nodes_to_redeploy:
             node_names = ','.join(
@@ -1117,8 +1224,8 @@ class CheckBeforeDeploymentTask(object):
         min_controllers = objects.Release.get_min_controller_count(
             cluster.release)
 
-        controllers = objects.Cluster.get_nodes_by_role(
-            task.cluster, 'controller')
+        controllers = CheckBeforeDeploymentSnapshot.get(
+            cluster).get_nodes_by_role('controller')
         # we should make sure that cluster has at least one controller
         if len(controllers) < min_controllers:
             raise errors.NotEnoughControllers(
@@ -1146,10 +1253,12 @@ class CheckBeforeDeploymentTask(object):
 
     @classmethod
     def _check_disks(cls, task):
+        snapshot = CheckBeforeDeploymentSnapshot.get(task.cluster)
         try:
-            for node in task.cluster.nodes:
+            for node in snapshot.get_nodes():
                 if cls._is_disk_checking_required(node):
-                    node.volume_manager.check_disk_space_for_deployment()
+                    snapshot.get_volume_manager(node).\
+                        check_disk_space_for_deployment()
         except errors.NotEnoughFreeSpace:
             raise errors.NotEnoughFreeSpace(
                 u"Node '{0}' has insufficient disk space".format(
@@ -1159,10 +1268,12 @@ class CheckBeforeDeploymentTask(object):
 
     @classmethod
     def _check_volumes(cls, task):
+        snapshot = CheckBeforeDeploymentSnapshot.get(task.cluster)
         try:
-            for node in task.cluster.nodes:
+            for node in snapshot.get_nodes():
                 if cls._is_disk_checking_required(node):
-                    node.volume_manager.check_volume_sizes_for_deployment()
+                    snapshot.get_volume_manager(node).\
+                        check_volume_sizes_for_deployment()
         except errors.NotEnoughFreeSpace as e:
             raise errors.NotEnoughFreeSpace(
                 u"Node '%s' has insufficient disk space\n%s" % (
@@ -1170,9 +1281,8 @@ class CheckBeforeDeploymentTask(object):
 
     @classmethod
     def _check_ceph(cls, task):
-        storage = objects.Attributes.merged_attrs(
-            task.cluster.attributes
-        )['storage']
+        storage = CheckBeforeDeploymentSnapshot.get(
+            task.cluster).get_merged_attributes()['storage']
         for option in storage:
             if '_ceph' in option and\
                storage[option] and\
@@ -1191,12 +1301,12 @@ class CheckBeforeDeploymentTask(object):
 
     @classmethod
     def _check_ceph_osds(cls, task):
+        snapshot = CheckBeforeDeploymentSnapshot.get(task.cluster)
         osd_count = len(filter(
             lambda node: 'ceph-osd' in node.all_roles,
-            task.cluster.nodes))
-        osd_pool_size = int(objects.Attributes.merged_attrs(
-            task.cluster.attributes
-        )['storage']['osd_pool_size']['value'])
+            snapshot.get_nodes()))
+        osd_pool_size = int(snapshot.get_merged_attributes()
+                            ['storage']['osd_pool_size']['value'])
         if osd_count < osd_pool_size:
             raise errors.NotEnoughOsdNodes(
                 'Number of OSD nodes (%s) cannot be less than '
@@ -1247,29 +1357,29 @@ class CheckBeforeDeploymentTask(object):
     @classmethod
     def _check_mongo_nodes(cls, task):
         """Check for mongo nodes presence in env with external mongo."""
-        components = objects.Attributes.merged_attrs(
-            task.cluster.attributes).get("additional_components", None)
+        snapshot = CheckBeforeDeploymentSnapshot.get(task.cluster)
+        components = snapshot.get_merged_attributes().get(
+            "additional_components", None)
         if (components and components["ceilometer"]["value"]
             and components["mongo"]["value"]
-                and len(objects.Cluster.get_nodes_by_role(
-                        task.cluster, 'mongo')) > 0):
+                and len(snapshot.get_nodes_by_role('mongo')) > 0):
                     raise errors.ExtMongoCheckerError
         if (components and components["ceilometer"]["value"]
             and not components["mongo"]["value"]
-                and len(objects.Cluster.get_nodes_by_role(
-                        task.cluster, 'mongo')) == 0):
+                and len(snapshot.get_nodes_by_role('mongo')) == 0):
                     raise errors.MongoNodesCheckError
 
     @classmethod
     def _check_vmware_consistency(cls, task):
         """Checks vmware attributes consistency and proper values."""
-        attributes = objects.Cluster.get_editable_attributes(task.cluster)
+        snapshot = CheckBeforeDeploymentSnapshot.get(task.cluster)
         vmware_attributes = task.cluster.vmware_attributes
         # Old(< 6.1) clusters haven't vmware support
         if vmware_attributes:
+            attributes = snapshot.get_editable_attributes()
             cinder_nodes = filter(
                 lambda node: 'cinder' in node.all_roles,
-                task.cluster.nodes)
+                snapshot.get_nodes())
 
             if not cinder_nodes:
                 logger.info('There is no any node with "cinder" role provided')
@@ -1501,13 +1611,10 @@ class CheckRepositoryConnectionFromMasterNodeTask(object):
 
     @classmethod
     def _get_responses(cls, urls):
-        responses = []
-        for url in urls:
-            # sometimes mirrors are under heavy load, and may return 502.
-            # they also could be in "sync" state, and hence respond with
-            # 404 either. so let's do several attempts.
-            responses.append(http_get(url, retries_on=[404, 500, 502]))
-        return responses
+        # sometimes mirrors are under heavy load, and may return 502.
+        # they also could be in "sync" state, and hence respond with
+        # 404 either. so let's do several attempts.
+        return http_pool.http_get_many(urls, retries_on=[404, 500, 502])
 
 
 class CheckRepoAvailability(BaseNetworkVerification):
@@ -1778,6 +1885,7 @@ class UpdateOpenstackConfigTask(object):
 
 if settings.FAKE_TASKS or settings.FAKE_TASKS_AMQP:
     rpc.cast = fake_cast
+    rpc.cast_many = fake_cast_many
     CheckRepositoryConnectionFromMasterNodeTask\
         ._get_failed_repositories = classmethod(
             lambda *args: [])
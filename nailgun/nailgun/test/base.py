@@ -75,6 +75,7 @@ from nailgun.objects import Release
 
 from nailgun.app import build_app
 from nailgun.consts import NETWORK_INTERFACE_TYPES
+from nailgun.middleware.connection_monitor import ActionLogsWriter
 from nailgun.middleware.connection_monitor import ConnectionMonitorMiddleware
 from nailgun.middleware.keystone import NailgunFakeKeystoneAuthMiddleware
 from nailgun.network.manager import NetworkManager
@@ -102,6 +103,11 @@ def test_db_driver(handler):
         # we do not remove session in tests
 
 
+class SyncConnectionMonitorMiddleware(ConnectionMonitorMiddleware):
+    # action logs are stored synchronously to be checked in tests
+    writer = ActionLogsWriter()
+
+
 class EnvironmentManager(object):
 
     def __init__(self, app, session=None):
@@ -1296,7 +1302,7 @@ class BaseTestCase(TestCase):
     def setUpClass(cls):
         cls.app = app.TestApp(
             build_app(db_driver=test_db_driver).wsgifunc(
-                ConnectionMonitorMiddleware)
+                SyncConnectionMonitorMiddleware)
         )
         syncdb()
 
@@ -1438,7 +1444,8 @@ class BaseAuthenticationIntegrationTest(BaseIntegrationTest):
     def setUpClass(cls):
         super(BaseAuthenticationIntegrationTest, cls).setUpClass()
         cls.app = app.TestApp(build_app(db_driver=test_db_driver).wsgifunc(
-            ConnectionMonitorMiddleware, NailgunFakeKeystoneAuthMiddleware))
+            SyncConnectionMonitorMiddleware,
+            NailgunFakeKeystoneAuthMiddleware))
         syncdb()
 
     def get_auth_token(self):
@@ -13,10 +13,15 @@
 #    under the License.
 
 import datetime
+
+import mock
 from oslo_serialization import jsonutils
+import six
 
 from nailgun import consts
+from nailgun.middleware.connection_monitor import AsyncActionLogsWriter
 from nailgun import objects
+from nailgun.test.base import BaseIntegrationTest
 from nailgun.test.base import BaseMasterNodeSettignsTest
 from nailgun.test.base import fake_tasks
 from nailgun.utils import reverse
@@ -242,3 +247,64 @@ class TestActionLogs(BaseMasterNodeSettignsTest):
                                 'status': consts.TASK_STATUSES.ready})
     def test_remove_stats_user_logged_patch(self):
         self.check_remove_stats_user_logged(self.app.patch)
+
+
+class TestAsyncActionLogsWriter(BaseIntegrationTest):
+
+    def _get_action_log_kwargs(self, action_name):
+        return {
+            'actor_id': None,
+            'action_group': 'cluster_changes',
+            'action_name': action_name,
+            'action_type': consts.ACTION_TYPES.http_request,
+            'start_timestamp': datetime.datetime.utcnow(),
+            'end_timestamp': datetime.datetime.utcnow(),
+            'additional_info': {'request_data': {}, 'response_data': {}},
+            'cluster_id': None,
+        }
+
+    def test_action_logs_stored_in_background(self):
+        writer = AsyncActionLogsWriter(queue_size=10, batch_size=2)
+        for i in six.moves.range(5):
+            writer.write(self._get_action_log_kwargs('action_{0}'.format(i)))
+        writer.flush()
+
+        action_names = set(
+            al.action_name for al in objects.ActionLogCollection.filter_by(
+                None, action_type=consts.ACTION_TYPES.http_request))
+        self.assertEqual(
+            set('action_{0}'.format(i) for i in six.moves.range(5)),
+            action_names)
+
+    def test_action_log_stored_synchronously_if_queue_is_full(self):
+        writer = AsyncActionLogsWriter(queue_size=1, batch_size=1)
+        writer._ensure_started()
+
+        with mock.patch.object(writer.queue, 'put_nowait',
+                               side_effect=six.moves.queue.Full):
+            writer.write(self._get_action_log_kwargs('sync_action'))
+
+        self.assertIsNotNone(objects.ActionLog.get_by_kwargs(
+            action_name='sync_action'))
+
+    def test_queued_action_logs_stored_on_stop(self):
+        writer = AsyncActionLogsWriter(queue_size=10, batch_size=2)
+        for i in six.moves.range(3):
+            writer.write(self._get_action_log_kwargs('action_{0}'.format(i)))
+        writer.stop()
+
+        self.assertFalse(writer._thread.is_alive())
+        for i in six.moves.range(3):
+            self.assertIsNotNone(objects.ActionLog.get_by_kwargs(
+                action_name='action_{0}'.format(i)))
+
+    def test_dropped_action_logs_counted(self):
+        writer = AsyncActionLogsWriter(queue_size=1, batch_size=1)
+        writer._ensure_started()
+
+        with mock.patch.object(writer.queue, 'put_nowait',
+                               side_effect=six.moves.queue.Full):
+            with mock.patch.object(writer, '_store', side_effect=Exception):
+                writer.write(self._get_action_log_kwargs('sync_action'))
+
+        self.assertEqual(1, writer.dropped)
@@ -24,6 +24,7 @@ from nailgun.app import build_app
 from nailgun.db import engine
 from nailgun.db import flush
 from nailgun.db import NoCacheQuery
+from nailgun.db import read_only
 from nailgun.db.sqlalchemy.models import Node
 
 
@@ -63,3 +64,22 @@ class TestDBRefresh(TestCase):
             Node.id == node.id
         ).first()
         self.assertEqual(node.mac, "aa:bb:cc:dd:ff:11")
+
+    def test_loaded_objects_not_refreshed_in_read_only_mode(self):
+        node = Node()
+        node.mac = "aa:bb:cc:dd:ff:11"
+        node.timestamp = datetime.now()
+        self.db.add(node)
+        self.db.commit()
+        self.db.query(Node).get(node.id)
+
+        node2 = self.db2.query(Node).get(node.id)
+        node2.mac = "aa:bb:cc:dd:ff:22"
+        self.db2.commit()
+
+        with read_only(self.db):
+            self.db.query(Node).filter(Node.id == node.id).first()
+            self.assertEqual(node.mac, "aa:bb:cc:dd:ff:11")
+
+        self.db.query(Node).filter(Node.id == node.id).first()
+        self.assertEqual(node.mac, "aa:bb:cc:dd:ff:22")
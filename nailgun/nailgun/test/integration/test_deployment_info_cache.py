@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from nailgun import consts
+from nailgun.db.sqlalchemy.models import NodeDeploymentInfo
+from nailgun import objects
+from nailgun.orchestrator.deployment_graph import AstuteGraph
+from nailgun.orchestrator.deployment_serializers import \
+    get_serializer_for_cluster
+from nailgun.settings import settings
+from nailgun.test import base
+from nailgun.utils import reverse
+
+
+class TestDeploymentInfoCache(base.BaseIntegrationTest):
+
+    def setUp(self):
+        super(TestDeploymentInfoCache, self).setUp()
+        self.env.create(
+            release_kwargs={'version': '2015.1.0-8.0'},
+            cluster_kwargs={
+                'mode': consts.CLUSTER_MODES.ha_compact,
+                'net_provider': consts.CLUSTER_NET_PROVIDERS.neutron,
+                'net_segment_type': consts.NEUTRON_SEGMENT_TYPES.vlan},
+            nodes_kwargs=[
+                {'roles': ['controller'], 'pending_addition': True},
+                {'roles': ['compute', 'cinder'], 'pending_addition': True},
+            ])
+        self.cluster_db = self.env.clusters[0]
+        objects.Cluster.prepare_for_deployment(self.cluster_db)
+
+        patcher = mock.patch.dict(
+            settings.DEPLOYMENT_INFO_CACHE, {'enabled': True})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def serialize(self, use_cache=True):
+        serializer = get_serializer_for_cluster(self.cluster_db)(
+            AstuteGraph(self.cluster_db))
+        with mock.patch.object(
+                serializer, 'serialize_node',
+                side_effect=serializer.serialize_node) as serialize_mock:
+            serialized = serializer.serialize(
+                self.cluster_db, self.cluster_db.nodes, use_cache=use_cache)
+        serialized_uids = set(
+            call[0][0].uid for call in serialize_mock.call_args_list)
+        return serialized, serialized_uids
+
+    def test_unchanged_nodes_are_not_serialized(self):
+        serialized, serialized_uids = self.serialize()
+        self.assertEqual(
+            serialized_uids, set(n.uid for n in self.cluster_db.nodes))
+        self.assertEqual(self.db.query(NodeDeploymentInfo).count(), 2)
+
+        reused, serialized_uids = self.serialize()
+        self.assertEqual(serialized_uids, set())
+        self.assertItemsEqual(serialized, reused)
+
+    def test_changed_node_is_serialized(self):
+        self.serialize()
+        node = self.cluster_db.nodes[0]
+        node.name = 'renamed-node'
+
+        serialized, serialized_uids = self.serialize()
+        self.assertEqual(serialized_uids, set([node.uid]))
+        for node_info in serialized:
+            if node_info['uid'] == node.uid:
+                self.assertEqual(node_info['user_node_name'], 'renamed-node')
+
+    def test_cluster_changes_invalidate_all_nodes(self):
+        self.serialize()
+        objects.Cluster.patch_attributes(
+            self.cluster_db,
+            {'editable': {'common': {'debug': {'value': True}}}})
+
+        _, serialized_uids = self.serialize()
+        self.assertEqual(
+            serialized_uids, set(n.uid for n in self.cluster_db.nodes))
+
+    def test_cache_disabled(self):
+        with mock.patch.dict(
+                settings.DEPLOYMENT_INFO_CACHE, {'enabled': False}):
+            self.serialize()
+            _, serialized_uids = self.serialize()
+
+        self.assertEqual(
+            serialized_uids, set(n.uid for n in self.cluster_db.nodes))
+        self.assertEqual(self.db.query(NodeDeploymentInfo).count(), 0)
+
+    def test_cache_is_not_used_by_default(self):
+        self.serialize(use_cache=False)
+        _, serialized_uids = self.serialize(use_cache=False)
+
+        self.assertEqual(
+            serialized_uids, set(n.uid for n in self.cluster_db.nodes))
+        self.assertEqual(self.db.query(NodeDeploymentInfo).count(), 0)
+
+    def test_default_deployment_info_does_not_write_cache(self):
+        resp = self.app.get(
+            reverse('DefaultDeploymentInfo',
+                    kwargs={'cluster_id': self.cluster_db.id}),
+            headers=self.default_headers)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.db.query(NodeDeploymentInfo).count(), 0)
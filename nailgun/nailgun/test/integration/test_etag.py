@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_serialization import jsonutils
+
+from nailgun.db import revisions
+from nailgun.db.sqlalchemy.models import IPAddr
+from nailgun.db.sqlalchemy.models import Revision
+from nailgun.test.base import BaseIntegrationTest
+from nailgun.utils import reverse
+
+
+class TestETag(BaseIntegrationTest):
+
+    def get(self, url, etag=None, status=200):
+        headers = dict(self.default_headers)
+        if etag:
+            headers['If-None-Match'] = etag
+        return self.app.get(url, headers=headers, status=status)
+
+    def get_revision(self, name):
+        return self.db.query(Revision.value).filter_by(
+            name=name).scalar() or 0
+
+    def test_not_modified_nodes(self):
+        self.env.create_node(api=True)
+        url = reverse('NodeCollectionHandler')
+
+        resp = self.get(url)
+        etag = resp.headers['ETag']
+        self.assertEqual(1, len(resp.json_body))
+
+        resp = self.get(url, etag=etag, status=304)
+        self.assertEqual('', resp.body)
+        self.assertEqual(etag, resp.headers['ETag'])
+
+        self.get(url, etag='W/' + etag, status=304)
+        self.get(url, etag='"other", ' + etag, status=304)
+        self.get(url, etag='"other"', status=200)
+
+    def test_etag_is_changed_after_update(self):
+        node = self.env.create_node(api=True)
+        url = reverse('NodeHandler', kwargs={'obj_id': node['id']})
+        etag = self.get(url).headers['ETag']
+
+        self.app.put(
+            url, jsonutils.dumps({'name': 'new name'}),
+            headers=self.default_headers)
+
+        resp = self.get(url, etag=etag)
+        self.assertEqual('new name', resp.json_body['name'])
+        self.assertNotEqual(etag, resp.headers['ETag'])
+
+    def test_etag_differs_for_urls(self):
+        self.env.create_node(api=True)
+        etag = self.get(reverse('NodeCollectionHandler')).headers['ETag']
+        self.get(
+            reverse('NodeCollectionHandler') + '?cluster_id=1',
+            etag=etag, status=200)
+
+    def test_related_tables_change_etag(self):
+        cluster = self.env.create_cluster(api=True)
+        url = reverse('ClusterHandler', kwargs={'obj_id': cluster['id']})
+        etag = self.get(url).headers['ETag']
+
+        self.env.create_notification()
+        self.get(url, etag=etag, status=304)
+
+        # is_locked of cluster depends on statuses of nodes
+        self.env.create_node(api=True)
+        etag = self.get(url, etag=etag, status=200).headers['ETag']
+
+        self.app.put(
+            url, jsonutils.dumps({'name': 'new name'}),
+            headers=self.default_headers)
+        self.get(url, etag=etag, status=200)
+
+    def test_revisions_increased_after_commit(self):
+        node = self.env.create_node(api=False)
+        revision = self.get_revision('nodes')
+
+        node.name = 'new name'
+        self.db.flush()
+        self.assertEqual(revision, self.get_revision('nodes'))
+
+        self.db.commit()
+        self.assertEqual(revision + 1, self.get_revision('nodes'))
+
+    def test_rolled_back_changes_are_not_tracked(self):
+        node = self.env.create_node(api=False)
+        revision = self.get_revision('nodes')
+
+        node.name = 'new name'
+        self.db.flush()
+        self.db.rollback()
+        self.db.commit()
+        self.assertEqual(revision, self.get_revision('nodes'))
+
+    def test_ignored_columns_are_not_tracked(self):
+        node = self.env.create_node(api=False)
+        revision = self.get_revision('nodes')
+
+        node.timestamp = node.timestamp.replace(year=2000)
+        self.db.commit()
+        self.assertEqual(revision, self.get_revision('nodes'))
+
+    def test_core_statements_are_tracked(self):
+        node = self.env.create_node(api=False)
+        revision = self.get_revision('ip_addrs')
+
+        self.db.execute(IPAddr.__table__.insert(), [
+            {'node': node.id, 'ip_addr': '10.20.0.254'}])
+        self.db.commit()
+        self.assertEqual(revision + 1, self.get_revision('ip_addrs'))
+
+    def test_increase_creates_missing_revisions(self):
+        revisions.increase(self.db.get_bind(), ['test_table'])
+        revisions.increase(self.db.get_bind(), ['test_table'])
+        self.assertEqual(2, self.get_revision('test_table'))
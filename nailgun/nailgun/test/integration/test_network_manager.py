@@ -1120,6 +1120,59 @@ class TestNeutronManager70(BaseNetworkManagerTest):
     def test_get_network_manager(self):
         self.assertIs(self.net_manager, NeutronManager70)
 
+    def test_assign_ips_in_bulk(self):
+        nodes = self.env.create_nodes(
+            3, cluster_id=self.cluster.id, roles=['compute'])
+        networks = dict(
+            (ng.name, ng) for ng in self.cluster.network_groups
+            if ng.meta.get('notation'))
+
+        self.net_manager.assign_ips_in_bulk(self.cluster, nodes)
+
+        for net_name in (consts.NETWORKS.management,
+                         consts.NETWORKS.storage):
+            net = networks[net_name]
+            ips = [ip.ip_addr for ip in self.db.query(IPAddr).filter(
+                IPAddr.network == net.id, IPAddr.node.isnot(None))]
+            self.assertEqual(len(nodes), len(ips))
+            self.assertEqual(len(ips), len(set(ips)))
+            for ip in ips:
+                self.assertTrue(
+                    self.net_manager.check_ip_belongs_to_net(ip, net))
+
+    def test_assign_ips_in_bulk_refreshes_loaded_ips(self):
+        nodes = self.env.create_nodes(
+            2, cluster_id=self.cluster.id, roles=['compute'])
+        loaded = [len(node.ip_addrs) for node in nodes]
+
+        self.net_manager.assign_ips_in_bulk(self.cluster, nodes)
+
+        for node, count in zip(nodes, loaded):
+            self.assertGreater(len(node.ip_addrs), count)
+
+    def test_assign_ips_in_bulk_idempotent(self):
+        nodes = self.env.create_nodes(
+            2, cluster_id=self.cluster.id, roles=['controller'])
+
+        self.net_manager.assign_ips_in_bulk(self.cluster, nodes)
+        assigned = set(
+            (ip.node, ip.network, ip.ip_addr)
+            for ip in self.db.query(IPAddr).filter(IPAddr.node.isnot(None)))
+
+        self.net_manager.assign_ips_in_bulk(self.cluster, nodes)
+        self.assertEqual(
+            assigned,
+            set((ip.node, ip.network, ip.ip_addr)
+                for ip in self.db.query(IPAddr).filter(
+                    IPAddr.node.isnot(None))))
+
+    def test_assign_ips_in_bulk_fails_for_node_from_other_cluster(self):
+        node = self.env.create_node()
+
+        self.assertRaises(
+            errors.NodeNotBelongToCluster,
+            self.net_manager.assign_ips_in_bulk, self.cluster, [node])
+
     def test_get_network_group_for_role(self):
         net_template = self.env.read_fixtures(['network_template_70'])[0]
         objects.Cluster.set_network_template(self.cluster, net_template)
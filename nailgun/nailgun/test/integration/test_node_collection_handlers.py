@@ -14,11 +14,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+import mock
 from oslo_serialization import jsonutils
 
 from nailgun.db.sqlalchemy.models import Node
 from nailgun.db.sqlalchemy.models import Notification
 from nailgun.test.base import BaseIntegrationTest
+from nailgun.utils.heartbeat import heartbeats
 from nailgun.utils import reverse
 
 
@@ -101,6 +104,33 @@ class TestHandlers(BaseIntegrationTest):
         self.assertEqual(200, resp.status_code)
         self.assertEqual(2, len(resp.json_body))
 
+    def test_node_get_network_data_calculated_for_all_nodes(self):
+        self.env.create(
+            cluster_kwargs={"api": True},
+            nodes_kwargs=[
+                {"cluster_id": None},
+                {"pending_addition": True},
+                {"pending_addition": True},
+            ]
+        )
+        self.env.network_manager.assign_admin_ips(self.env.nodes[1:])
+        self.env.network_manager.assign_ips(
+            self.env.clusters[0], self.env.nodes[1:], 'management')
+        expected = dict(
+            (n.id, n.network_data) for n in self.env.nodes)
+
+        with mock.patch.object(
+                self.env.network_manager, 'get_node_networks') as get_mock:
+            resp = self.app.get(
+                reverse('NodeCollectionHandler'),
+                headers=self.default_headers
+            )
+        self.assertEqual(200, resp.status_code)
+        self.assertFalse(get_mock.called)
+        self.assertEqual(3, len(resp.json_body))
+        for node in resp.json_body:
+            self.assertEqual(expected[node['id']], node['network_data'])
+
     def test_node_get_with_cluster_and_assigned_ip_addrs(self):
         self.env.create(
             cluster_kwargs={},
@@ -300,6 +330,74 @@ class TestHandlers(BaseIntegrationTest):
         self.assertEqual(resp.status_code, 200)
         self.assertTrue('cached' in response and response['cached'])
 
+    @mock.patch.object(heartbeats, 'flush_interval', 60 * 60)
+    def test_agent_caching_coalesces_timestamp_updates(self):
+        node = self.env.create_node(api=False, agent_checksum='test')
+        timestamp = node.timestamp
+
+        resp = self.app.put(
+            reverse('NodeAgentHandler'),
+            jsonutils.dumps({
+                'mac': node.mac,
+                'agent_checksum': 'test'
+            }),
+            headers=self.default_headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.json_body['cached'])
+
+        self.db.refresh(node)
+        self.assertEqual(timestamp, node.timestamp)
+        buffered_timestamp = heartbeats.get(node.id)
+        self.assertGreater(buffered_timestamp, timestamp)
+
+        heartbeats.flush()
+        self.db.refresh(node)
+        self.assertEqual(buffered_timestamp, node.timestamp)
+        self.assertIsNone(heartbeats.get(node.id))
+
+    @mock.patch.object(heartbeats, 'flush_interval', 60 * 60)
+    def test_heartbeats_flush_doesnt_move_timestamp_back(self):
+        node = self.env.create_node(api=False)
+        timestamp = node.timestamp
+
+        heartbeats.touch(node.id, timestamp - datetime.timedelta(minutes=1))
+        heartbeats.flush()
+
+        self.db.refresh(node)
+        self.assertEqual(timestamp, node.timestamp)
+
+    @mock.patch.object(heartbeats, 'flush_interval', 60 * 60)
+    def test_heartbeats_are_kept_if_flush_fails(self):
+        node = self.env.create_node(api=False)
+        heartbeats.touch(node.id)
+        buffered_timestamp = heartbeats.get(node.id)
+
+        with mock.patch('nailgun.utils.heartbeat.revisions.bulk_untracked',
+                        side_effect=Exception):
+            self.assertRaises(Exception, heartbeats.flush)
+
+        self.assertEqual(buffered_timestamp, heartbeats.get(node.id))
+        heartbeats.discard(node.id)
+
+    def test_agent_brings_node_online_without_buffering(self):
+        node = self.env.create_node(
+            api=False, agent_checksum='test', online=False)
+        timestamp = node.timestamp
+
+        resp = self.app.put(
+            reverse('NodeAgentHandler'),
+            jsonutils.dumps({
+                'mac': node.mac,
+                'agent_checksum': 'test'
+            }),
+            headers=self.default_headers)
+        self.assertEqual(resp.status_code, 200)
+
+        self.db.refresh(node)
+        self.assertTrue(node.online)
+        self.assertGreater(node.timestamp, timestamp)
+        self.assertIsNone(heartbeats.get(node.id))
+
     def test_agent_updates_node_by_interfaces(self):
         node = self.env.create_node(api=False)
         interface = node.meta['interfaces'][0]
@@ -390,9 +390,11 @@ class TestPrePostHooks(BasePluginTest):
     def setUp(self):
         super(TestPrePostHooks, self).setUp()
 
+        session = mock.Mock()
+        session.get.return_value = mock.Mock(
+            status_code=200, text='Archive: test')
         self._requests_mock = mock.patch(
-            'nailgun.utils.debian.requests.get',
-            return_value=mock.Mock(text='Archive: test'))
+            'nailgun.utils.http_pool.get_session', return_value=session)
         self._requests_mock.start()
 
         resp = self.create_plugin()
@@ -948,6 +948,39 @@ class TestConsumer(BaseReciverTestCase):
         # if there are error nodes
         self.assertEqual(task.status, "running")
 
+    def test_node_deploy_resp_progress(self):
+        self.env.create(
+            cluster_kwargs={},
+            nodes_kwargs=[
+                {"api": False, "status": consts.NODE_STATUSES.deploying},
+                {"api": False, "status": consts.NODE_STATUSES.deploying}]
+        )
+        node, node2 = self.env.nodes
+
+        task = Task(
+            uuid=str(uuid.uuid4()),
+            name="deploy",
+            cluster_id=self.env.clusters[0].id
+        )
+        self.db.add(task)
+        self.db.commit()
+
+        kwargs = {'task_uuid': task.uuid,
+                  'nodes': [{'uid': str(node.id), 'progress': 30},
+                            {'uid': node2.id, 'progress': 50,
+                             'status': consts.NODE_STATUSES.ready},
+                            {'uid': '0', 'progress': 10}]}
+        self.receiver.deploy_resp(**kwargs)
+
+        self.assertEqual(
+            (node.status, node.progress),
+            (consts.NODE_STATUSES.deploying, 30))
+        self.assertEqual(
+            (node2.status, node2.progress),
+            (consts.NODE_STATUSES.ready, 50))
+        self.assertEqual(task.progress, 40)
+        self.assertEqual(task.status, consts.TASK_STATUSES.running)
+
     def test_node_provision_resp(self):
         self.env.create(
             cluster_kwargs={},
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from nailgun import consts
+from nailgun import objects
+from nailgun.orchestrator.deployment_graph import AstuteGraph
+from nailgun.orchestrator.deployment_serializers import \
+    get_serializer_for_cluster
+from nailgun.orchestrator.serialization_context import SerializationContext
+from nailgun.test import base
+
+
+class TestSerializationContext(base.BaseIntegrationTest):
+
+    def setUp(self):
+        super(TestSerializationContext, self).setUp()
+        self.cluster = self.env.create(
+            release_kwargs={'version': '2015.1.0-8.0'},
+            cluster_kwargs={
+                'mode': consts.CLUSTER_MODES.ha_compact,
+                'net_provider': consts.CLUSTER_NET_PROVIDERS.neutron,
+                'net_segment_type': consts.NEUTRON_SEGMENT_TYPES.vlan},
+            nodes_kwargs=[
+                {'roles': ['controller'], 'pending_addition': True},
+                {'roles': ['compute', 'cinder'], 'pending_addition': True},
+                {'roles': ['compute'], 'pending_addition': True},
+            ])
+        self.cluster_db = self.env.clusters[0]
+        objects.Cluster.prepare_for_deployment(self.cluster_db)
+
+    def test_context_is_active_only_inside_block(self):
+        self.assertIsNot(SerializationContext.get(self.cluster_db),
+                         SerializationContext.get(self.cluster_db))
+        with SerializationContext(self.cluster_db) as context:
+            self.assertIs(context, SerializationContext.get(self.cluster_db))
+        self.assertIsNot(context, SerializationContext.get(self.cluster_db))
+
+    def test_context_of_other_cluster_is_not_used(self):
+        other_cluster = self.env.create_cluster(api=False)
+        with SerializationContext(self.cluster_db) as context:
+            self.assertIsNot(context, SerializationContext.get(other_cluster))
+
+    def test_cluster_data_calculated_once(self):
+        nm = objects.Cluster.get_network_manager(self.cluster_db)
+        serializer = get_serializer_for_cluster(self.cluster_db)(
+            AstuteGraph(self.cluster_db))
+
+        with mock.patch.object(
+                nm, 'get_node_networks',
+                side_effect=nm.get_node_networks) as get_networks_mock:
+            with mock.patch.object(
+                    objects.Cluster, 'get_roles',
+                    side_effect=objects.Cluster.get_roles) as get_roles_mock:
+                serialized = serializer.serialize(
+                    self.cluster_db, self.cluster_db.nodes)
+
+        self.assertEqual(len(serialized), 4)
+        self.assertEqual(get_networks_mock.call_count, 3)
+        self.assertEqual(get_roles_mock.call_count, 1)
@@ -132,6 +132,23 @@ class TestTaskManagers(BaseIntegrationTest):
                 self.assertEqual(action_log.additional_info["message"], "")
                 self.assertIn("output", action_log.additional_info)
 
+    @fake_tasks(fake_rpc=False, mock_rpc=True)
+    def test_check_before_deployment_timings_are_kept(self, _):
+        self.env.create(
+            nodes_kwargs=[
+                {"pending_addition": True},
+            ]
+        )
+
+        supertask = self.env.launch_deployment()
+
+        self.assertNotIn(TASK_NAMES.check_before_deployment,
+                         [t.name for t in supertask.subtasks])
+        timings = supertask.result['check_before_deployment_timings']
+        checks = task.CheckBeforeDeploymentTask.checks
+        self.assertEqual(list(checks), list(timings)[:len(checks)])
+        self.assertTrue(all(t >= 0 for t in timings.values()))
+
     def test_update_action_logs_after_empty_cluster_deletion(self):
         self.env.create_cluster()
         self.env.delete_environment()
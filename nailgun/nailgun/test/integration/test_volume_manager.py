@@ -100,3 +100,58 @@ class TestVolumeManagerGlancePartition(base.BaseIntegrationTest):
         self.assertEqual(len(image_volume['volumes']), 1)
         self.assertEqual(image_volume['volumes'][0]['mount'],
                          '/var/lib/glance')
+
+
+class TestVolumesLayoutsCache(base.BaseIntegrationTest):
+
+    def setUp(self):
+        super(TestVolumesLayoutsCache, self).setUp()
+        meta = self.env.default_metadata()
+        for disk in meta['disks']:
+            disk['disk'] = 'disk/by-path/{0}'.format(disk['name'])
+            disk['extra'] = ['disk/by-id/{0}'.format(disk['name'])]
+        self.env.create(
+            nodes_kwargs=[
+                {'roles': ['controller']},
+                {'roles': ['controller'], 'meta': meta},
+                {'roles': ['compute']},
+            ]
+        )
+        manager.layouts_cache.clear()
+
+    def test_layout_is_reused_for_same_profile(self):
+        node_a, node_b, _ = self.env.nodes
+        volumes_a = node_a.volume_manager.gen_volumes_info()
+        volumes_b = node_b.volume_manager.gen_volumes_info()
+        self.assertEqual(1, manager.layouts_cache.misses)
+        self.assertEqual(1, manager.layouts_cache.hits)
+
+        manager.layouts_cache.clear()
+        self.assertEqual(volumes_b, node_b.volume_manager.gen_volumes_info())
+        self.assertEqual(1, manager.layouts_cache.misses)
+
+        disks_b = manager.only_disks(volumes_b)
+        self.assertNotEqual(manager.only_disks(volumes_a), disks_b)
+        for disk in disks_b:
+            self.assertEqual('disk/by-path/{0}'.format(disk['name']),
+                             disk['id'])
+            self.assertEqual(['disk/by-id/{0}'.format(disk['name'])],
+                             disk['extra'])
+
+    def test_layout_depends_on_roles(self):
+        node_a, _, node_c = self.env.nodes
+        volumes_a = node_a.volume_manager.gen_volumes_info()
+        volumes_c = node_c.volume_manager.gen_volumes_info()
+        self.assertEqual(2, manager.layouts_cache.misses)
+        self.assertNotEqual(volumes_a, volumes_c)
+
+    def test_cached_layout_is_not_changed_by_manager(self):
+        node_a, node_b, _ = self.env.nodes
+        expected = node_a.volume_manager.gen_volumes_info()
+
+        volume_manager = node_a.volume_manager
+        volume_manager.gen_volumes_info()
+        disk = manager.only_disks(volume_manager.volumes)[0]
+        volume_manager.set_volume_size(disk['id'], 'os', 0)
+
+        self.assertEqual(expected, node_a.volume_manager.gen_volumes_info())
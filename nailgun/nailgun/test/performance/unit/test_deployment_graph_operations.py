@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from random import Random
+from timeit import Timer
+
+import mock
+import pytest
+
+from nailgun import consts
+from nailgun.orchestrator import deployment_graph
+from nailgun.test.base import BaseUnitTest
+
+
+@pytest.mark.performance
+class DeploymentGraphLoadTest(BaseUnitTest):
+    """Priorities calculation for graphs with many plugin groups."""
+
+    # Numbers of groups in synthetic graphs
+    GROUPS_NUMS = (100, 300, 500)
+    # Maximal number of groups which a group requires
+    MAX_REQUIRES = 3
+    # Maximal allowed execution time of priorities calculation
+    MAX_EXEC_TIME = 1
+
+    def generate_groups(self, groups_num):
+        random = Random(groups_num)
+        groups = []
+        for i in range(groups_num):
+            requires = random.sample(
+                range(i), min(i, random.randint(0, self.MAX_REQUIRES)))
+            strategy = random.choice((
+                {'type': consts.DEPLOY_STRATEGY.parallel},
+                {'type': consts.DEPLOY_STRATEGY.parallel, 'amount': 2},
+                {'type': consts.DEPLOY_STRATEGY.one_by_one}))
+            groups.append({
+                'id': 'plugin_role_{0}'.format(i),
+                'type': consts.ORCHESTRATOR_TASK_TYPES.group,
+                'role': ['plugin_role_{0}'.format(i)],
+                'requires': ['plugin_role_{0}'.format(r) for r in requires],
+                'parameters': {'strategy': strategy},
+            })
+        return groups
+
+    def test_add_priorities(self):
+        for groups_num in self.GROUPS_NUMS:
+            cluster = mock.Mock()
+            cluster.deployment_tasks = self.generate_groups(groups_num)
+            graph = deployment_graph.AstuteGraph(cluster)
+            # one node for every second role, other groups are skipped
+            nodes = [{'uid': str(i), 'role': 'plugin_role_{0}'.format(i)}
+                     for i in range(0, groups_num, 2)]
+
+            exec_time = Timer(
+                lambda: graph.add_priorities(nodes)).timeit(number=1)
+
+            self.assertLess(
+                exec_time, self.MAX_EXEC_TIME,
+                "Priorities of {0} groups are calculated in {1}s".format(
+                    groups_num, exec_time))
+            self.assertTrue(all('priority' in n for n in nodes))
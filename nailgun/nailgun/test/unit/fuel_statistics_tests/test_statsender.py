@@ -13,15 +13,19 @@
 #    under the License.
 
 import datetime
+import gzip
 import json
 from mock import Mock
 from mock import patch
+from oslo_serialization import jsonutils
 import requests
+import six
 import urllib3
 
 from nailgun.test.base import BaseTestCase
 
 from nailgun import consts
+from nailgun.objects import ActionLog
 from nailgun.objects import Cluster
 from nailgun.objects import MasterNodeSettings
 from nailgun.objects import OpenStackWorkloadStats
@@ -339,3 +343,82 @@ class TestStatisticsSender(BaseTestCase):
                      'master-node-uid': master_node_uid},
             data=json.dumps(data),
             timeout=settings.COLLECTOR_RESP_TIMEOUT)
+
+    def create_action_logs(self, count):
+        return [
+            ActionLog.create({
+                'action_group': 'test_group',
+                'action_name': 'test_action_{0}'.format(i),
+                'action_type': consts.ACTION_TYPES.http_request,
+                'start_timestamp': datetime.datetime.utcnow(),
+                'additional_info': {'number': i},
+                'is_sent': False
+            })
+            for i in range(count)
+        ]
+
+    @patch('nailgun.statistics.statsenderd.settings.STATS_SEND_COUNT', 2)
+    @patch('nailgun.statistics.statsenderd.requests.post')
+    def test_send_action_log_in_chunks(self, requests_post):
+        action_logs = self.create_action_logs(5)
+
+        def post(url, headers, data, timeout):
+            records = json.loads(data)['action_logs']
+            resp = Mock(status_code=200)
+            resp.json.return_value = {
+                'status': consts.LOG_CHUNK_SEND_STATUS.ok,
+                'action_logs': [
+                    {'external_id': r['external_id'],
+                     'status': consts.LOG_RECORD_SEND_STATUS.added}
+                    for r in records]
+            }
+            return resp
+
+        requests_post.side_effect = post
+        StatsSender().send_action_log()
+
+        self.assertEqual(3, requests_post.call_count)
+        sent_ids = []
+        for call in requests_post.call_args_list:
+            records = json.loads(call[1]['data'])['action_logs']
+            sent_ids.extend(r['external_id'] for r in records)
+        self.assertEqual([al.id for al in action_logs], sent_ids)
+
+        for al in action_logs:
+            self.db.refresh(al)
+            self.assertTrue(al.is_sent)
+
+    @patch('nailgun.statistics.statsenderd.requests.post')
+    def test_send_action_log_failed_request(self, requests_post):
+        action_logs = self.create_action_logs(2)
+        requests_post.side_effect = requests.exceptions.ConnectionError()
+
+        StatsSender().send_action_log()
+
+        self.assertEqual(1, requests_post.call_count)
+        for al in action_logs:
+            self.db.refresh(al)
+            self.assertFalse(al.is_sent)
+
+    def test_build_action_log_body(self):
+        action_logs = self.create_action_logs(2)
+        sender = StatsSender()
+        rows = sender.get_action_log_chunk(0)
+        expected = {'action_logs': [
+            {'external_id': al.id,
+             'master_node_uid': 'xxx',
+             'body': ActionLog.to_dict(al)}
+            for al in action_logs]}
+
+        body, headers = sender.build_action_log_body(rows, 'xxx')
+        self.assertEqual({}, headers)
+        self.assertEqual(json.loads(jsonutils.dumps(expected)),
+                         json.loads(body))
+
+        with patch('nailgun.statistics.statsenderd.settings.'
+                   'STATS_COMPRESS_ACTION_LOGS', True):
+            body, headers = sender.build_action_log_body(rows, 'xxx')
+        self.assertEqual({'content-encoding': 'gzip'}, headers)
+        body = gzip.GzipFile(fileobj=six.BytesIO(body)).read()
+        self.assertEqual(json.loads(jsonutils.dumps(expected)),
+                         json.loads(body))
@@ -24,6 +24,7 @@ from nailgun.task.task import CheckRepoAvailability
 from nailgun.task.task import CheckRepoAvailabilityWithSetup
 from nailgun.task.task import CheckRepositoryConnectionFromMasterNodeTask
 from nailgun.test.base import BaseTestCase
+from nailgun.utils import http_pool
 
 
 @mock.patch('time.sleep')   # don't sleep on tests
@@ -47,25 +48,34 @@ class CheckRepositoryConnectionFromMasterNodeTaskTest(BaseTestCase):
         self.env.db.flush()
 
         self.url = 'url1'
-        self.mocked_repositories = [
-            {'type': 'deb', 'uri': self.url, 'suite': 'suite'}]
 
         self.patcher = mock.patch(
             'nailgun.task.task.objects.Cluster.get_repo_urls',
-            new=mock.Mock(return_value=self.mocked_repositories))
+            new=mock.Mock(return_value=(self.url,)))
         self.mrepos = self.patcher.start()
 
+        # responses are cached for the whole process
+        http_pool.responses_cache.clear()
+        self.session = mock.Mock()
+        self.session_patcher = mock.patch.object(
+            http_pool, 'get_session', return_value=self.session)
+        self.session_patcher.start()
+
     def tearDown(self):
+        self.session_patcher.stop()
         self.patcher.stop()
+        http_pool.responses_cache.clear()
         super(CheckRepositoryConnectionFromMasterNodeTaskTest, self).tearDown()
 
-    @mock.patch('requests.get', return_value=_response_ok)
-    def test_execute_success(self, _, __):
+    def test_execute_success(self, _):
+        self.session.get.return_value = self._response_ok
         CheckRepositoryConnectionFromMasterNodeTask.execute(self.task)
         self.mrepos.assert_called_with(self.task.cluster)
+        self.session.get.assert_called_once_with(
+            self.url, timeout=mock.ANY)
 
-    @mock.patch('requests.get', return_value=_response_error)
-    def test_execute_fail(self, _, __):
+    def test_execute_fail(self, _):
+        self.session.get.return_value = self._response_error
         with self.assertRaises(errors.CheckBeforeDeploymentError) as cm:
             CheckRepositoryConnectionFromMasterNodeTask.execute(self.task)
 
@@ -74,10 +84,12 @@ class CheckRepositoryConnectionFromMasterNodeTaskTest(BaseTestCase):
             'Connection to following repositories could not be established: '
             '<url1 [500]>')
 
-    @mock.patch('requests.get', side_effect=[_response_error, _response_ok])
-    def test_execute_success_on_retry(self, _, __):
+    def test_execute_success_on_retry(self, _):
+        self.session.get.side_effect = [
+            self._response_error, self._response_ok]
         CheckRepositoryConnectionFromMasterNodeTask.execute(self.task)
         self.mrepos.assert_called_with(self.task.cluster)
+        self.assertEqual(2, self.session.get.call_count)
 
 
 class TestRepoAvailability(BaseTestCase):
@@ -16,11 +16,15 @@
 import copy
 from random import randint
 
+import six
+from sqlalchemy import inspect as sqlalchemy_inspect
+
 from nailgun.db.sqlalchemy.models import Cluster
 from nailgun.db.sqlalchemy.models import NodeBondInterface
 from nailgun.db.sqlalchemy.models import NodeNICInterface
 from nailgun.db.sqlalchemy.models import Release
 
+from nailgun.db.sqlalchemy.models.fields import JSON
 from nailgun.db.sqlalchemy.models.mutable import MutableList
 
 from nailgun.test.base import BaseTestCase
@@ -65,6 +69,37 @@ class TestDbModels(BaseTestCase):
         self.db.add(cluster)
         self.db.commit()
 
+    def test_release_deployment_tasks_loaded_on_access(self):
+        release_id = self.env.create_release(
+            api=False, deployment_tasks=[{'id': 'task'}]).id
+        self.db.expunge_all()
+
+        release = self.db.query(Release).get(release_id)
+        self.assertIn(
+            'deployment_tasks', sqlalchemy_inspect(release).unloaded)
+        self.assertEqual([{'id': 'task'}], release.deployment_tasks)
+
+
+class TestJSONField(BaseTestCase):
+
+    def test_json_round_trip(self):
+        field = JSON()
+        value = {'a': [1, 2.5, None, True], u'ю': {'b': u'ю'}}
+        encoded = field.process_bind_param(value, None)
+        self.assertEqual(value, field.process_result_value(encoded, None))
+        self.assertEqual(
+            value,
+            field.process_result_value(encoded.encode('utf-8'), None))
+
+    def test_json_strings_are_unicode(self):
+        decoded = JSON().process_result_value(b'{"a": ["b"]}', None)
+        for string in (list(decoded)[0], decoded['a'][0]):
+            self.assertIsInstance(string, six.text_type)
+
+    def test_json_none(self):
+        self.assertIsNone(JSON().process_bind_param(None, None))
+        self.assertIsNone(JSON().process_result_value(None, None))
+
 
 class TestNodeInterfacesDbModels(BaseTestCase):
     sample_nic_interface_data = {
@@ -17,8 +17,10 @@
 import inspect
 
 from nailgun.errors import errors
+from nailgun.expression import CompiledExpressionsCache
 from nailgun.expression import Expression
 from nailgun.test.base import BaseTestCase
+from nailgun.test.base import BaseUnitTest
 
 
 class TestExpressionParser(BaseTestCase):
@@ -102,3 +104,54 @@ class TestExpressionParser(BaseTestCase):
             else:
                 self.assertEqual(evaluate_expression(expression, models,
                                                      strict), result)
+
+
+class TestCompiledExpressionsCache(BaseUnitTest):
+
+    def test_compiled_expression_is_shared_between_models(self):
+        expression_text = 'cluster:mode == "ha_compact"'
+        expression_a = Expression(
+            expression_text, {'cluster': {'mode': 'ha_compact'}})
+        expression_b = Expression(
+            expression_text, {'cluster': {'mode': 'multinode'}})
+
+        self.assertIs(expression_a.compiled_expression,
+                      expression_b.compiled_expression)
+        self.assertTrue(expression_a.evaluate())
+        self.assertFalse(expression_b.evaluate())
+
+    def test_hits_and_misses(self):
+        cache = CompiledExpressionsCache(max_size=10)
+
+        compiled = cache.get('true and false')
+        self.assertIs(compiled, cache.get('true and false'))
+        cache.get('true or false')
+
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(2, cache.misses)
+        self.assertEqual(2, len(cache))
+
+        cache.clear()
+        self.assertEqual(0, cache.hits)
+        self.assertEqual(0, cache.misses)
+        self.assertEqual(0, len(cache))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = CompiledExpressionsCache(max_size=2)
+
+        cache.get('1 == 1')
+        cache.get('2 == 2')
+        cache.get('1 == 1')
+        cache.get('3 == 3')
+
+        self.assertEqual(2, len(cache))
+        cache.get('1 == 1')
+        self.assertEqual(2, cache.hits)
+        cache.get('2 == 2')
+        self.assertEqual(4, cache.misses)
+
+    def test_parse_errors_are_not_cached(self):
+        cache = CompiledExpressionsCache(max_size=2)
+
+        self.assertRaises(errors.ParseError, cache.get, '(true')
+        self.assertEqual(0, len(cache))
@@ -16,13 +16,16 @@
 
 from collections import defaultdict
 from itertools import groupby
+from random import Random
 
 import mock
+import networkx as nx
 import yaml
 
 from nailgun.errors import errors
 from nailgun.orchestrator import deployment_graph
 from nailgun.orchestrator import graph_configuration
+from nailgun.plugins.manager import PluginManager
 from nailgun.test import base
 
 
@@ -662,6 +665,146 @@ class TestOrdered(base.BaseTestCase):
             ['a', 'b', 'c', 'd', 'e', 'f'])
 
 
+class TestGroupsLevels(base.BaseTestCase):
+
+    TASKS = """
+    - id: a
+    - id: b
+      requires: [a]
+    - id: c
+      requires: [b]
+    - id: d
+      requires: [a]
+    - id: e
+      requires: [c, d]
+    - id: f
+    """
+
+    def setUp(self):
+        super(TestGroupsLevels, self).setUp()
+        self.graph = deployment_graph.DeploymentGraph(
+            tasks=yaml.load(self.TASKS))
+
+    def get_levels_one_by_one(self, graph, processed):
+        def get_next_groups():
+            return [
+                node for node in graph.nodes() if node not in processed and
+                set(nx.dfs_predecessors(graph.reverse(), node)) <= processed]
+
+        processed = set(processed)
+        levels = []
+        current = get_next_groups()
+        while current:
+            levels.append(current)
+            processed.update(current)
+            current = get_next_groups()
+        return levels
+
+    def test_levels(self):
+        self.assertEqual(
+            [sorted(level) for level in self.graph.get_levels(set())],
+            [['a', 'f'], ['b', 'd'], ['c'], ['e']])
+
+    def test_processed_nodes_keep_dependencies_of_successors(self):
+        self.assertEqual(
+            [sorted(level) for level in self.graph.get_levels(set('bf'))],
+            [['a'], ['c', 'd'], ['e']])
+
+    def test_next_groups_is_first_level(self):
+        self.assertEqual(
+            sorted(self.graph.get_next_groups(set('af'))), ['b', 'd'])
+        self.assertEqual(self.graph.get_next_groups(set('abcdef')), [])
+
+    def test_nodes_of_cycle_are_skipped(self):
+        self.graph.add_edge('e', 'b')
+        self.assertEqual(
+            [sorted(level) for level in self.graph.get_levels(set())],
+            [['a', 'f'], ['d']])
+
+    def test_levels_of_random_graph(self):
+        random = Random(42)
+        tasks = []
+        for i in range(200):
+            requires = random.sample(range(i), min(i, random.randint(0, 3)))
+            tasks.append({'id': 'group_{0}'.format(i),
+                          'requires': ['group_{0}'.format(r)
+                                       for r in requires]})
+        graph = deployment_graph.DeploymentGraph(tasks=tasks)
+        processed = set(t['id'] for t in random.sample(tasks, 50))
+
+        levels = graph.get_levels(processed)
+        self.assertEqual(levels, self.get_levels_one_by_one(graph, processed))
+        self.assertEqual(
+            set(n for level in levels for n in level) | processed,
+            set(graph.nodes()))
+
+
+class TestDeploymentGraphsCache(base.BaseTestCase):
+
+    TASKS = """
+    - id: a
+      type: puppet
+    - id: b
+      type: puppet
+      requires: [a]
+    - id: f
+      type: shell
+      requires: [b]
+    """
+
+    def setUp(self):
+        super(TestDeploymentGraphsCache, self).setUp()
+        self.tasks = yaml.load(self.TASKS)
+        self.cache = deployment_graph.DeploymentGraphsCache(2)
+
+    def test_graph_is_reused_for_same_tasks(self):
+        graph = self.cache.get(self.tasks)
+        self.assertIs(graph, self.cache.get(yaml.load(self.TASKS)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_graph_is_built_for_changed_tasks(self):
+        graph = self.cache.get(self.tasks)
+        self.tasks.append({'id': 'g', 'requires': ['f']})
+        changed_graph = self.cache.get(self.tasks)
+
+        self.assertIsNot(graph, changed_graph)
+        self.assertNotIn('g', graph)
+        self.assertIn('g', changed_graph)
+
+    def test_least_recently_used_graph_is_evicted(self):
+        other_tasks = [{'id': 'x'}]
+        graph = self.cache.get(self.tasks)
+        self.cache.get(other_tasks)
+        self.cache.get(self.tasks)
+        self.cache.get([{'id': 'y'}])
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIs(graph, self.cache.get(self.tasks))
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_astute_graph_does_not_change_cached_graph(self):
+        cluster = mock.Mock()
+        cluster.deployment_tasks = self.tasks
+        with mock.patch.object(deployment_graph, 'graphs_cache', self.cache):
+            astute = deployment_graph.AstuteGraph(cluster)
+            astute.only_tasks(['a'])
+            astute.graph.node['b']['parameters'] = {'cmd': 'changed'}
+
+            cached = self.cache.get(self.tasks)
+
+        self.assertIsNot(cached, astute.graph)
+        self.assertTrue(astute.graph.node['b']['skipped'])
+        self.assertNotIn('skipped', cached.node['b'])
+        self.assertNotIn('parameters', cached.node['b'])
+
+    @mock.patch('nailgun.plugins.manager.PluginCollection.all',
+                return_value=[])
+    def test_cache_is_cleared_on_plugins_sync(self, _):
+        deployment_graph.graphs_cache.get(self.tasks)
+        PluginManager.sync_plugins_metadata()
+        self.assertEqual(len(deployment_graph.graphs_cache), 0)
+
+
 class TestIncludeSkipped(base.BaseTestCase):
 
     TASKS = """
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+
+import mock
+import requests
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from nailgun.test import base
+from nailgun.utils import http_pool
+
+
+class RepoRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    requested = []
+
+    def do_GET(self):
+        self.requested.append(self.path)
+        if self.path.startswith('/slow'):
+            time.sleep(0.5)
+        status = 404 if self.path.startswith('/missing') else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class RepoServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    daemon_threads = True
+
+
+class TestHttpPool(base.BaseUnitTest):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestHttpPool, cls).setUpClass()
+        cls.server = RepoServer(('127.0.0.1', 0), RepoRequestHandler)
+        cls.url = 'http://127.0.0.1:{0}'.format(cls.server.server_port)
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super(TestHttpPool, cls).tearDownClass()
+
+    def setUp(self):
+        super(TestHttpPool, self).setUp()
+        http_pool.responses_cache.clear()
+        del RepoRequestHandler.requested[:]
+
+    def test_responses_are_returned_in_order(self):
+        urls = [self.url + '/ok', self.url + '/missing', self.url + '/ok']
+        responses = http_pool.http_get_many(urls, retries=1)
+
+        self.assertEqual([200, 404, 200], [r.status_code for r in responses])
+        self.assertEqual(urls, [r.url for r in responses])
+        # the same URL is requested once
+        self.assertEqual(['/ok', '/missing'], RepoRequestHandler.requested)
+
+    def test_requests_are_concurrent(self):
+        urls = [self.url + '/slow/{0}'.format(i) for i in range(4)]
+        started_at = time.time()
+        responses = http_pool.http_get_many(urls, retries=1)
+
+        self.assertLess(time.time() - started_at, 1.5)
+        self.assertEqual([200] * 4, [r.status_code for r in responses])
+
+    def test_deadline(self):
+        started_at = time.time()
+        responses = http_pool.http_get_many(
+            [self.url + '/ok', self.url + '/slow'], retries=1, deadline=0.2)
+
+        self.assertLess(time.time() - started_at, 0.5)
+        self.assertEqual(200, responses[0].status_code)
+        self.assertEqual(requests.codes.request_timeout,
+                         responses[1].status_code)
+        self.assertEqual(self.url + '/slow', responses[1].url)
+
+    def test_successful_responses_are_cached(self):
+        urls = [self.url + '/ok', self.url + '/missing']
+        http_pool.http_get_many(urls, retries=1)
+        http_pool.http_get_many(urls, retries=1)
+
+        self.assertEqual(['/ok', '/missing', '/missing'],
+                         RepoRequestHandler.requested)
+
+        http_pool.http_get_many(urls, retries=1, use_cache=False)
+        self.assertEqual(5, len(RepoRequestHandler.requested))
+
+    @mock.patch('nailgun.utils.http_pool.time.time')
+    def test_cached_responses_expire(self, m_time):
+        cache = http_pool.ResponsesCache(ttl=10)
+        m_time.return_value = 100
+        cache.put('url', 'response')
+
+        m_time.return_value = 110
+        self.assertEqual('response', cache.get('url'))
+        m_time.return_value = 111
+        self.assertIsNone(cache.get('url'))
+        self.assertEqual(0, len(cache))
+
+    def test_map_concurrently_returns_exceptions(self):
+        error = ValueError('error')
+
+        def func(item):
+            if item == 2:
+                raise error
+            return item * 10
+
+        self.assertEqual(
+            [10, error, 30], http_pool.map_concurrently(func, [1, 2, 3]))
+
+    def test_connection_error_gives_failed_response(self):
+        url = 'http://127.0.0.1:1/'
+        responses = http_pool.http_get_many(
+            [url, self.url + '/ok'], retries=1)
+
+        self.assertEqual(url, responses[0].url)
+        self.assertEqual(requests.codes.service_unavailable,
+                         responses[0].status_code)
+        self.assertEqual(200, responses[1].status_code)
+
+    @mock.patch.object(http_pool.settings, 'REPO_CHECK_REQUEST_TIMEOUT', 0.1)
+    def test_request_timeout_gives_timed_out_response(self):
+        responses = http_pool.http_get_many(
+            [self.url + '/slow', self.url + '/ok'], retries=1)
+
+        self.assertEqual(requests.codes.request_timeout,
+                         responses[0].status_code)
+        self.assertEqual(200, responses[1].status_code)
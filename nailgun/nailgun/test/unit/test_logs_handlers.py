@@ -33,6 +33,7 @@ from nailgun.task.task import DumpTask
 from nailgun.test.base import BaseAuthenticationIntegrationTest
 from nailgun.test.base import BaseIntegrationTest
 from nailgun.test.base import fake_tasks
+from nailgun.utils.log_index import LogIndex
 from nailgun.utils import reverse
 
 
@@ -100,9 +101,14 @@ class TestLogs(BaseIntegrationTest):
             ]
         )
         self.patcher.start()
+        self.index_dir = os.path.join(self.log_dir, 'index')
+        self.index_patcher = mock.patch.object(
+            settings, 'LOGS_INDEX_DIR', self.index_dir)
+        self.index_patcher.start()
 
     def tearDown(self):
         shutil.rmtree(self.log_dir)
+        self.index_patcher.stop()
         self.patcher.stop()
         super(TestLogs, self).tearDown()
 
@@ -295,6 +301,151 @@ class TestLogs(BaseIntegrationTest):
         self.assertEqual(response['to'], total_len)
         self.assertEqual(response['from'], 0)
 
+    def _get_log_entries(self, **params):
+        params.setdefault('source', settings.LOGS[0]['id'])
+        resp = self.app.get(
+            reverse('LogEntryCollectionHandler'),
+            params=params,
+            headers=self.default_headers
+        )
+        self.assertEqual(200, resp.status_code)
+        return resp.json_body
+
+    def test_log_entries_read_without_index(self):
+        log_entries = [
+            [time.strftime(settings.UI_LOG_DATE_FORMAT), 'INFO', 'text1'],
+            [time.strftime(settings.UI_LOG_DATE_FORMAT), 'ERROR', 'text2'],
+        ]
+        self._create_logfile_for_node(settings.LOGS[0], log_entries)
+
+        with mock.patch.object(settings, 'LOGS_INDEX_DIR', None):
+            response = self._get_log_entries()
+
+        self.assertEqual(list(reversed(log_entries)), response['entries'])
+        self.assertFalse(os.path.exists(self.index_dir))
+
+    def test_log_entries_filtered_by_level_with_index(self):
+        settings.LOGS[0]['levels'] = ['DEBUG', 'INFO', 'ERROR']
+        date = time.strftime(settings.UI_LOG_DATE_FORMAT)
+        log_entries = [
+            [date, 'DEBUG', 'text1'],
+            [date, 'INFO', 'text2'],
+            [date, 'DEBUG', 'text3'],
+            [date, 'ERROR', 'text4'],
+            [date, 'DEBUG', 'text5'],
+        ]
+        self._create_logfile_for_node(settings.LOGS[0], log_entries)
+
+        response = self._get_log_entries(level='INFO', max_entries=1)
+        self.assertEqual([log_entries[3]], response['entries'])
+        self.assertTrue(response['has_more'])
+
+        response = self._get_log_entries(
+            level='INFO', max_entries=1, fetch_older=True,
+            **{'from': response['from'], 'to': response['to']})
+        self.assertEqual([log_entries[1]], response['entries'])
+        self.assertTrue(response['has_more'])
+
+        response = self._get_log_entries(
+            level='INFO', max_entries=1, fetch_older=True,
+            **{'from': response['from'], 'to': response['to']})
+        self.assertEqual([], response['entries'])
+        self.assertFalse(response['has_more'])
+        self.assertEqual(0, response['from'])
+
+    def test_log_entries_filtered_by_date_with_index(self):
+        log_entries = [
+            ['2015-01-01 10:00:00', 'INFO', 'text1'],
+            ['2015-01-01 11:00:00', 'INFO', 'text2'],
+            ['2015-01-01 12:00:00', 'INFO', 'text3'],
+        ]
+        self._create_logfile_for_node(settings.LOGS[0], log_entries)
+
+        response = self._get_log_entries(
+            date_after='2015-01-01 10:30:00',
+            date_before='2015-01-01 11:30:00')
+        self.assertEqual([log_entries[1]], response['entries'])
+
+    def test_log_entries_filtered_by_date_without_index(self):
+        log_entries = [
+            ['2015-01-01 10:00:00', 'INFO', 'text1'],
+            ['2015-01-01 11:00:00', 'INFO', 'text2'],
+            ['2015-01-01 12:00:00', 'INFO', 'text3'],
+        ]
+        self._create_logfile_for_node(settings.LOGS[0], log_entries)
+
+        with mock.patch.object(settings, 'LOGS_INDEX_DIR', None):
+            response = self._get_log_entries(
+                date_after='2015-01-01 10:30:00',
+                date_before='2015-01-01 11:30:00')
+        self.assertEqual([log_entries[1]], response['entries'])
+
+    def test_log_index_rebuilt_after_copytruncate(self):
+        date = time.strftime(settings.UI_LOG_DATE_FORMAT)
+        self._create_logfile_for_node(
+            settings.LOGS[0], [[date, 'INFO', 'text1']])
+        self._get_log_entries()
+
+        # the file is truncated in place and grows past indexed size
+        log_entries = [[date, 'INFO', 'new text {0}'.format(i)]
+                       for i in range(3)]
+        self._create_logfile_for_node(settings.LOGS[0], log_entries)
+
+        response = self._get_log_entries()
+        self.assertEqual(list(reversed(log_entries)), response['entries'])
+
+    def test_stale_log_index_is_not_used(self):
+        date = time.strftime(settings.UI_LOG_DATE_FORMAT)
+        self._create_logfile_for_node(
+            settings.LOGS[0], [[date, 'INFO', 'text1']])
+        self._get_log_entries()
+
+        log_entries = [[date, 'INFO', 'text2'], [date, 'INFO', 'text3']]
+        with open(settings.LOGS[0]['path'], 'w') as f:
+            f.write('garbage\n')
+            for log_entry in log_entries:
+                f.write(self._format_log_entry(log_entry))
+
+        with mock.patch.object(LogIndex, '_update'):
+            response = self._get_log_entries()
+        self.assertEqual(list(reversed(log_entries)), response['entries'])
+
+    def test_log_index_updated_incrementally(self):
+        settings.LOGS[0]['multiline'] = True
+        date = time.strftime(settings.UI_LOG_DATE_FORMAT)
+        log_entries = [
+            [date, 'LEVEL111', 'text1'],
+            [date, 'LEVEL222', 'text2'],
+        ]
+        self._create_logfile_for_node(settings.LOGS[0], log_entries)
+
+        response = self._get_log_entries()
+        self.assertEqual(list(reversed(log_entries)), response['entries'])
+        index_files = os.listdir(self.index_dir)
+        self.assertEqual(1, len(index_files))
+
+        # continuation of the last entry and a new entry
+        with open(settings.LOGS[0]['path'], 'a') as f:
+            f.write('multi\nline\n')
+            f.write(self._format_log_entry([date, 'LEVEL333', 'text3']))
+
+        response = self._get_log_entries(**{'to': response['to']})
+        self.assertEqual([[date, 'LEVEL333', 'text3']], response['entries'])
+
+        response = self._get_log_entries()
+        self.assertEqual(
+            [
+                [date, 'LEVEL333', 'text3'],
+                [date, 'LEVEL222', 'text2\nmulti\nline'],
+                [date, 'LEVEL111', 'text1'],
+            ],
+            response['entries'])
+
+        # truncated log file causes rebuilding of index
+        self._create_logfile_for_node(settings.LOGS[0], log_entries[:1])
+        response = self._get_log_entries()
+        self.assertEqual(log_entries[:1], response['entries'])
+
     def test_backward_reader(self):
         f = tempfile.TemporaryFile(mode='r+')
         forward_lines = []
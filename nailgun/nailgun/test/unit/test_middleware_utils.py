@@ -105,3 +105,31 @@ class TestUtils(TestCase):
 
         for kw in test_cases:
             check_group_getter(**kw)
+
+    def test_combined_matcher(self):
+        compiled_mapping = utils.compile_mapping_keys({
+            r".*/nodes/(?P<obj_id>\d+)/?$": "NodeHandler",
+            r".*/nodes/?$": "NodeCollectionHandler",
+            r".*/clusters/(?P<cluster_id>\d+)/(changes|deploy)/?$":
+                "ClusterChangesHandler",
+            r".*/clusters/?$": "ClusterCollectionHandler",
+        })
+        matcher = utils.CombinedMatcher(six.iterkeys(compiled_mapping))
+
+        test_cases = [
+            ("/api/nodes/1", "NodeHandler"),
+            ("/api/nodes/", "NodeCollectionHandler"),
+            ("/api/clusters/1/deploy", "ClusterChangesHandler"),
+            ("/api/clusters", "ClusterCollectionHandler"),
+        ]
+        for url, expected_handler in test_cases:
+            url_matcher = matcher.match(url)
+            self.assertEqual(expected_handler, compiled_mapping[url_matcher])
+
+        self.assertIsNone(matcher.match("/api/settings"))
+        self.assertEqual(
+            "1",
+            utils.get_group_from_matcher(
+                matcher.match("/api/clusters/1/changes"),
+                "/api/clusters/1/changes",
+                "cluster_id"))
@@ -25,6 +25,7 @@ from sqlalchemy.exc import IntegrityError
 from nailgun import consts
 from nailgun.db import db
 from nailgun.db import dropdb
+from nailgun.db import task_payloads
 from nailgun.db.migration import ALEMBIC_CONFIG
 from nailgun.test import base
 
@@ -35,6 +36,15 @@ _test_revision = '43b2cb64dae6'
 
 master_node_settings_before_migration = None
 
+# the second node is big enough to be stored as a separate chunk
+task_cache = {
+    'nodes': [
+        {'uid': '1', 'roles': ['controller']},
+        {'uid': '2', 'roles': ['compute'], 'data': 'x' * 2048},
+    ],
+    'cluster': {'id': 1},
+}
+
 
 def setup_module():
     dropdb()
@@ -205,6 +215,18 @@ def prepare():
             'generated': jsonutils.dumps({}),
         }])
 
+    insert_table_row(
+        meta.tables['tasks'],
+        {
+            'cluster_id': clusterid,
+            'uuid': 'fake_task_uuid_with_cache',
+            'name': consts.TASK_NAMES.deployment,
+            'status': consts.TASK_STATUSES.ready,
+            'progress': 100,
+            'weight': 1,
+            'cache': jsonutils.dumps(task_cache),
+        })
+
     db.commit()
 
 
@@ -273,7 +295,6 @@ class TestTaskStatus(base.BaseAlembicMigrationTest):
                     'message': None,
                     'status': consts.TASK_STATUSES.pending,
                     'progress': 0,
-                    'cache': None,
                     'result': None,
                     'parent_id': None,
                     'weight': 1
@@ -563,6 +584,34 @@ class TestOpenstackConfigMigration(base.BaseAlembicMigrationTest):
         self.assertEqual(config[0], cluster_id)
 
 
+class TestTaskPayloadsMigration(base.BaseAlembicMigrationTest):
+
+    def test_task_cache_is_moved_to_payloads(self):
+        tasks_table = self.meta.tables['tasks']
+        self.assertIn('cache_checksum', tasks_table.c)
+        self.assertNotIn('cache', tasks_table.c)
+        self.assertIn('task_payloads', self.meta.tables)
+
+    def test_task_cache_is_loaded_from_payloads(self):
+        tasks_table = self.meta.tables['tasks']
+        payloads_table = self.meta.tables['task_payloads']
+        checksum = db.execute(
+            sa.select([tasks_table.c.cache_checksum]).where(
+                tasks_table.c.uuid == 'fake_task_uuid_with_cache')).scalar()
+        self.assertIsNotNone(checksum)
+
+        refs = db.execute(
+            sa.select([payloads_table.c.refs]).where(
+                payloads_table.c.checksum == checksum)).scalar()
+        self.assertEqual(1, len(refs))
+        self.assertEqual(1 + len(refs), db.execute(
+            sa.select([sa.func.count()]).where(
+                payloads_table.c.checksum.in_([checksum] + refs))).scalar())
+
+        self.assertEqual(
+            task_cache, task_payloads.load(db.connection(), checksum))
+
+
 class TestPluginLinks(base.BaseAlembicMigrationTest):
     def test_plugin_links_creation(self):
         plugins = self.meta.tables['plugins']
@@ -42,3 +42,40 @@ class TestNetworkUtils(BaseUnitTest):
     def test_compare_macs_raise_exception(self):
         with self.assertRaises(ValueError):
             utils.is_same_mac('QWERTY', 'ASDF')
+
+    def test_get_free_ip_intervals(self):
+        ranges = [
+            netaddr.IPRange('10.0.0.10', '10.0.0.20'),
+            netaddr.IPRange('10.0.0.2', '10.0.0.5'),
+            netaddr.IPRange('10.0.0.4', '10.0.0.6'),
+        ]
+        ips_in_use = ['10.0.0.1', '10.0.0.2', '10.0.0.5', '10.0.0.15',
+                      netaddr.IPAddress('10.0.0.20'), '10.0.0.30']
+
+        intervals = utils.get_free_ip_intervals(ranges, ips_in_use)
+
+        self.assertEqual(
+            ['10.0.0.3', '10.0.0.4', '10.0.0.6',
+             '10.0.0.10', '10.0.0.11', '10.0.0.12', '10.0.0.13',
+             '10.0.0.14', '10.0.0.16', '10.0.0.17', '10.0.0.18',
+             '10.0.0.19'],
+            list(utils.iter_ips_from_intervals(intervals)))
+
+    def test_get_free_ip_intervals_when_range_is_full(self):
+        ranges = [netaddr.IPRange('10.0.0.1', '10.0.0.3')]
+        ips_in_use = ['10.0.0.1', '10.0.0.2', '10.0.0.3']
+
+        self.assertEqual(
+            [], utils.get_free_ip_intervals(ranges, ips_in_use))
+
+    def test_get_free_ip_intervals_does_not_iterate_over_range(self):
+        ranges = [netaddr.IPRange('10.0.0.0', '10.255.255.255')]
+
+        intervals = utils.get_free_ip_intervals(ranges, ['10.1.0.0'])
+
+        self.assertEqual(
+            [(int(netaddr.IPAddress('10.0.0.0')),
+              int(netaddr.IPAddress('10.0.255.255'))),
+             (int(netaddr.IPAddress('10.1.0.1')),
+              int(netaddr.IPAddress('10.255.255.255')))],
+            intervals)
@@ -21,6 +21,8 @@ from oslo_serialization import jsonutils
 from nailgun.db.sqlalchemy.models import NodeBondInterface
 
 from nailgun import consts
+from nailgun.extensions.volume_manager.extension \
+    import VolumeManagerExtension
 from nailgun.test.base import BaseIntegrationTest
 from nailgun.utils import reverse
 
@@ -66,6 +68,43 @@ class TestAssignmentHandlers(BaseIntegrationTest):
         resp = self._assign_roles(assignment_data, True)
         self.assertEqual(400, resp.status_code)
 
+    def test_bulk_assignment(self):
+        self.env.create(
+            cluster_kwargs={"api": True},
+            nodes_kwargs=[
+                {"cluster_id": None, "api": True},
+                {"cluster_id": None, "api": True},
+                {"cluster_id": None, "api": True},
+            ]
+        )
+        self.cluster = self.env.clusters[0]
+        assignment_data = [
+            {"id": self.env.nodes[0].id, "roles": ['controller']},
+            {"id": self.env.nodes[1].id, "roles": ['compute']},
+            {"id": self.env.nodes[2].id, "roles": ['compute']},
+        ]
+        resp = self._assign_roles(assignment_data)
+        self.assertEqual(200, resp.status_code)
+
+        changes = set((c.name, c.node_id)
+                      for c in self.cluster.changes_list if c.node_id)
+        for node, data in zip(self.env.nodes, assignment_data):
+            self.assertEqual(node.cluster, self.cluster)
+            self.assertTrue(node.pending_addition)
+            self.assertEqual(data["roles"], node.pending_roles)
+            self.assertIsNotNone(node.group_id)
+            self.assertTrue(any(nic.assigned_networks_list
+                                for nic in node.nic_interfaces))
+            self.assertIn(
+                (consts.CLUSTER_CHANGES.interfaces, node.id), changes)
+            self.assertIn((consts.CLUSTER_CHANGES.disks, node.id), changes)
+
+        for node in self.env.nodes:
+            self.assertEqual(
+                node.volume_manager.gen_volumes_info(),
+                VolumeManagerExtension.get_node_volumes(node)
+            )
+
     def test_unassignment(self):
         cluster = self.env.create(
             cluster_kwargs={"api": True},
@@ -41,6 +41,7 @@ from nailgun.errors import errors
 from nailgun import consts
 
 from nailgun.db import NoCacheQuery
+from nailgun.db import read_only
 from nailgun.db.sqlalchemy.models import NodeBondInterface
 from nailgun.db.sqlalchemy.models import NodeGroup
 from nailgun.db.sqlalchemy.models import Task
@@ -158,6 +159,25 @@ class TestObjects(BaseIntegrationTest):
             elif r.operating_system == consts.RELEASE_OS.centos:
                 self.assertNotEqual(r.name, "A")
 
+    def test_fields_deferred_in_read_only_mode(self):
+        node_id = self.env.create_node(
+            replaced_provisioning_info={'a': 'b'}).id
+        self.db.expunge_all()
+
+        with read_only(self.db):
+            node = objects.Node.get_by_uid(node_id)
+            unloaded = sqlalchemy_inspect(node).unloaded
+            for field in objects.Node.deferred_fields:
+                self.assertIn(field, unloaded)
+            self.assertNotIn('meta', unloaded)
+            # deferred field is loaded on access
+            self.assertEqual({'a': 'b'}, node.replaced_provisioning_info)
+
+        self.db.expunge_all()
+        node = objects.NodeCollection.all().get(node_id)
+        self.assertNotIn(
+            'replaced_provisioning_info', sqlalchemy_inspect(node).unloaded)
+
 
 class TestNodeObject(BaseIntegrationTest):
 
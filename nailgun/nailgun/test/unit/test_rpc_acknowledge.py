@@ -18,6 +18,7 @@ import mock
 
 from nailgun.errors import errors
 from nailgun.rpc import receiverd
+from nailgun.rpc import utils
 from nailgun.test import base
 
 
@@ -56,3 +57,71 @@ class TestRpcAcknowledge(base.BaseTestCase):
             self.consumer.consume_msg, self.body, self.msg)
         self.assertFalse(self.msg.ack.called)
         self.assertEqual(self.msg.requeue.call_count, 1)
+
+
+class TestRpcProgressMessages(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestRpcProgressMessages, self).setUp()
+        self.receiver = mock.Mock()
+        self.consumer = receiverd.RPCConsumer(mock.Mock(), self.receiver)
+        self.consumer.progress_messages = receiverd.ProgressMessages(
+            max_age=3600, max_size=10)
+
+    def progress_body(self, task_uuid, *nodes):
+        return {'method': 'deploy_resp',
+                'args': {'task_uuid': task_uuid, 'nodes': list(nodes)}}
+
+    def test_progress_messages_merged(self):
+        msgs = [mock.Mock() for _ in range(3)]
+        self.consumer.consume_msg(
+            self.progress_body('1', {'uid': '1', 'progress': 10,
+                                     'status': 'deploying'}), msgs[0])
+        self.consumer.consume_msg(
+            self.progress_body('1', {'uid': '1', 'progress': 20},
+                               {'uid': '2', 'progress': 5}), msgs[1])
+        self.assertFalse(self.receiver.deploy_resp.called)
+        self.assertFalse(msgs[0].ack.called)
+
+        self.consumer.consume_msg(
+            {'method': 'deploy_resp',
+             'args': {'task_uuid': '1', 'status': 'ready'}}, msgs[2])
+
+        self.assertEqual(
+            [mock.call(task_uuid='1', nodes=[
+                {'uid': '1', 'progress': 20, 'status': 'deploying'},
+                {'uid': '2', 'progress': 5}]),
+             mock.call(task_uuid='1', status='ready')],
+            self.receiver.deploy_resp.call_args_list)
+        for msg in msgs:
+            self.assertEqual(msg.ack.call_count, 1)
+
+    def test_progress_messages_processed_when_buffer_is_full(self):
+        self.consumer.progress_messages.max_size = 2
+        for task_uuid in ('1', '2'):
+            self.consumer.consume_msg(
+                self.progress_body(task_uuid, {'uid': '1', 'progress': 10}),
+                mock.Mock())
+        self.assertEqual(self.receiver.deploy_resp.call_count, 2)
+
+    def test_progress_messages_processed_on_timeout(self):
+        self.consumer.progress_messages.max_age = 0
+        msg = mock.Mock()
+        self.consumer.progress_messages.add(
+            self.progress_body('1', {'uid': '1', 'progress': 10}), msg)
+        self.consumer.on_iteration()
+        self.assertEqual(self.receiver.deploy_resp.call_count, 1)
+        self.assertEqual(msg.ack.call_count, 1)
+
+    def test_is_progress_message(self):
+        self.assertTrue(utils.is_progress_message(
+            self.progress_body('1', {'uid': '1', 'progress': 10})))
+        self.assertFalse(utils.is_progress_message(
+            self.progress_body('1', {'uid': '1', 'status': 'error'})))
+        self.assertFalse(utils.is_progress_message(
+            self.progress_body('1', {'uid': '1', 'online': False})))
+        self.assertFalse(utils.is_progress_message(
+            self.progress_body('1', {'uid': 'master', 'progress': 10})))
+        self.assertFalse(utils.is_progress_message(
+            {'method': 'deploy_resp',
+             'args': {'task_uuid': '1', 'nodes': [], 'progress': 10}}))
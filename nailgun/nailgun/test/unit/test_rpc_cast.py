@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import amqp.exceptions as amqp_exceptions
+import mock
+
+from nailgun import rpc
+from nailgun.test import base
+
+
+@mock.patch('nailgun.rpc.Connection')
+class TestProducersPool(base.BaseUnitTest):
+
+    def test_connection_reused(self, connection_mock):
+        pool = rpc.ProducersPool('amqp://', 2)
+        with pool.acquire() as conn:
+            pass
+        with pool.acquire() as conn2:
+            self.assertIs(conn, conn2)
+        self.assertEqual(connection_mock.call_count, 1)
+
+    def test_connection_not_shared(self, connection_mock):
+        connection_mock.side_effect = lambda url: mock.Mock()
+        pool = rpc.ProducersPool('amqp://', 2)
+        with pool.acquire() as conn:
+            with pool.acquire() as conn2:
+                self.assertIsNot(conn, conn2)
+
+    def test_broken_connection_not_reused(self, connection_mock):
+        connection_mock.side_effect = lambda url: mock.Mock()
+        pool = rpc.ProducersPool('amqp://', 2)
+        with self.assertRaises(IOError):
+            with pool.acquire() as conn:
+                raise IOError()
+        conn.release.assert_called_once_with()
+        with pool.acquire() as conn2:
+            self.assertIsNot(conn, conn2)
+
+    def test_pool_size(self, connection_mock):
+        connection_mock.side_effect = lambda url: mock.Mock()
+        pool = rpc.ProducersPool('amqp://', 1)
+        with pool.acquire() as conn:
+            with pool.acquire() as conn2:
+                pass
+        self.assertFalse(conn2.release.called)
+        conn.release.assert_called_once_with()
+
+    def test_connections_not_inherited_after_fork(self, connection_mock):
+        connection_mock.side_effect = lambda url: mock.Mock()
+        pool = rpc.ProducersPool('amqp://', 2)
+        with pool.acquire() as conn:
+            pass
+        with mock.patch('nailgun.rpc.os.getpid', return_value=-1):
+            with pool.acquire() as conn2:
+                self.assertIsNot(conn, conn2)
+        self.assertFalse(conn.release.called)
+
+
+class TestCast(base.BaseUnitTest):
+
+    def setUp(self):
+        super(TestCast, self).setUp()
+        self.conn = mock.MagicMock()
+        self.producer = self.conn.Producer.return_value.__enter__()
+        acquire_mock = mock.MagicMock()
+        acquire_mock.return_value.__enter__.return_value = self.conn
+        self.patcher = mock.patch.object(
+            rpc.producers, 'acquire', acquire_mock)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        super(TestCast, self).tearDown()
+
+    def test_cast_many(self):
+        rpc.cast_many([('naily', {'method': 'a'}, False),
+                       ('naily', {'method': 'b'}, True)])
+        self.assertEqual(
+            [mock.call({'method': 'a'}, exchange=rpc.naily_exchange,
+                       routing_key='naily', declare=[rpc.naily_queue]),
+             mock.call({'method': 'b'},
+                       exchange=rpc.naily_service_exchange,
+                       routing_key='naily',
+                       declare=[rpc.naily_service_queue])],
+            self.producer.publish.call_args_list)
+
+    @mock.patch('nailgun.rpc.Connection')
+    @mock.patch('nailgun.rpc.utils.delete_entities')
+    def test_unsent_messages_sent_after_precondition_failed(
+            self, delete_entities_mock, _):
+        self.producer.publish.side_effect = [
+            None, amqp_exceptions.PreconditionFailed(), None, None]
+        rpc.cast_many([('naily', {'method': 'a'}, False),
+                       ('naily', {'method': 'b'}, False),
+                       ('naily', {'method': 'c'}, False)])
+        self.assertEqual(delete_entities_mock.call_count, 1)
+        self.assertEqual(
+            [{'method': 'a'}, {'method': 'b'}, {'method': 'b'},
+             {'method': 'c'}],
+            [args[0] for args, _ in self.producer.publish.call_args_list])
+
+    @mock.patch.object(rpc.producers, 'clear')
+    def test_idle_connections_dropped_after_connection_error(
+            self, clear_mock):
+        self.producer.publish.side_effect = [IOError(), None]
+        rpc.cast_many([('naily', {'method': 'a'}, False)])
+        clear_mock.assert_called_once_with()
+        self.assertEqual(2, self.producer.publish.call_count)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from nailgun import consts
+from nailgun.rpc import receiverd
+from nailgun.test import base
+
+
+class TestRpcDispatcher(base.BaseTestCase):
+
+    def setUp(self):
+        super(TestRpcDispatcher, self).setUp()
+        self.dispatcher = receiverd.RPCDispatcher(mock.Mock(), 4)
+        self.dispatcher.producer = mock.Mock()
+        self.cluster = self.env.create_cluster(api=False)
+
+    def create_task(self, cluster_id):
+        return self.env.create_task(
+            name=consts.TASK_NAMES.deployment,
+            status=consts.TASK_STATUSES.running,
+            cluster_id=cluster_id)
+
+    def get_routing_key(self, body):
+        msg = mock.Mock()
+        self.dispatcher.producer.publish.reset_mock()
+        self.dispatcher.consume_msg(body, msg)
+        self.assertEqual(msg.ack.call_count, 1)
+        args, kwargs = self.dispatcher.producer.publish.call_args
+        self.assertEqual(args, (body,))
+        return kwargs['routing_key']
+
+    def test_messages_of_cluster_routed_to_same_worker(self):
+        tasks = [self.create_task(self.cluster.id) for _ in range(10)]
+        routing_keys = set(
+            self.get_routing_key({'method': 'deploy_resp',
+                                  'args': {'task_uuid': task.uuid}})
+            for task in tasks)
+        self.assertEqual(len(routing_keys), 1)
+        self.assertIn(
+            routing_keys.pop(),
+            [q.routing_key for q in self.dispatcher.worker_queues])
+
+    def test_messages_routed_to_different_workers(self):
+        routing_keys = set(
+            self.get_routing_key({'method': 'deploy_resp',
+                                  'args': {'task_uuid': str(i)}})
+            for i in range(100))
+        self.assertEqual(len(routing_keys), 4)
+
+    def test_cluster_id_of_task_is_cached(self):
+        task = self.create_task(self.cluster.id)
+        body = {'method': 'deploy_resp', 'args': {'task_uuid': task.uuid}}
+        routing_key = self.get_routing_key(body)
+        with mock.patch('nailgun.rpc.receiverd.db') as db_mock:
+            self.assertEqual(self.get_routing_key(body), routing_key)
+            self.assertFalse(db_mock().query.called)
+
+
+class TestMethodTimings(base.BaseUnitTest):
+
+    def test_timings_are_aggregated_per_method(self):
+        timings = receiverd.MethodTimings(report_interval=3600)
+        timings.add('deploy_resp', 1.0)
+        timings.add('deploy_resp', 3.0)
+        timings.add('provision_resp', 2.0)
+        self.assertEqual(
+            {'deploy_resp': (2, 4.0, 3.0), 'provision_resp': (1, 2.0, 2.0)},
+            timings.stats)
+
+    @mock.patch('nailgun.rpc.receiverd.logger')
+    def test_timings_are_reported_periodically(self, logger_mock):
+        timings = receiverd.MethodTimings(report_interval=0)
+        timings.add('deploy_resp', 1.0)
+        self.assertEqual(logger_mock.info.call_count, 1)
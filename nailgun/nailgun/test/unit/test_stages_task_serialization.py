@@ -58,9 +58,11 @@ class BaseTaskSerializationTestUbuntu(base.BaseTestCase):
     def setUp(self):
         super(BaseTaskSerializationTestUbuntu, self).setUp()
 
+        session = mock.Mock()
+        session.get.return_value = mock.Mock(
+            status_code=200, text='Archive: test')
         self._requests_mock = mock.patch(
-            'nailgun.utils.debian.requests.get',
-            return_value=mock.Mock(text='Archive: test'))
+            'nailgun.utils.http_pool.get_session', return_value=session)
         self._requests_mock.start()
 
         self.release = self.env.create_release(
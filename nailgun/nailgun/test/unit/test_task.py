@@ -19,6 +19,7 @@ from oslo_serialization import jsonutils
 import yaml
 
 from nailgun import consts
+from nailgun.db.sqlalchemy.models import Node
 from nailgun.db.sqlalchemy.models import Task
 from nailgun.errors import errors
 from nailgun.extensions.volume_manager.manager import VolumeManager
@@ -350,6 +351,59 @@ class TestCheckBeforeDeploymentTask(BaseTestCase):
 
             self.assertEqual(check_mock.call_count, 1)
 
+    def test_volume_manager_is_shared_by_checks(self):
+        self.set_node_status('discover')
+
+        with mock.patch.object(
+                Node, 'volume_manager',
+                new_callable=mock.PropertyMock) as vm_mock:
+            with task.CheckBeforeDeploymentSnapshot(self.cluster):
+                task.CheckBeforeDeploymentTask._check_disks(self.task)
+                task.CheckBeforeDeploymentTask._check_volumes(self.task)
+
+            self.assertEqual(1, vm_mock.call_count)
+            vm_manager = vm_mock.return_value
+            self.assertEqual(
+                1, vm_manager.check_disk_space_for_deployment.call_count)
+            self.assertEqual(
+                1, vm_manager.check_volume_sizes_for_deployment.call_count)
+
+    def test_snapshot_is_not_shared_outside_of_execution(self):
+        self.assertIsNot(
+            task.CheckBeforeDeploymentSnapshot.get(self.cluster),
+            task.CheckBeforeDeploymentSnapshot.get(self.cluster))
+
+        with task.CheckBeforeDeploymentSnapshot(self.cluster) as snapshot:
+            self.assertIs(
+                snapshot,
+                task.CheckBeforeDeploymentSnapshot.get(self.cluster))
+
+    def test_execute_records_timings_of_checks(self):
+        checks = task.CheckBeforeDeploymentTask.checks
+        with mock.patch.multiple(
+                task.CheckBeforeDeploymentTask,
+                _check_mongo_nodes=mock.DEFAULT,
+                **dict((c, mock.DEFAULT) for c in checks)):
+            task.CheckBeforeDeploymentTask.execute(self.task)
+
+        timings = self.task.result['timings']
+        self.assertEqual(list(checks), list(timings)[:len(checks)])
+        self.assertTrue(all(t >= 0 for t in timings.values()))
+
+    def test_execute_records_timings_if_check_fails(self):
+        with mock.patch.object(
+                task.CheckBeforeDeploymentTask,
+                '_check_controllers_count',
+                side_effect=errors.NotEnoughControllers):
+            self.assertRaises(
+                errors.NotEnoughControllers,
+                task.CheckBeforeDeploymentTask.execute,
+                self.task)
+
+        self.assertEqual(
+            ['_check_nodes_are_online', '_check_controllers_count'],
+            list(self.task.result['timings']))
+
     def test_check_nodes_online_raises_exception(self):
         self.node.online = False
         self.env.db.commit()
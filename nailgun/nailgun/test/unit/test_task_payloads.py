@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+from nailgun.db import task_payloads
+from nailgun.db.sqlalchemy.models import Task
+from nailgun.db.sqlalchemy.models import TaskPayload
+from nailgun.test.base import BaseTestCase
+
+
+class TestTaskPayloads(BaseTestCase):
+
+    def make_message(self, nodes_count, **args):
+        args['nodes'] = [
+            {'uid': str(i), 'data': 'x' * task_payloads.CHUNK_MIN_SIZE}
+            for i in range(nodes_count)]
+        return {'method': 'deploy', 'args': args}
+
+    def get_checksums(self):
+        return set(c for c, in self.db.query(TaskPayload.checksum))
+
+    def test_store_and_load(self):
+        message = self.make_message(3, small=[{'a': 1}], list=[[{'b': 2}]])
+        connection = self.db.connection()
+        checksum = task_payloads.store(connection, message)
+
+        self.assertEqual(message, task_payloads.load(connection, checksum))
+        # root and chunks of nodes
+        self.assertEqual(4, len(self.get_checksums()))
+
+    def test_chunks_are_shared(self):
+        connection = self.db.connection()
+        checksum_a = task_payloads.store(
+            connection, self.make_message(3, name='a'))
+        checksum_b = task_payloads.store(
+            connection, self.make_message(4, name='b'))
+
+        self.assertNotEqual(checksum_a, checksum_b)
+        # two roots and chunks of four nodes
+        self.assertEqual(6, len(self.get_checksums()))
+        self.assertEqual(
+            checksum_a,
+            task_payloads.store(connection, self.make_message(3, name='a')))
+        self.assertEqual(6, len(self.get_checksums()))
+
+    def test_same_chunk_loaded_as_different_objects(self):
+        message = {'nodes': [{'data': 'x' * task_payloads.CHUNK_MIN_SIZE}]}
+        message['nodes'].append(dict(message['nodes'][0]))
+        connection = self.db.connection()
+        loaded = task_payloads.load(
+            connection, task_payloads.store(connection, message))
+
+        self.assertEqual(message, loaded)
+        self.assertIsNot(loaded['nodes'][0], loaded['nodes'][1])
+
+    def test_task_cache(self):
+        message = self.make_message(2)
+        task = Task(name='deployment', cache=message)
+        # cache can be changed in place until it's stored
+        task.cache['args']['task_uuid'] = 'fake-uuid'
+        self.db.add(task)
+        self.db.commit()
+
+        task_id = task.id
+        self.db.expunge_all()
+        task = self.db.query(Task).get(task_id)
+        self.assertIsNotNone(task.cache_checksum)
+        self.assertEqual('fake-uuid', task.cache['args']['task_uuid'])
+        self.assertEqual(message['args']['nodes'], task.cache['args']['nodes'])
+
+    def test_task_without_cache(self):
+        task = Task(name='deployment')
+        self.db.add(task)
+        self.db.flush()
+        self.assertIsNone(task.cache_checksum)
+        self.assertEqual({}, task.cache)
+
+    def test_purge(self):
+        task = Task(name='deployment', cache=self.make_message(2))
+        self.db.add(task)
+        self.db.flush()
+        connection = self.db.connection()
+        task_payloads.store(connection, self.make_message(3))
+        self.assertEqual(5, len(self.get_checksums()))
+
+        self.db.query(TaskPayload).update(
+            {'used_at': datetime.datetime.utcnow() -
+                task_payloads.PURGE_TIMEOUT * 2})
+        task_payloads.purge(connection)
+
+        # payloads of the task are kept
+        self.assertEqual(3, len(self.get_checksums()))
+        self.assertEqual(2, len(task.cache['args']['nodes']))
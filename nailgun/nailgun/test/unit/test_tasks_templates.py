@@ -297,8 +297,9 @@ class TestMakeUbuntuPreferencesTask(base.BaseTestCase):
         ]
         self.assertItemsEqual(conditions, expected_conditions)
 
-    @mock.patch('nailgun.utils.debian.requests.get',
-                return_value=mock.Mock(text=_fake_debian_release))
+    @mock.patch('nailgun.utils.requests.get',
+                return_value=mock.Mock(status_code=200,
+                                       text=_fake_debian_release))
     def test_make_ubuntu_preferences_task(self, _):
         result = tasks_templates.make_ubuntu_preferences_task(
             [1, 2, 3],
@@ -320,8 +321,9 @@ class TestMakeUbuntuPreferencesTask(base.BaseTestCase):
 
         self._check_apt_preferences(data, ['main', 'universe'], 1004)
 
-    @mock.patch('nailgun.utils.debian.requests.get',
-                return_value=mock.Mock(text=_fake_debian_release))
+    @mock.patch('nailgun.utils.requests.get',
+                return_value=mock.Mock(status_code=200,
+                                       text=_fake_debian_release))
     def test_make_ubuntu_preferences_task_flat(self, _):
         result = tasks_templates.make_ubuntu_preferences_task(
             [1, 2, 3],
@@ -343,7 +345,7 @@ class TestMakeUbuntuPreferencesTask(base.BaseTestCase):
 
         self._check_apt_preferences(data, [], 1004)
 
-    @mock.patch('nailgun.utils.debian.requests.get')
+    @mock.patch('nailgun.utils.requests.get')
     def test_make_ubuntu_preferences_task_returns_none_if_errors(self, m_get):
         r = requests.Response()
         r.status_code = 404
@@ -19,6 +19,7 @@ from mock import patch
 
 import requests
 
+from nailgun.settings import settings
 from nailgun.test import base
 from nailgun.utils import camel_to_snake_case
 from nailgun.utils import compact
@@ -30,6 +31,7 @@ from nailgun.utils import traverse
 
 from nailgun.utils.debian import get_apt_preferences_line
 from nailgun.utils.debian import get_release_file
+from nailgun.utils.debian import get_release_files
 from nailgun.utils.debian import parse_release_file
 
 from nailgun.utils.fake_generator import FakeNodesGenerator
@@ -156,7 +158,7 @@ class TestTraverse(base.BaseUnitTest):
 
 class TestGetDebianReleaseFile(base.BaseUnitTest):
 
-    @patch('nailgun.utils.debian.requests.get')
+    @patch('nailgun.utils.requests.get')
     def test_normal_ubuntu_repo(self, m_get):
         get_release_file({
             'name': 'myrepo',
@@ -165,9 +167,10 @@ class TestGetDebianReleaseFile(base.BaseUnitTest):
             'section': 'main university',
         })
         m_get.assert_called_with(
-            'http://some-uri.com/path/dists/mysuite/Release')
+            'http://some-uri.com/path/dists/mysuite/Release',
+            timeout=mock.ANY)
 
-    @patch('nailgun.utils.debian.requests.get')
+    @patch('nailgun.utils.requests.get')
     def test_flat_ubuntu_repo(self, m_get):
         testcases = [
             # (suite, uri)
@@ -183,9 +186,9 @@ class TestGetDebianReleaseFile(base.BaseUnitTest):
                 'suite': suite,
                 'section': '',
             })
-            m_get.assert_called_with(uri)
+            m_get.assert_called_with(uri, timeout=mock.ANY)
 
-    @patch('nailgun.utils.debian.requests.get')
+    @patch('nailgun.utils.requests.get')
     def test_do_not_silence_http_errors(self, m_get):
         r = requests.Response()
         r.status_code = 404
@@ -198,7 +201,7 @@ class TestGetDebianReleaseFile(base.BaseUnitTest):
             'section': 'main university',
         })
 
-    @patch('nailgun.utils.debian.requests.get')
+    @patch('nailgun.utils.requests.get')
     def test_do_not_retry_on_404(self, m_get):
         r = requests.Response()
         r.status_code = 404
@@ -212,7 +215,7 @@ class TestGetDebianReleaseFile(base.BaseUnitTest):
         }, retries=3)
         self.assertEqual(m_get.call_count, 1)
 
-    @patch('nailgun.utils.debian.requests.get')
+    @patch('nailgun.utils.requests.get')
     def test_do_retry_on_error(self, m_get):
         r = requests.Response()
         r.status_code = 500
@@ -226,7 +229,26 @@ class TestGetDebianReleaseFile(base.BaseUnitTest):
         }, retries=3)
         self.assertEqual(m_get.call_count, 3)
 
-    @patch('nailgun.utils.debian.requests.get')
+    @patch('nailgun.utils.http_pool.get_session')
+    def test_release_files_fetched_with_shared_session(self, m_session):
+        r = requests.Response()
+        r._content = 'content'
+        r.status_code = 200
+        m_session.return_value.get.return_value = r
+
+        contents = get_release_files([{
+            'name': 'myrepo',
+            'uri': 'http://some-uri.com/path',
+            'suite': 'mysuite',
+            'section': 'main university',
+        }])
+
+        self.assertEqual(['content'], contents)
+        m_session.return_value.get.assert_called_once_with(
+            'http://some-uri.com/path/dists/mysuite/Release',
+            timeout=settings.REPO_CHECK_REQUEST_TIMEOUT)
+
+    @patch('nailgun.utils.requests.get')
     def test_returns_content_if_http_ok(self, m_get):
         r = requests.Response()
         r._content = 'content'
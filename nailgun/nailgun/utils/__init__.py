@@ -229,7 +229,8 @@ def join_range(r):
     return ":".join(map(str, r)) if r else None
 
 
-def http_get(url, retries_on=[500, 502], retries=3, timeout=2):
+def http_get(url, retries_on=[500, 502], retries=3, timeout=2,
+             session=None, request_timeout=None):
     """Make an HTTP GET request and retry if response's status code is one
     we aren't expecting.
 
@@ -237,10 +238,18 @@ def http_get(url, retries_on=[500, 502], retries=3, timeout=2):
     :param retries_on: a list of HTTP status codes to make retries in case of
     :param retries: a number of retries
     :param timeout: timeout in seconds between attempts
+    :param session: requests session to make request with, so connections
+    of the session are reused
+    :param request_timeout: timeout in seconds of a single attempt
     :returns: a first successful attempt or last unsuccessful
     """
+    get = requests.get if session is None else session.get
+    kwargs = {}
+    if request_timeout is not None:
+        kwargs['timeout'] = request_timeout
+
     for _ in range(retries):
-        response = requests.get(url)
+        response = get(url, **kwargs)
 
         logger.debug('HTTP GET on %s => %d', url, response.status_code)
         if response.status_code not in retries_on:
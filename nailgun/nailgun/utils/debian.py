@@ -12,19 +12,24 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
 import os
 
-import requests
 import six
 import yaml
 
+from nailgun.settings import settings
 from nailgun.utils import grouper
+from nailgun.utils import http_get
+from nailgun.utils import http_pool
 
 
-def get_release_file(repo, retries=1):
+def get_release_file(repo, retries=1, session=None):
     """Get Release content of a given repo.
 
     :param repo: a repo as dict
+    :param retries: a number of attempts
+    :param session: requests session to make request with
     :returns: a release's content as string
     """
     if repo['section']:
@@ -40,17 +45,29 @@ def get_release_file(repo, retries=1):
         download_uri = os.path.join(
             repo['uri'], repo['suite'].lstrip('/'), 'Release')
 
-    for _ in six.moves.range(0, retries):
-        response = requests.get(download_uri)
-
-        # do not perform retries if release is not found
-        if response.status_code == 404:
-            break
-
+    # retries are made on server errors only, e.g. if release is
+    # not found there is no reason to try again
+    response = http_get(
+        download_uri, retries_on=[500, 502, 503], retries=retries, timeout=0,
+        session=session,
+        request_timeout=settings.REPO_CHECK_REQUEST_TIMEOUT)
     response.raise_for_status()
     return response.text
 
 
+def get_release_files(repos, retries=1):
+    """Get Release contents of several repos concurrently.
+
+    :param repos: a list of repos as dicts
+    :returns: a list with a release's content as string or an exception
+              raised on getting it for every repo
+    """
+    return http_pool.map_concurrently(
+        functools.partial(get_release_file, retries=retries,
+                          session=http_pool.get_session()),
+        repos, deadline=settings.REPO_CHECK_DEADLINE)
+
+
 def parse_release_file(content):
     """Parse Debian repo's Release file content.
 
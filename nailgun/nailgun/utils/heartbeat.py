@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2015 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Coalescing of heartbeats received from nailgun-agent.
+
+Agents report every node periodically, and most reports don't change
+anything but the node's last seen timestamp. Instead of updating
+the node row on every report, timestamps are buffered in memory of
+the API worker and written with a single bulk UPDATE by a background
+thread every KEEPALIVE['flush_interval'] seconds, and once more when
+the worker exits. Assassind keeps reading timestamps from DB, so
+a node's timestamp there lags behind by about the flush interval.
+"""
+
+import atexit
+from datetime import datetime
+import os
+import threading
+import time
+
+from sqlalchemy import case
+from sqlalchemy import func
+
+from nailgun.db import db
+from nailgun.db import revisions
+from nailgun.db.sqlalchemy.models import Node
+from nailgun.logger import logger
+from nailgun.settings import settings
+
+
+class HeartbeatBuffer(object):
+
+    def __init__(self, flush_interval):
+        self.flush_interval = flush_interval
+        self._timestamps = {}
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def touch(self, node_id, timestamp=None):
+        """Records the time when node was seen last time."""
+        self._ensure_started()
+        with self._lock:
+            self._timestamps[node_id] = timestamp or datetime.now()
+
+    def discard(self, node_id):
+        """Forgets buffered timestamp of node.
+
+        Should be called when the timestamp is written to DB
+        along with other node changes.
+        """
+        with self._lock:
+            self._timestamps.pop(node_id, None)
+
+    def get(self, node_id):
+        """Returns buffered timestamp of node or None."""
+        return self._timestamps.get(node_id)
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def flush_if_needed(self):
+        if time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Writes all buffered timestamps with a single UPDATE.
+
+        The update is committed in its own transaction. Timestamps
+        only move forward, so ones written by other workers in
+        the meantime are never overwritten by older ones. If the
+        update fails, timestamps are returned to the buffer.
+        """
+        with self._lock:
+            timestamps, self._timestamps = self._timestamps, {}
+            self._last_flush = time.time()
+
+        if not timestamps:
+            return
+
+        logger.debug("Flushing heartbeats of %d nodes", len(timestamps))
+        try:
+            # timestamps aren't shown anywhere, so they don't change revision
+            with revisions.bulk_untracked(db()):
+                db().query(Node).filter(
+                    Node.id.in_(list(timestamps))
+                ).update(
+                    {'timestamp': func.greatest(
+                        Node.timestamp, case(timestamps, value=Node.id))},
+                    synchronize_session=False
+                )
+            db().commit()
+        except Exception:
+            db().rollback()
+            with self._lock:
+                for node_id, timestamp in timestamps.items():
+                    current = self._timestamps.get(node_id)
+                    if current is None or current < timestamp:
+                        self._timestamps[node_id] = timestamp
+            raise
+
+    def _ensure_started(self):
+        # threads don't survive fork, so the flushing thread is started
+        # lazily in every uWSGI worker
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        with self._lock:
+            if self._pid != pid:
+                thread = threading.Thread(
+                    target=self._run, name='heartbeats-flusher')
+                thread.daemon = True
+                thread.start()
+                atexit.register(self._flush_at_exit)
+                self._pid = pid
+
+    def _run(self):
+        while True:
+            time.sleep(min(self.flush_interval, 1))
+            try:
+                self.flush_if_needed()
+            except Exception:
+                logger.exception("Failed to flush heartbeats")
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush heartbeats on exit")
+
+
+heartbeats = HeartbeatBuffer(settings.KEEPALIVE['flush_interval'])
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2016 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Concurrent HTTP requests to repositories
+
+Repositories are checked by a pool of threads which share connections
+to hosts, the whole check is limited by a deadline and successful
+responses are reused by checks which follow shortly.
+"""
+
+import functools
+import threading
+import time
+
+import requests
+import six
+
+from nailgun.logger import logger
+from nailgun.settings import settings
+from nailgun.utils import http_get
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Request was not completed before the deadline"""
+
+
+class ResponsesCache(object):
+    """Short-lived cache of responses keyed by URL
+
+    :param ttl: time in seconds a response is kept for
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            expires_at, response = self._responses.get(url, (0, None))
+            if expires_at < time.time():
+                self._responses.pop(url, None)
+                return None
+            return response
+
+    def put(self, url, response):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._responses[url] = (time.time() + self.ttl, response)
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+    def __len__(self):
+        return len(self._responses)
+
+
+responses_cache = ResponsesCache(settings.REPO_CHECK_CACHE_TTL)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Returns requests session shared by all threads
+
+    The session keeps a pool of connections per host, so several
+    repositories of the same mirror are checked over the same
+    connections.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_maxsize=settings.REPO_CHECK_WORKERS)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+    return _session
+
+
+def map_concurrently(func, items, workers=None, deadline=None):
+    """Calls func for every item in a pool of threads
+
+    :param func: function of one argument
+    :param items: list of arguments
+    :param workers: number of threads, REPO_CHECK_WORKERS by default
+    :param deadline: time in seconds to wait for all calls
+    :returns: list of results in order of items; an exception raised by
+              func, or DeadlineExceeded if func did not return in time,
+              is placed instead of result
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    pending = object()
+    results = [pending] * len(items)
+    queue = six.moves.queue.Queue()
+    for index_item in enumerate(items):
+        queue.put(index_item)
+    stopped = threading.Event()
+
+    def worker():
+        while not stopped.is_set():
+            try:
+                index, item = queue.get_nowait()
+            except six.moves.queue.Empty:
+                return
+            try:
+                results[index] = func(item)
+            except Exception as exc:
+                results[index] = exc
+
+    workers = min(workers or settings.REPO_CHECK_WORKERS, len(items))
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        # threads which missed the deadline must not block exit
+        thread.daemon = True
+        thread.start()
+
+    stop_at = None if deadline is None else time.time() + deadline
+    for thread in threads:
+        if stop_at is None:
+            thread.join()
+        else:
+            thread.join(max(0, stop_at - time.time()))
+    stopped.set()
+
+    results = list(results)
+    for index, result in enumerate(results):
+        if result is pending:
+            logger.warning("Request to %s missed the deadline", items[index])
+            results[index] = DeadlineExceeded(
+                "Deadline of {0} seconds is exceeded".format(deadline))
+    return results
+
+
+def _get_failed_response(url, error):
+    """Makes a response which describes the failed request."""
+    response = requests.Response()
+    response.url = url
+    if isinstance(error, requests.exceptions.Timeout):
+        response.status_code = requests.codes.request_timeout
+    else:
+        response.status_code = requests.codes.service_unavailable
+    response.reason = six.text_type(error)
+    return response
+
+
+def http_get_many(urls, retries_on=[500, 502], retries=3, timeout=2,
+                  deadline=None, use_cache=True):
+    """Makes http_get requests to several URLs concurrently
+
+    Successful responses are cached for REPO_CHECK_CACHE_TTL seconds,
+    so the same URLs are not requested again by checks which follow.
+
+    :param urls: list of URLs to make requests to
+    :param retries_on: a list of HTTP status codes to make retries in case of
+    :param retries: a number of retries
+    :param timeout: timeout in seconds between attempts
+    :param deadline: time in seconds to wait for all requests,
+                     REPO_CHECK_DEADLINE by default
+    :param use_cache: reuse responses cached by previous calls
+    :returns: list of responses in order of urls; requests which failed
+              get synthetic responses: ones which timed out or missed
+              the deadline have 408 status code, others have 503
+    """
+    if deadline is None:
+        deadline = settings.REPO_CHECK_DEADLINE
+
+    responses = {}
+    to_request = []
+    for url in urls:
+        if url in responses or url in to_request:
+            continue
+        response = responses_cache.get(url) if use_cache else None
+        if response is not None:
+            responses[url] = response
+        else:
+            to_request.append(url)
+
+    get = functools.partial(
+        http_get,
+        retries_on=retries_on,
+        retries=retries,
+        timeout=timeout,
+        session=get_session(),
+        request_timeout=settings.REPO_CHECK_REQUEST_TIMEOUT)
+    results = map_concurrently(get, to_request, deadline=deadline)
+
+    for url, result in six.moves.zip(to_request, results):
+        if isinstance(result, requests.exceptions.RequestException):
+            result = _get_failed_response(url, result)
+        elif isinstance(result, Exception):
+            raise result
+        elif result.status_code == requests.codes.ok:
+            responses_cache.put(url, result)
+        responses[url] = result
+
+    return [responses[url] for url in urls]
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright 2015 Mirantis, Inc.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Persistent index of entries of log files shown in UI.
+
+Reading a page of log entries used to require parsing the log file
+backwards line by line. The index keeps byte offsets, timestamp and
+level of every entry in a sidecar file, so the page of entries can be
+found by seeking. The index is updated incrementally when the log file
+grows and is rebuilt when the file is rotated or truncated, or when
+the log source config is changed. Rotation by copytruncate keeps inode
+of the file, so a digest of the head of the file is kept in the index
+to find out that the file was replaced.
+
+Index file layout: a header followed by fixed size records, one record
+per log entry in the order of entries in the log file.
+"""
+
+import calendar
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import re
+import struct
+import time
+
+
+class LogIndex(object):
+
+    # magic, config digest, inode, indexed size, head digest
+    header = struct.Struct('<8s20sQQ20s')
+    # start and end offsets of entry, timestamp, level
+    record = struct.Struct('<QQqH')
+
+    magic = b'NGLOGIX2'
+    # size of the head of log file which digest is kept in the index
+    head_size = 4096
+    unknown_level = 0xFFFF
+    invalid_timestamp = -(2 ** 63)
+    # number of records read from index at once
+    chunk_size = 4096
+
+    def __init__(self, log_file, log_config, index_dir):
+        self.log_file = log_file
+        self.levels = log_config['levels']
+        self.multiline = log_config.get('multiline', False)
+        self.date_format = log_config['date_format']
+        self.regexp = re.compile(log_config['regexp'])
+        self.skip_regexp = None
+        if 'skip_regexp' in log_config:
+            self.skip_regexp = re.compile(log_config['skip_regexp'])
+
+        self.config_digest = hashlib.sha1(json.dumps(
+            [log_config.get(k) for k in ('regexp', 'skip_regexp', 'levels',
+                                         'multiline', 'date_format')]
+        )).digest()
+        self.index_file = os.path.join(
+            index_dir,
+            '{0}.idx'.format(
+                hashlib.sha1(os.path.abspath(log_file)).hexdigest()))
+
+    @contextlib.contextmanager
+    def open(self):
+        """Updates the index and yields it locked for reading."""
+        fd = os.open(self.index_file, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, 'r+b') as index:
+            fcntl.flock(index, fcntl.LOCK_EX)
+            try:
+                self._update(index)
+                fcntl.flock(index, fcntl.LOCK_SH)
+                yield _IndexReader(self, index)
+            finally:
+                fcntl.flock(index, fcntl.LOCK_UN)
+
+    def reset(self):
+        """Drops the index, so it is rebuilt on the next use."""
+        with open(self.index_file, 'r+b') as index:
+            fcntl.flock(index, fcntl.LOCK_EX)
+            try:
+                index.truncate(0)
+            finally:
+                fcntl.flock(index, fcntl.LOCK_UN)
+
+    def get_level_rank(self, level):
+        try:
+            return self.levels.index(level)
+        except ValueError:
+            return self.unknown_level
+
+    def _parse_timestamp(self, date):
+        try:
+            return calendar.timegm(time.strptime(date, self.date_format))
+        except ValueError:
+            return self.invalid_timestamp
+
+    def _count(self, index):
+        index.seek(0, os.SEEK_END)
+        return (index.tell() - self.header.size) // self.record.size
+
+    def _read_record(self, index, number):
+        index.seek(self.header.size + number * self.record.size)
+        return self.record.unpack(index.read(self.record.size))
+
+    def _get_head_digest(self, size):
+        with open(self.log_file, 'rb') as f:
+            return hashlib.sha1(f.read(min(size, self.head_size))).digest()
+
+    def _update(self, index):
+        stat = os.stat(self.log_file)
+
+        index.seek(0)
+        data = index.read(self.header.size)
+        indexed_size = 0
+        count = 0
+        if len(data) == self.header.size:
+            magic, digest, inode, size, head = self.header.unpack(data)
+            # otherwise log file was rotated or truncated, or config
+            # of the log source was changed, so index is rebuilt
+            if magic == self.magic and digest == self.config_digest and \
+                    inode == stat.st_ino and size <= stat.st_size and \
+                    head == self._get_head_digest(size):
+                if size == stat.st_size:
+                    return
+                indexed_size = size
+                count = self._count(index)
+
+        offset = indexed_size
+        if count:
+            # the last entry can be continued by lines
+            # written after the previous update
+            offset = self._read_record(index, count - 1)[0]
+            count -= 1
+
+        records, indexed_size = self._parse(offset)
+
+        index.seek(self.header.size + count * self.record.size)
+        index.truncate()
+        index.write(b''.join(self.record.pack(*r) for r in records))
+        index.seek(0)
+        index.write(self.header.pack(
+            self.magic, self.config_digest, stat.st_ino, indexed_size,
+            self._get_head_digest(indexed_size)))
+        index.flush()
+
+    def _parse(self, offset):
+        """Parses log file starting from offset.
+
+        Only complete lines are processed.
+
+        :returns: list of records and offset of the end of parsed data
+        """
+        records = []
+        current = None
+        pos = offset
+        with open(self.log_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                line_start, pos = pos, pos + len(line)
+
+                entry = line.rstrip('\n')
+                if not entry or \
+                        (self.skip_regexp and self.skip_regexp.match(entry)):
+                    continue
+
+                m = self.regexp.match(entry)
+                if m is None:
+                    if self.multiline and current:
+                        current[1] = pos
+                    continue
+
+                if current:
+                    records.append(current)
+                current = [
+                    line_start,
+                    pos,
+                    self._parse_timestamp(m.group('date')),
+                    self.get_level_rank(m.group('level').upper() or 'INFO'),
+                ]
+        if current:
+            records.append(current)
+        return records, pos
+
+
+class _IndexReader(object):
+
+    def __init__(self, log_index, index):
+        self.log_index = log_index
+        self.index = index
+
+    def iter_records_backwards(self, end_pos):
+        """Iterates over records of entries which end before end_pos.
+
+        Records are yielded from the newest to the oldest one as tuples
+        (start offset, end offset, timestamp, level rank).
+        """
+        log_index = self.log_index
+        index = self.index
+
+        # binary search of the first entry which ends after end_pos
+        lo, hi = 0, log_index._count(index)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if log_index._read_record(index, mid)[1] <= end_pos:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        number = lo
+        while number > 0:
+            chunk_start = max(0, number - log_index.chunk_size)
+            index.seek(log_index.header.size +
+                       chunk_start * log_index.record.size)
+            data = index.read((number - chunk_start) * log_index.record.size)
+            for i in range(number - chunk_start - 1, -1, -1):
+                yield log_index.record.unpack_from(
+                    data, i * log_index.record.size)
+            number = chunk_start